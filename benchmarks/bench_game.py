@@ -0,0 +1,68 @@
+'''
+Times every Game stage on the checked-in games and on synthetic games of growing size
+Writes one JSON record per (game, stage) so runs can be diffed for regressions
+ie python -m benchmarks.bench_game --scales 1 2 4 8 --output bench.jsonl
+'''
+from benchmarks.synthetic import build_synthetic_game
+from driver import read_json_data
+from pynhl.game import Game
+from pynhl.metrics import TimingHook
+import argparse, json, sys
+
+# Size of a synthetic game at scale 1, roughly a real regular season game
+BASE_SIZE = {'events': 300, 'shifts': 700, 'overtime_periods': 0, 'roster_size': 20}
+
+
+def time_stages(game_json, shift_json, repeat=3):
+    """
+    Runs Game.STAGES one at a time, returns ({stage: best seconds over repeat runs}, last Game built)
+    """
+    best = {}
+    game = None
+    for _ in range(repeat):
+        game = Game(game_json, shift_json, hooks=[TimingHook()]).run_stages()
+        for record in game.stage_records:
+            best[record['stage']] = min(record['wall_seconds'], best.get(record['stage'], record['wall_seconds']))
+    return best, game
+
+
+def bench_game(label, game_json, shift_json, sizes, repeat=3):
+    """
+    Yields one record per stage, plus a "total" record
+    """
+    stages, game = time_stages(game_json, shift_json, repeat)
+    record = {'game': label, 'game_id': game.game_id, 'events': len(game.events_in_game),
+              'shifts': len(game.shifts), 'players': len(game.players), **sizes}
+    for stage, seconds in stages.items():
+        yield {**record, 'stage': stage, 'seconds': round(seconds, 6)}
+    yield {**record, 'stage': 'total', 'seconds': round(sum(stages.values()), 6)}
+
+
+def run(game_ids, scales, repeat=3, overtime_periods=0, roster_size=20):
+    for game_num in game_ids:
+        shift_json = read_json_data(game_num, is_game=False)
+        game_json = read_json_data(game_num)
+        yield from bench_game(str(game_num), game_json, shift_json, {'scale': None}, repeat)
+    for scale in scales:
+        sizes = dict(BASE_SIZE, events=int(BASE_SIZE['events'] * scale), shifts=int(BASE_SIZE['shifts'] * scale),
+                     overtime_periods=overtime_periods, roster_size=roster_size)
+        game_json, shift_json = build_synthetic_game(1, **sizes)
+        yield from bench_game(f"synthetic x{scale}", game_json, shift_json, {'scale': scale, **sizes}, repeat)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each Game stage, one JSON record per line")
+    parser.add_argument('--games', type=int, nargs='*', default=[2019020645], help="Saved games to time")
+    parser.add_argument('--scales', type=float, nargs='*', default=[1, 2, 4, 8],
+                        help="Synthetic game sizes, as multiples of a regular season game")
+    parser.add_argument('--overtime-periods', type=int, default=0)
+    parser.add_argument('--roster-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3, help="Best of this many runs per stage")
+    parser.add_argument('--output', default=None, help="JSON lines file, defaults to stdout")
+    args = parser.parse_args()
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    for bench_record in run(args.games, args.scales, args.repeat, args.overtime_periods, args.roster_size):
+        out.write(json.dumps(bench_record) + "\n")
+    if args.output:
+        out.close()
@@ -0,0 +1,223 @@
+'''
+Writes synthetic game_<id>.json / shift_<id>.json pairs shaped like the NHL API documents
+Only the fields pynhl reads are generated, sizes are configurable so each Game stage can be timed as data grows
+'''
+import argparse, json, os, random
+import pynhl.helpers as helpers
+
+OVERTIME_LENGTH = 300
+
+# Relative frequency of each tracked event in a real game
+EVENT_WEIGHTS = {
+    "Faceoff": 60,
+    "Hit": 45,
+    "Shot": 60,
+    "Missed Shot": 25,
+    "Blocked Shot": 30,
+    "Giveaway": 15,
+    "Takeaway": 12,
+    "Penalty": 8,
+    "Goal": 5,
+}
+
+
+def to_clock(seconds):
+    """
+    Seconds into the period -> MM:SS, as the API writes it
+    """
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def period_lengths(overtime_periods):
+    return [helpers.PERIOD_LENGTH] * 3 + [OVERTIME_LENGTH] * overtime_periods
+
+
+def build_roster(team, team_id, first_id, roster_size):
+    """
+    Players of one team, two goalies and the skaters split 2:1 forwards to defense
+    """
+    skaters = roster_size - 2
+    defense = skaters // 3
+    positions = ['G', 'G'] + ['D'] * defense + ['F'] * (skaters - defense)
+    roster = []
+    for i, position in enumerate(positions):
+        roster.append({
+            'id': first_id + i,
+            'firstName': team,
+            'lastName': f"{position}{i}",
+            'fullName': f"{team} {position}{i}",
+            'primaryNumber': str(i + 1),
+            'currentTeam': {'id': team_id, 'triCode': team},
+            'primaryPosition': {'code': position, 'type': {'G': 'Goalie', 'D': 'Defenseman', 'F': 'Forward'}[position]},
+        })
+    return roster
+
+
+def build_unit_shifts(units, period, length, mean_shift, rng):
+    """
+    Rotates units (lines / pairs / a goalie) through a period, each change lasting about mean_shift seconds
+    Returns [(player, period, start, end)]
+    """
+    shifts = []
+    start = 0
+    unit = rng.randrange(len(units))
+    while start < length:
+        end = min(length, start + max(5, int(rng.gauss(mean_shift, mean_shift / 4))))
+        shifts.extend((player, period, start, end) for player in units[unit])
+        start = end
+        unit = (unit + 1) % len(units)
+    return shifts
+
+
+def build_team_shifts(roster, lengths, mean_shift, rng):
+    goalies = [p for p in roster if p['primaryPosition']['code'] == 'G']
+    defense = [p for p in roster if p['primaryPosition']['code'] == 'D']
+    forwards = [p for p in roster if p['primaryPosition']['code'] == 'F']
+    lines = [forwards[i:i + 3] for i in range(0, len(forwards) - 2, 3)] or [forwards]
+    pairs = [defense[i:i + 2] for i in range(0, len(defense) - 1, 2)] or [defense]
+    shifts = []
+    for period, length in enumerate(lengths, start=1):
+        shifts += build_unit_shifts([goalies[:1]], period, length, length, rng)
+        shifts += build_unit_shifts(lines, period, length, mean_shift, rng)
+        # Defense stay out a little longer than forwards
+        shifts += build_unit_shifts(pairs, period, length, mean_shift * 1.3, rng)
+    return shifts
+
+
+def build_play(type_of_event, team, other, period, seconds, goals, rng, penalty_minutes=2):
+    """
+    A single allPlays entry
+    """
+    shooter = rng.choice(team['skaters'])
+    opponent = rng.choice(other['skaters'])
+    description = f"{shooter['fullName']} {type_of_event}"
+    if type_of_event == "Blocked Shot":
+        # The API credits blocked shots to the blocker first
+        players, team = [opponent, shooter], other
+        description = f"{opponent['fullName']} blocked shot from {shooter['fullName']}"
+    elif type_of_event in ("Missed Shot", "Giveaway", "Takeaway"):
+        players = [shooter]
+    elif type_of_event in ("Shot", "Goal"):
+        players = [shooter, other['goalie']]
+    else:
+        players = [shooter, opponent]
+    play = {
+        'players': [{'player': {'id': p['id'], 'fullName': p['fullName']}} for p in players],
+        'result': {'event': type_of_event, 'description': description},
+        'about': {'period': period, 'periodTime': to_clock(seconds), 'goals': dict(goals)},
+        'coordinates': {'x': float(rng.randint(-99, 99)), 'y': float(rng.randint(-42, 42))},
+        'team': {'triCode': team['triCode']},
+    }
+    if type_of_event == "Penalty":
+        play['result']['penaltyMinutes'] = penalty_minutes
+    return play
+
+
+def build_marker(type_of_event, period, seconds, goals):
+    """
+    Untracked plays (period start / end, game end), these carry no team or coordinates
+    """
+    return {'result': {'event': type_of_event, 'description': type_of_event},
+            'about': {'period': period, 'periodTime': to_clock(seconds), 'goals': dict(goals)}}
+
+
+def build_synthetic_game(game_id, events=300, shifts=700, overtime_periods=0, roster_size=20, seed=None):
+    """
+    Returns (game_json, shift_json) for a synthetic game
+    events / shifts are the approximate number of tracked plays / shift rows in the whole game
+    """
+    rng = random.Random(game_id if seed is None else seed)
+    lengths = period_lengths(overtime_periods)
+    teams = {}
+    for side, tri_code, team_id in (('home', 'HOM', 1), ('away', 'AWY', 2)):
+        roster = build_roster(tri_code, team_id, 8400000 + team_id * 1000, roster_size)
+        teams[side] = {'triCode': tri_code, 'id': team_id, 'roster': roster,
+                       'goalie': roster[0], 'skaters': [p for p in roster if p['primaryPosition']['code'] != 'G']}
+
+    # Each change puts 5 skaters a side on the ice, 3 forwards or 2 defense per shift row
+    skater_rows = max(shifts - 2 * len(lengths), 10)
+    changes = skater_rows / 10
+    mean_shift = max(10, sum(lengths) / changes * 2.5 / 3)
+    shift_rows = []
+    for side in ('home', 'away'):
+        for player, period, start, end in build_team_shifts(teams[side]['roster'], lengths, mean_shift, rng):
+            shift_rows.append((side, player, period, start, end))
+
+    plays = []
+    goals = {'home': 0, 'away': 0}
+    periods = (rng.randrange(len(lengths)) for _ in range(events))
+    times = sorted((period + 1, rng.randrange(lengths[period])) for period in periods)
+    types = rng.choices(list(EVENT_WEIGHTS), weights=list(EVENT_WEIGHTS.values()), k=len(times))
+    current_period = 0
+    for (period, seconds), type_of_event in zip(times, types):
+        while current_period < period:
+            if current_period:
+                plays.append(build_marker("Period End", current_period, lengths[current_period - 1], goals))
+            current_period += 1
+            plays.append(build_marker("Period Start", current_period, 0, goals))
+        side = rng.choice(('home', 'away'))
+        other = 'away' if side == 'home' else 'home'
+        if type_of_event == "Goal":
+            goals[side] += 1
+        plays.append(build_play(type_of_event, teams[side], teams[other], period, seconds, goals, rng))
+    plays.append(build_marker("Period End", current_period, lengths[current_period - 1], goals))
+    plays.append(build_marker("Game End", current_period, lengths[current_period - 1], goals))
+
+    players = {f"ID{p['id']}": p for side in teams.values() for p in side['roster']}
+    game_json = {
+        'gamePk': game_id,
+        'gameData': {
+            'game': {'pk': game_id, 'season': '20192020', 'type': 'R'},
+            'teams': {side: {'id': team['id'], 'triCode': team['triCode']} for side, team in teams.items()},
+            'players': players,
+        },
+        'liveData': {'plays': {'allPlays': plays}},
+    }
+    shift_json = {'data': [], 'total': len(shift_rows)}
+    for number, (side, player, period, start, end) in enumerate(shift_rows, start=1):
+        shift_json['data'].append({
+            'id': number,
+            'duration': to_clock(end - start),
+            'startTime': to_clock(start),
+            'endTime': to_clock(end),
+            'firstName': player['firstName'],
+            'lastName': player['lastName'],
+            'gameId': game_id,
+            'homeScore': goals['home'],
+            'visitingScore': goals['away'],
+            'period': period,
+            'playerId': player['id'],
+            'shiftNumber': number,
+            'teamAbbrev': teams[side]['triCode'],
+            'teamId': teams[side]['id'],
+        })
+    return game_json, shift_json
+
+
+def write_synthetic_game(game_id, game_dir='games/', shift_dir='shifts/', **sizes):
+    """
+    Writes the synthetic game into the same game_<id>.json / shift_<id>.json layout as driver.save_json_data
+    """
+    game_json, shift_json = build_synthetic_game(game_id, **sizes)
+    os.makedirs(game_dir, exist_ok=True)
+    os.makedirs(shift_dir, exist_ok=True)
+    with open(os.path.join(game_dir, f"game_{game_id}.json"), 'w') as of:
+        json.dump(game_json, of)
+    with open(os.path.join(shift_dir, f"shift_{game_id}.json"), 'w') as of:
+        json.dump(shift_json, of)
+    return game_json, shift_json
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic game/shift JSON pairs")
+    parser.add_argument('game_ids', type=int, nargs='+')
+    parser.add_argument('--game-dir', default='games/')
+    parser.add_argument('--shift-dir', default='shifts/')
+    parser.add_argument('--events', type=int, default=300)
+    parser.add_argument('--shifts', type=int, default=700)
+    parser.add_argument('--overtime-periods', type=int, default=0)
+    parser.add_argument('--roster-size', type=int, default=20)
+    args = parser.parse_args()
+    for synthetic_id in args.game_ids:
+        write_synthetic_game(synthetic_id, args.game_dir, args.shift_dir, events=args.events, shifts=args.shifts,
+                             overtime_periods=args.overtime_periods, roster_size=args.roster_size)
@@ -1,4 +1,6 @@
+from pynhl.archive import open_archive
 from pynhl.game import Game
+from pynhl.stream import stream_game_feed, stream_shift_chart
 import requests, json, cProfile, pstats, memory_profiler
 from bs4 import BeautifulSoup
 from io import StringIO, BytesIO
@@ -23,21 +25,40 @@ def print_profiler(profiler):
     return prof_stream.getvalue()
 
 
-def read_json_data(filename_to_read, is_game=True):
+def get_json_path(game_num, is_game=True, game_dir='games/', shift_dir='shifts/'):
+    '''
+    Path of the saved game or shift JSON for game_num
+    '''
+    if is_game:
+        return "{}game_{}.json".format(game_dir, game_num)
+    return "{}shift_{}.json".format(shift_dir, game_num)
+
+
+def read_json_data(filename_to_read, is_game=True, game_dir='games/', shift_dir='shifts/', archive=None):
     '''
     Read saved JSON data, from a requests.get(GAME_ID) that is unchanged from source
     is_game determines whether or not to read game data or shift data, which are in separate dirs
     where each file is suffixed with the NHL GAME NUM used in the NHL API
+    archive is the path of a packed season archive (pynhl/archive.py) to read from instead of the dirs
     '''
-    if is_game:
-        filename_to_read = "games/game_{}.json".format(filename_to_read)
-    else:
-        filename_to_read = "shifts/shift_{}.json".format(filename_to_read)
+    if archive:
+        return open_archive(archive).read(filename_to_read, is_game)
+    filename_to_read = get_json_path(filename_to_read, is_game, game_dir, shift_dir)
     with open(filename_to_read) as json_file:
         data = json.load(json_file)
     return data
 
 
+def stream_json_data(filename_to_read, is_game=True, game_dir='games/', shift_dir='shifts/'):
+    '''
+    Incremental version of read_json_data, only the parts of the document Game uses are built
+    Plays / shift rows are yielded as they are read, so must be consumed before anything else reads the file
+    '''
+    if is_game:
+        return stream_game_feed(get_json_path(filename_to_read, True, game_dir, shift_dir))
+    return stream_shift_chart(get_json_path(filename_to_read, False, game_dir, shift_dir))
+
+
 def save_json_data(json_data, is_game, game_num, game_dir='games/', shift_dir='shifts/'):
     '''
     Function that saves the JSON data to local dir
@@ -75,5 +96,5 @@ if __name__ == "__main__":
 
     curr_game_shifts = read_json_data(NHL_GAME_NUM, is_game=False)
     curr_game = read_json_data(NHL_GAME_NUM)
-    parsed_game = Game(curr_game, curr_game_shifts)
+    parsed_game = Game(curr_game, curr_game_shifts).run_stages()
     print(print_profiler(profiler))
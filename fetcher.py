@@ -0,0 +1,152 @@
+'''
+Fetches live-feed and shift-chart documents for a range of games concurrently, saving them to games/ and shifts/
+ie python fetcher.py 2019020001 2019021271 --concurrency 8 --rate 10
+'''
+from driver import get_json_path, save_json_data
+import aiohttp, argparse, asyncio, json, os, random, time
+
+NHL_API_URL = 'http://statsapi.web.nhl.com/api/v1/game/{}/feed/live'
+NHL_SHIFT_URL = 'https://api.nhle.com/stats/rest/en/shiftcharts?cayenneExp=gameId={}'
+
+# ETag / Last-Modified of every saved document, kept next to the documents so re-runs can ask for changes only
+VALIDATORS_FILE = '.validators.json'
+
+# Statuses worth retrying, anything else is reported as a failure straight away
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableStatus(Exception):
+    pass
+
+
+class RateLimiter:
+    """
+    Spaces out request starts so no more than rate requests begin per second
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_start = 0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def load_validators(directory):
+    try:
+        with open(os.path.join(directory, VALIDATORS_FILE)) as validators_file:
+            return json.load(validators_file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_validators(directory, validators):
+    with open(os.path.join(directory, VALIDATORS_FILE), 'w') as validators_file:
+        json.dump(validators, validators_file)
+
+
+async def fetch_document(session, url, validators, limiter, retries=4, backoff=0.5):
+    """
+    GETs url, conditional on the validators from the last fetch of url
+    Returns the JSON document, or None when the server says it has not changed
+    Retries connection errors and RETRY_STATUSES with exponential backoff and jitter
+    """
+    headers = {}
+    if url in validators:
+        if validators[url].get('etag'):
+            headers['If-None-Match'] = validators[url]['etag']
+        if validators[url].get('last_modified'):
+            headers['If-Modified-Since'] = validators[url]['last_modified']
+    for attempt in range(retries + 1):
+        await limiter.wait()
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304:
+                    return None
+                if response.status in RETRY_STATUSES:
+                    raise RetryableStatus(f"HTTP {response.status}")
+                response.raise_for_status()
+                document = await response.json(content_type=None)
+                validators[url] = {'etag': response.headers.get('ETag'),
+                                   'last_modified': response.headers.get('Last-Modified')}
+                return document
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError,
+                RetryableStatus):
+            if attempt == retries:
+                raise
+            await asyncio.sleep(backoff * 2 ** attempt * (1 + random.random()))
+
+
+async def fetch_and_save(session, game_num, is_game, url, validators, limiter, game_dir, shift_dir):
+    """
+    Fetches one document and writes it through driver.save_json_data
+    Returns 'saved', 'unchanged' or the error
+    """
+    if not os.path.isfile(get_json_path(game_num, is_game, game_dir, shift_dir)):
+        # Nothing on disk to keep, so ask for the whole document
+        validators.pop(url, None)
+    try:
+        document = await fetch_document(session, url, validators, limiter)
+    except Exception as err:
+        return f"{type(err).__name__}: {err}"
+    if document is None:
+        return 'unchanged'
+    # Disk writes happen off the event loop
+    await asyncio.to_thread(save_json_data, document, is_game, game_num, game_dir, shift_dir)
+    return 'saved'
+
+
+async def fetch_games(game_ids, game_dir='games/', shift_dir='shifts/', concurrency=8, rate=10.0,
+                      live_url=NHL_API_URL, shift_url=NHL_SHIFT_URL, timeout=30):
+    """
+    Fetches both documents of every game over one pooled session
+    concurrency bounds the open connections, rate bounds the requests started per second
+    Returns {game_num: {'game': status, 'shift': status}}
+    """
+    os.makedirs(game_dir, exist_ok=True)
+    os.makedirs(shift_dir, exist_ok=True)
+    validators = {'game': load_validators(game_dir), 'shift': load_validators(shift_dir)}
+    limiter = RateLimiter(rate)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        tasks = {}
+        for game_num in game_ids:
+            tasks[game_num, 'game'] = fetch_and_save(session, game_num, True, live_url.format(game_num),
+                                                     validators['game'], limiter, game_dir, shift_dir)
+            tasks[game_num, 'shift'] = fetch_and_save(session, game_num, False, shift_url.format(game_num),
+                                                      validators['shift'], limiter, game_dir, shift_dir)
+        statuses = await asyncio.gather(*tasks.values())
+    save_validators(game_dir, validators['game'])
+    save_validators(shift_dir, validators['shift'])
+    report = {}
+    for (game_num, feed), status in zip(tasks, statuses):
+        report.setdefault(game_num, {})[feed] = status
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch live-feed and shift-chart JSON for a range of games")
+    parser.add_argument('first_game', type=int)
+    parser.add_argument('last_game', type=int, nargs='?', help="Inclusive, defaults to first_game")
+    parser.add_argument('--game-dir', default='games/')
+    parser.add_argument('--shift-dir', default='shifts/')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=10.0, help="Requests started per second, 0 for no limit")
+    parser.add_argument('--base-url', default=None,
+                        help="Fetch from a stand-in server (testing/standin_server.py) instead of the NHL APIs")
+    args = parser.parse_args()
+
+    urls = {}
+    if args.base_url:
+        urls = {'live_url': args.base_url + '/api/v1/game/{}/feed/live',
+                'shift_url': args.base_url + '/stats/rest/en/shiftcharts?cayenneExp=gameId={}'}
+    fetched = asyncio.run(fetch_games(range(args.first_game, (args.last_game or args.first_game) + 1),
+                                      args.game_dir, args.shift_dir, args.concurrency, args.rate, **urls))
+    for fetched_game, fetched_status in fetched.items():
+        print(f"{fetched_game}: game {fetched_status['game']}, shift {fetched_status['shift']}")
@@ -0,0 +1,138 @@
+'''
+Packed season archive, one file holding the compressed game and shift documents of many games
+Layout: MAGIC | zlib blobs ... | JSON index | index offset (8 bytes) | index length (8 bytes) | MAGIC
+The index maps "<game id>" -> {"game": [offset, length], "shift": [offset, length]}
+'''
+import argparse, json, mmap, os, re, struct, zlib
+
+MAGIC = b"PYNHLPK1"
+FOOTER = struct.Struct("<QQ8s")
+FEEDS = ('game', 'shift')
+
+# Archives opened by this process, path : SeasonArchive, so repeated reads don't re-open / re-map the file
+OPEN_ARCHIVES = {}
+
+
+class SeasonArchive:
+    """
+    Read access to a packed season archive through a read-only memory map
+    Only the blobs of the games asked for are read and decompressed
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.archive_file = open(path, 'rb')
+        self.mapped = mmap.mmap(self.archive_file.fileno(), 0, access=mmap.ACCESS_READ)
+        index_offset, index_length, magic = FOOTER.unpack(self.mapped[-FOOTER.size:])
+        if magic != MAGIC or self.mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a season archive")
+        self.index = json.loads(self.mapped[index_offset:index_offset + index_length])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, game_id):
+        return str(game_id) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __str__(self):
+        return f"SeasonArchive: {self.path} {len(self)} games"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def close(self):
+        self.mapped.close()
+        self.archive_file.close()
+
+    def game_ids(self):
+        return sorted(int(game_id) for game_id in self.index)
+
+    def get_blob(self, game_id, is_game=True):
+        """
+        Compressed bytes of one document, raises KeyError for games / feeds not in the archive
+        """
+        offset, length = self.index[str(game_id)]['game' if is_game else 'shift']
+        return self.mapped[offset:offset + length]
+
+    def read(self, game_id, is_game=True):
+        """
+        The JSON document of one game, the same as driver.read_json_data returns for the directory layout
+        """
+        return json.loads(zlib.decompress(self.get_blob(game_id, is_game)))
+
+
+def open_archive(path):
+    """
+    SeasonArchive for path, opened once per process
+    """
+    if path not in OPEN_ARCHIVES:
+        OPEN_ARCHIVES[path] = SeasonArchive(path)
+    return OPEN_ARCHIVES[path]
+
+
+def pack_documents(path, documents, level=6):
+    """
+    Writes an archive from (game_id, is_game, json document) tuples
+    Documents are stored as compact JSON, so pretty-printed inputs shrink before compressing
+    """
+    index = {}
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as archive_file:
+        archive_file.write(MAGIC)
+        for game_id, is_game, document in documents:
+            blob = zlib.compress(json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                                 level)
+            index.setdefault(str(game_id), {})['game' if is_game else 'shift'] = [archive_file.tell(), len(blob)]
+            archive_file.write(blob)
+        index_offset = archive_file.tell()
+        index_bytes = json.dumps(index, separators=(',', ':')).encode('utf-8')
+        archive_file.write(index_bytes)
+        archive_file.write(FOOTER.pack(index_offset, len(index_bytes), MAGIC))
+    os.replace(temp_path, path)
+    # The replaced file stays mapped until its archive is closed
+    archive = OPEN_ARCHIVES.pop(path, None)
+    if archive:
+        archive.close()
+    return index
+
+
+def pack_directories(path, game_dir='games/', shift_dir='shifts/', game_ids=None, level=6):
+    """
+    Packs the game_<id>.json / shift_<id>.json pairs of game_dir / shift_dir (or only game_ids) into one archive
+    """
+    if game_ids is None:
+        game_ids = sorted(int(match.group(1)) for match in
+                          (re.match(r"^game_(\d+)\.json$", name) for name in os.listdir(game_dir)) if match)
+
+    def documents():
+        for game_id in game_ids:
+            for is_game, file_name in ((True, os.path.join(game_dir, f"game_{game_id}.json")),
+                                       (False, os.path.join(shift_dir, f"shift_{game_id}.json"))):
+                if os.path.isfile(file_name):
+                    with open(file_name, encoding='utf-8') as json_file:
+                        yield game_id, is_game, json.load(json_file)
+
+    return pack_documents(path, documents(), level)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack games/ and shifts/ into a season archive, or list one")
+    parser.add_argument('command', choices=('pack', 'list'))
+    parser.add_argument('archive')
+    parser.add_argument('--game-dir', default='games/')
+    parser.add_argument('--shift-dir', default='shifts/')
+    parser.add_argument('--level', type=int, default=6, help="zlib compression level")
+    args = parser.parse_args()
+    if args.command == 'pack':
+        packed = pack_directories(args.archive, args.game_dir, args.shift_dir, level=args.level)
+        print(f"Packed {len(packed)} games into {args.archive} ({os.path.getsize(args.archive)} bytes)")
+    else:
+        with SeasonArchive(args.archive) as season_archive:
+            for archived_id in season_archive.game_ids():
+                print(archived_id, ', '.join(sorted(season_archive.index[str(archived_id)])))
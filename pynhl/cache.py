@@ -0,0 +1,173 @@
+import hashlib, os, pickle, zlib
+
+# Bump whenever parsing in Game/Event/Shift/Player changes, entries from older versions are dropped
+CACHE_SCHEMA_VERSION = 10
+
+CACHE_MAGIC = b"PYNHL"
+CACHE_SUFFIX = ".game"
+
+OPEN_CACHES = {}  # (cache class, cache dir) : cache, one per process
+
+
+class GameCache:
+    """
+    On-disk cache of parsed Game objects
+    Entries are keyed by game id, a hash of the game/shift JSON files and CACHE_SCHEMA_VERSION
+    Each entry is a zlib compressed pickle, the directory is kept under max_bytes by evicting least recently used
+    Subclasses cache other per game results by setting their own SCHEMA_VERSION / SUFFIX
+    Nothing scans the directory up front, call purge_stale() once per run (ie in the parent process)
+    """
+    SCHEMA_VERSION = CACHE_SCHEMA_VERSION
+    SUFFIX = CACHE_SUFFIX
+    # Stores between scans of the directory, in between only this process's own writes are added to the total
+    SCAN_EVERY = 64
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Bytes in the directory as of the last scan plus the entries stored since, None before the first scan
+        self.total_bytes = None
+        self.stores_since_scan = 0
+
+    def __str__(self):
+        return f"{type(self).__name__}: {self.cache_dir} v{self.SCHEMA_VERSION}"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @staticmethod
+    def hash_files(*file_names):
+        """
+        Content hash of the input files, so a re-fetched game never hits an old entry
+        """
+        digest = hashlib.sha256()
+        for file_name in file_names:
+            with open(file_name, 'rb') as input_file:
+                for block in iter(lambda: input_file.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()[:24]
+
+    def get_path(self, game_id, content_hash):
+        return os.path.join(self.cache_dir, f"{game_id}-v{self.SCHEMA_VERSION}-{content_hash}{self.SUFFIX}")
+
+    def entries(self):
+        """
+        Yields (path, os.stat_result) of every entry in the cache dir
+        """
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(self.SUFFIX):
+                path = os.path.join(self.cache_dir, file_name)
+                try:
+                    yield path, os.stat(path)
+                except FileNotFoundError:
+                    # Evicted by another worker sharing the directory
+                    continue
+
+    def purge_stale(self):
+        """
+        Removes entries written by a different SCHEMA_VERSION
+        """
+        current = f"-v{self.SCHEMA_VERSION}-"
+        for path, _ in list(self.entries()):
+            if current not in os.path.basename(path):
+                self.remove(path)
+        return self
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def load(self, game_id, content_hash):
+        """
+        Returns the cached Game (or other entry), None on a miss / unreadable entry
+        """
+        path = self.get_path(game_id, content_hash)
+        try:
+            with open(path, 'rb') as cache_file:
+                data = cache_file.read()
+        except FileNotFoundError:
+            return None
+        header = CACHE_MAGIC + self.SCHEMA_VERSION.to_bytes(2, 'big')
+        if not data.startswith(header):
+            self.remove(path)
+            return None
+        try:
+            game = pickle.loads(zlib.decompress(data[len(header):]))
+        except (zlib.error, pickle.UnpicklingError, EOFError):
+            self.remove(path)
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return game
+
+    def store(self, game, content_hash, game_id=None):
+        """
+        Writes the Game for content_hash, then evicts down to max_bytes
+        game_id is only needed for entries without a game_id attribute
+        """
+        path = self.get_path(game.game_id if game_id is None else game_id, content_hash)
+        data = CACHE_MAGIC + self.SCHEMA_VERSION.to_bytes(2, 'big') + \
+            zlib.compress(pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL))
+        # Write then rename, so readers on the shared disk never see half an entry
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as cache_file:
+            cache_file.write(data)
+        os.replace(temp_path, path)
+        if self.total_bytes is None or self.stores_since_scan >= self.SCAN_EVERY:
+            # Picks up the entries other workers sharing the directory wrote
+            self.evict()
+        else:
+            self.total_bytes += len(data)
+            self.stores_since_scan += 1
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        return path
+
+    def evict(self):
+        """
+        Scans the directory, removing least recently used entries until the cache is under max_bytes
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= stat.st_size
+        self.total_bytes, self.stores_since_scan = total, 0
+        return self
+
+    @staticmethod
+    def hash_bytes(*blobs):
+        """
+        Content hash of inputs already in memory, ie documents from a season archive
+        """
+        digest = hashlib.sha256()
+        for blob in blobs:
+            digest.update(blob)
+        return digest.hexdigest()[:24]
+
+    def get_game(self, game_id, content_hash, build):
+        """
+        Returns the cached Game for content_hash (see hash_files / hash_bytes), calling build() and caching
+        the result on a miss
+        """
+        game = self.load(game_id, content_hash)
+        if game is None:
+            game = build()
+            self.store(game, content_hash)
+        return game
+
+
+def open_cache(cache_dir, cache_class=GameCache):
+    """
+    cache_class (GameCache or a subclass) for cache_dir, made once per process so its running size total is kept
+    between games
+    """
+    if (cache_class, cache_dir) not in OPEN_CACHES:
+        OPEN_CACHES[cache_class, cache_dir] = cache_class(cache_dir)
+    return OPEN_CACHES[cache_class, cache_dir]
@@ -1,19 +1,27 @@
-import datetime, bisect, pynhl.helpers as helpers
+import pynhl.helpers as helpers
 
 
 class Event:
     '''
     Class handling all necessary attributes of an EVENT from the NHL Game Data API
     '''
+    __slots__ = ('event_json', 'type_of_event', 'roster', 'home_on_ice', 'away_on_ice', 'team_of_player',
+                 'other_team', 'period', 'time', 'game_time', 'sort_key', 'x_loc', 'y_loc', 'score', 'strength',
+                 'penalty_duration', 'home_involved', 'away_involved') + tuple(helpers.TIME_SINCE_FEATURES)
 
-    def __init__(self, event_json, home, away):
+    def __init__(self, event_json, home, away, roster):
         self.event_json = event_json
         self.type_of_event = self.get_type()
-        self.players_on = {}  # Team : set(of players)
+        # Players are bits of the game's RosterIndex, one int mask per team
+        self.roster = roster
+        self.home_on_ice = self.away_on_ice = 0
         self.team_of_player = self.get_team()
         self.other_team = away if self.team_of_player == home else home
         self.period = self.get_period()
-        self.time = self.get_time()
+        self.time = self.get_time()  # Seconds into the period
+        self.game_time = helpers.game_second(self.period, self.time)
+        # Order used to sort and bisect events, events at the same second keep the order of the feed
+        self.sort_key = (self.period, self.time)
         self.x_loc = self.get_x()
         self.y_loc = self.get_y()
         self.score = self.get_score()
@@ -23,51 +31,76 @@ class Event:
         except KeyError:
             self.penalty_duration = None
         # Null event_json after all necessary information is fetched, to save memory during runtime
-        self.players_involved = {home: set(), away: set()}
-        self.get_involved_players()  # Team : set(of players)
+        self.home_involved = self.away_involved = 0
+        self.get_involved_players()
         self.event_json = None
-        # Features
-        self.time_since_last_event = None  # seconds
-        self.time_since_last_shot = None  # seconds
-        '''
-        Flip coordinates for HOME and AWAY differences (so the player graph cna use it asap)
-        Calculate distance to center of goal from X/Y for each event
-        '''
-
+        # Features, seconds
+        for feature in helpers.TIME_SINCE_FEATURES:
+            setattr(self, feature, None)
+        # Rink normalized coordinates and distance / angle to the net are computed for whole columns of events,
+        # see pynhl.location
+
+    # Comparisons order by helpers.BY_EVENT_ORDER, the same as pynhl.store.EventView, so the two compare together
+    # Sorting and bisecting the events of a game use helpers.BY_SORT_KEY instead, keeping the order of the feed
     def __lt__(self, other):
         if isinstance(other, Event):
-            return self.period < other.period and self.time < other.time
-        elif isinstance(other, datetime.time):
-            return self.time < other
-        elif isinstance(other, int):
-            # Checking for periods
-            return self.period < other
-        elif other.start:
-            # For Shift & Event comparison, avoids circular import
-            if self.period == other.period:
-                return self.time < other.start
-            else:
-                return self.period < other.period
+            return helpers.BY_EVENT_ORDER(self) < helpers.BY_EVENT_ORDER(other)
+        return NotImplemented
 
     def __gt__(self, other):
-        return not self.__lt__(other)
+        if isinstance(other, Event):
+            return helpers.BY_EVENT_ORDER(self) > helpers.BY_EVENT_ORDER(other)
+        return NotImplemented
 
     def __eq__(self, other):
         if isinstance(other, Event):
-            return self.type_of_event == other.type_of_event and self.period == other.period and self.time == other.time
-        else:
-            raise NotImplementedError("What to do here, yo {}".format(other))
+            return helpers.BY_EVENT_ORDER(self) == helpers.BY_EVENT_ORDER(other)
+        return NotImplemented
 
     def __hash__(self):
-        return hash(self.type_of_event) + hash(self.period) + hash(self.time)
+        return hash(helpers.BY_EVENT_ORDER(self))
 
     def __str__(self):
         return (f"Team: {self.team_of_player}, "
-                f"Event: {self.type_of_event}, Time: {self.period}:{self.time}, X : {self.x_loc}, Y: {self.y_loc}")
+                f"Event: {self.type_of_event}, Time: {self.period}:{helpers.seconds_to_minutes(self.time)}, X : {self.x_loc}, Y: {self.y_loc}")
 
     def __repr__(self):
         return self.__str__()
 
+    @property
+    def players_on(self):
+        """
+        Team : set(of players) on the ice for the event, decoded from the on-ice masks
+        """
+        return {self.roster.home_team: self.roster.players(self.home_on_ice),
+                self.roster.away_team: self.roster.players(self.away_on_ice)}
+
+    @players_on.setter
+    def players_on(self, players_on):
+        self.home_on_ice = self.roster.mask(players_on.get(self.roster.home_team, ()))
+        self.away_on_ice = self.roster.mask(players_on.get(self.roster.away_team, ()))
+
+    @property
+    def players_involved(self):
+        """
+        Team : set(of players) who did / received the event
+        """
+        return {self.roster.home_team: self.roster.players(self.home_involved),
+                self.roster.away_team: self.roster.players(self.away_involved)}
+
+    def on_ice_mask(self, team):
+        return self.home_on_ice if team == self.roster.home_team else self.away_on_ice
+
+    def involved_mask(self, team):
+        return self.home_involved if team == self.roster.home_team else self.away_involved
+
+    def add_involved_player(self, team, player_name):
+        if team == self.roster.home_team:
+            self.home_involved |= self.roster.flag(player_name)
+        else:
+            self.away_involved |= self.roster.flag(player_name)
+        return self
+
     def transform_score(self):
         """
         Convert tuple of (PLAYERS_TEAM_SCORE,OTHER_TEAMS_SCORE) -> -(integer) if down, 0 if tied, +(integer) if leading
@@ -98,23 +131,23 @@ class Event:
             '''
             # Swap teams, blocked shot API is related to the blocker, not the shooter
             self.team_of_player, self.other_team = self.other_team, self.team_of_player
-            self.players_involved[self.team_of_player].add(self.event_json['players'][1]['player']['fullName'])
-            self.players_involved[self.other_team].add(self.event_json['players'][0]['player']['fullName'])
+            self.add_involved_player(self.team_of_player, self.event_json['players'][1]['player']['fullName'])
+            self.add_involved_player(self.other_team, self.event_json['players'][0]['player']['fullName'])
         elif "Goal" in self.type_of_event:
             # A goal may have 0, 1 or 2 assists
             for p in self.event_json['players']:
                 if p['player']['fullName'] in self.event_json['result']['description']:
-                    self.players_involved[self.team_of_player].add(p['player']['fullName'])
+                    self.add_involved_player(self.team_of_player, p['player']['fullName'])
                 else:
-                    self.players_involved[self.other_team].add(p['player']['fullName'])
+                    self.add_involved_player(self.other_team, p['player']['fullName'])
         elif 'Missed' in self.type_of_event or 'Giveaway' in self.type_of_event or "Takeaway" in self.type_of_event:
             # These three events involve only one player
-            self.players_involved[self.team_of_player].add(self.event_json['players'][0]['player']['fullName'])
+            self.add_involved_player(self.team_of_player, self.event_json['players'][0]['player']['fullName'])
         else:
             # Faceoff, Shot, Penalty, Hit
-            self.players_involved[self.team_of_player].add(self.event_json['players'][0]['player']['fullName'])
+            self.add_involved_player(self.team_of_player, self.event_json['players'][0]['player']['fullName'])
             try:
-                self.players_involved[self.other_team].add(self.event_json['players'][1]['player']['fullName'])
+                self.add_involved_player(self.other_team, self.event_json['players'][1]['player']['fullName'])
             except IndexError:
                 # Delay of game penalty, only one player involved here
                 print(self.event_json['result']['description'])
@@ -139,7 +172,7 @@ class Event:
         Returns the time, in seconds, when the event occurred
         MM:SS -> SS
         """
-        self.time = datetime.datetime.strptime(self.event_json['about']['periodTime'], "%M:%S").time()
+        self.time = helpers.convert_to_seconds(self.event_json['about']['periodTime'])
         return self.time
 
     def get_score(self):
@@ -150,16 +183,16 @@ class Event:
 
     def get_x(self):
         """
-        Return x coordinate from event
+        Return x coordinate from event, None when the event has no coordinates
         """
-        self.x_loc = self.event_json['coordinates']['x']
+        self.x_loc = self.event_json.get('coordinates', {}).get('x')
         return self.x_loc
 
     def get_y(self):
         """
-        Return y value from event
+        Return y value from event, None when the event has no coordinates
         """
-        self.y_loc = self.event_json['coordinates']['y']
+        self.y_loc = self.event_json.get('coordinates', {}).get('y')
         return self.y_loc
 
     def determine_event_state(self, home, away):
@@ -167,54 +200,5 @@ class Event:
         Determines the number of skaters on for the event BASED ON HOME v AWAY
         6v5 / 5v5 / 4v4 / 5v4 / 4v3 / etc
         """
-        self.strength = f"{len(self.players_on[home])}v{len(self.players_on[away])}"
-        return self
-
-    def calculate_time_since_shot(self, events):
-        """
-        Iterates in reverse order from events, finding hte first "SHOT" type
-        subtracts that time difference (if different periods, return will be -1)
-        Will also set the time_since_last_event category, it does all the leg work anyways
-        """
-        for e in reversed(events):
-            if not self.time_since_last_event:
-                if e.period == self.period:
-                    self.time_since_last_event = helpers.subtract_two_time_objects(e.time, self.time)
-                else:
-                    self.time_since_last_event = -1
-            if "Shot" in e.type_of_event or "Goal" in e.type_of_event:
-                if e.period == self.period:
-                    self.time_since_last_shot = helpers.subtract_two_time_objects(e.time, self.time)
-                else:
-                    self.time_since_last_shot = -1
-                break
-        #
-        if not self.time_since_last_shot:
-            self.time_since_last_shot = -1
-        if not self.time_since_last_event:
-            self.time_since_last_event = -1
-        return self
-
-    def get_players_for_event(self, shifts_for_player):
-        """
-        Determine which players are on the ice for the event (self)
-        Input is the shifts for a given player
-        Based off this, see if there's a shift for the player during the event
-        """
-        finder = bisect.bisect_right(shifts_for_player, self)  # Returns index in shifts_for_player
-        if finder != 0:
-            finder -= 1
-        shift_start = shifts_for_player[finder]
-        if helpers.time_check_event(self.time, shift_start.start, shift_start.end, self.type_of_event):
-            self.assign_player_to_event(shift_start.player, shift_start.team)
-        return self
-
-    def assign_player_to_event(self, player_name, team_of_player):
-        """
-        Helper function to assign player to the correct team
-        Previous functions DETERMINE whether player SHOULD be added to event or not
-        """
-        if team_of_player not in self.players_on:
-            self.players_on[team_of_player] = set()
-        self.players_on[team_of_player].add(player_name)
+        self.strength = f"{self.on_ice_mask(home).bit_count()}v{self.on_ice_mask(away).bit_count()}"
         return self
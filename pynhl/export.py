@@ -0,0 +1,215 @@
+'''
+Columnar export of parsed games to Parquet / Arrow IPC files, one record batch per game and table
+Files are partitioned like <out_dir>/<table>/season=<season>/game_id=<game id>/part-0.parquet, so a season's events
+can be scanned with pyarrow.dataset without building any Game
+'''
+from pynhl.store import EVENT_TYPES
+import pynhl.helpers as helpers
+import numpy, os
+import pyarrow
+import pyarrow.dataset
+import pyarrow.ipc
+import pyarrow.parquet
+
+FILE_FORMATS = {'parquet': 'parquet', 'arrow': 'arrow'}  # Format : file extension
+
+EVENT_SCHEMA = pyarrow.schema([
+    ('game_id', pyarrow.int64()),
+    ('event_index', pyarrow.int32()),
+    ('period', pyarrow.int8()),
+    ('time', pyarrow.int16()),
+    ('game_time', pyarrow.int32()),
+    ('type_of_event', pyarrow.string()),
+    ('team', pyarrow.string()),
+    ('strength', pyarrow.string()),
+    ('home_score', pyarrow.int8()),
+    ('away_score', pyarrow.int8()),
+    ('x_loc', pyarrow.float32()),
+    ('y_loc', pyarrow.float32()),
+    # Rink normalized, see pynhl.location
+    ('x', pyarrow.float32()),
+    ('y', pyarrow.float32()),
+    ('distance', pyarrow.float32()),
+    ('angle', pyarrow.float32()),
+    # Masks of the bits in the game's players table
+    ('home_on_ice', pyarrow.uint64()),
+    ('away_on_ice', pyarrow.uint64()),
+    ('home_involved', pyarrow.uint64()),
+    ('away_involved', pyarrow.uint64()),
+] + [(feature, pyarrow.int16()) for feature in helpers.TIME_SINCE_FEATURES])
+
+PLAYER_SCHEMA = pyarrow.schema([
+    ('game_id', pyarrow.int64()),
+    ('bit', pyarrow.int8()),
+    ('player_id', pyarrow.int64()),
+    ('name', pyarrow.string()),
+    ('team', pyarrow.string()),
+    ('position', pyarrow.string()),
+])
+
+SHIFT_SCHEMA = pyarrow.schema([
+    ('game_id', pyarrow.int64()),
+    ('player_id', pyarrow.int64()),
+    ('player', pyarrow.string()),
+    ('team', pyarrow.string()),
+    ('period', pyarrow.int8()),
+    ('start', pyarrow.int16()),
+    ('end', pyarrow.int16()),
+    ('duration', pyarrow.int16()),
+    ('score', pyarrow.int8()),
+])
+
+SHARED_TOI_SCHEMA = pyarrow.schema([
+    ('game_id', pyarrow.int64()),
+    ('player_id', pyarrow.int64()),
+    ('other_id', pyarrow.int64()),
+    ('player', pyarrow.string()),
+    ('other', pyarrow.string()),
+    ('strength', pyarrow.string()),
+    ('seconds', pyarrow.int32()),
+])
+
+TABLES = {'events': EVENT_SCHEMA, 'players': PLAYER_SCHEMA, 'shifts': SHIFT_SCHEMA, 'shared_toi': SHARED_TOI_SCHEMA}
+
+
+def float_column(values):
+    """
+    float32 arrow column with NaN as null
+    """
+    values = numpy.asarray(values, dtype=numpy.float32)
+    return pyarrow.array(values, mask=numpy.isnan(values))
+
+
+def get_event_batch(game):
+    store, locations = game.event_store, game.location_features
+    n = len(store)
+    period = numpy.asarray(store.period, dtype=numpy.int8)
+    time = numpy.asarray(store.time, dtype=numpy.int16)
+    columns = [
+        pyarrow.array(numpy.full(n, game.game_id, dtype=numpy.int64)),
+        pyarrow.array(numpy.arange(n, dtype=numpy.int32)),
+        pyarrow.array(period),
+        pyarrow.array(time),
+        pyarrow.array(helpers.game_second(period.astype(numpy.int32), time.astype(numpy.int32))),
+        pyarrow.array([EVENT_TYPES[code] for code in store.type_code], pyarrow.string()),
+        pyarrow.array([store.teams[code] for code in store.team_code], pyarrow.string()),
+        pyarrow.array([store.strengths[code] for code in store.strength_code], pyarrow.string()),
+        pyarrow.array(numpy.asarray(store.home_score, dtype=numpy.int8)),
+        pyarrow.array(numpy.asarray(store.away_score, dtype=numpy.int8)),
+        float_column(store.x_loc),
+        float_column(store.y_loc),
+    ] + [float_column(locations[feature]) for feature in ('x', 'y', 'distance', 'angle')] + [
+        pyarrow.array(numpy.asarray(getattr(store, mask), dtype=numpy.uint64))
+        for mask in ('home_on_ice', 'away_on_ice', 'home_involved', 'away_involved')
+    ] + [pyarrow.array(numpy.asarray(store.features[feature], dtype=numpy.int16))
+         for feature in helpers.TIME_SINCE_FEATURES]
+    return pyarrow.RecordBatch.from_arrays(columns, schema=EVENT_SCHEMA)
+
+
+def get_player_batch(game):
+    """
+    Every bit of the game's RosterIndex, players without a shift have no id / team / position
+    """
+    rows = []
+    for bit, name in enumerate(game.roster.names):
+        player = game.players.get(name)
+        rows.append({'game_id': game.game_id, 'bit': bit, 'name': name,
+                     'player_id': player.player_id if player else None,
+                     'team': player.team if player else None,
+                     'position': player.position if player else None})
+    return pyarrow.RecordBatch.from_pylist(rows, schema=PLAYER_SCHEMA)
+
+
+def get_shift_batch(game):
+    store = game.shift_store
+    player_ids = numpy.array([game.players[name].player_id for name in store.players] or [0], dtype=numpy.int64)
+    player_code = numpy.asarray(store.player_code, dtype=numpy.intp)
+    columns = [
+        pyarrow.array(numpy.full(len(store), game.game_id, dtype=numpy.int64)),
+        pyarrow.array(player_ids[player_code]),
+        pyarrow.array([store.players[code] for code in player_code], pyarrow.string()),
+        pyarrow.array([store.teams[code] for code in store.team_code], pyarrow.string()),
+        pyarrow.array(numpy.asarray(store.period, dtype=numpy.int8)),
+        pyarrow.array(numpy.asarray(store.start, dtype=numpy.int16)),
+        pyarrow.array(numpy.asarray(store.end, dtype=numpy.int16)),
+        pyarrow.array(numpy.asarray(store.duration, dtype=numpy.int16)),
+        pyarrow.array(numpy.asarray(store.score, dtype=numpy.int8)),
+    ]
+    return pyarrow.RecordBatch.from_arrays(columns, schema=SHIFT_SCHEMA)
+
+
+def get_shared_toi_batch(game):
+    """
+    One row per (player, teammate, strength), strengths from the player's team perspective
+    """
+    rows = []
+    for name, others in game.shared_toi.items():
+        for other, strengths in others.items():
+            for strength, seconds in strengths.items():
+                rows.append({'game_id': game.game_id, 'player_id': game.players[name].player_id,
+                             'other_id': game.players[other].player_id, 'player': name, 'other': other,
+                             'strength': strength, 'seconds': seconds})
+    return pyarrow.RecordBatch.from_pylist(rows, schema=SHARED_TOI_SCHEMA)
+
+
+BATCHES = {'events': get_event_batch, 'players': get_player_batch, 'shifts': get_shift_batch,
+           'shared_toi': get_shared_toi_batch}
+
+
+def get_partition_path(out_dir, table, season, game_id, file_format='parquet'):
+    return os.path.join(out_dir, table, f"season={season}", f"game_id={game_id}",
+                        f"part-0.{FILE_FORMATS[file_format]}")
+
+
+def write_batch(batch, path, file_format='parquet'):
+    """
+    Writes one record batch to path, through a temp file so readers never see half a partition
+    The temp file starts with a dot, which pyarrow.dataset skips when discovering files
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    if file_format == 'parquet':
+        with pyarrow.parquet.ParquetWriter(temp_path, batch.schema) as writer:
+            writer.write_batch(batch)
+    else:
+        with pyarrow.ipc.new_file(temp_path, batch.schema) as writer:
+            writer.write_batch(batch)
+    os.replace(temp_path, path)
+    return path
+
+
+def export_game(game, out_dir, file_format='parquet', tables=tuple(TABLES)):
+    """
+    Writes the partitions of one Game, replacing any earlier export of it
+    Returns {table: rows written}
+    """
+    written = {}
+    for table in tables:
+        batch = BATCHES[table](game)
+        # Partition columns come from the directory names, game_id is kept in the rows for other layouts
+        write_batch(batch, get_partition_path(out_dir, table, game.game_season, game.game_id, file_format),
+                    file_format)
+        written[table] = batch.num_rows
+    return written
+
+
+def export_games(games, out_dir, file_format='parquet', tables=tuple(TABLES)):
+    """
+    Exports games one at a time, games may be a generator so only one Game is alive at once
+    Returns {table: rows written}
+    """
+    totals = dict.fromkeys(tables, 0)
+    for game in games:
+        for table, rows in export_game(game, out_dir, file_format, tables).items():
+            totals[table] += rows
+    return totals
+
+
+def open_table(out_dir, table, file_format='parquet'):
+    """
+    pyarrow.dataset over every exported partition of a table, ie open_table(out, 'events').to_table(filter=...)
+    """
+    season = pyarrow.field('season', pyarrow.string())
+    partitioning = pyarrow.dataset.partitioning(pyarrow.schema([season]), flavor='hive')
+    return pyarrow.dataset.dataset(os.path.join(out_dir, table), schema=TABLES[table].append(season),
+                                   format=file_format, partitioning=partitioning)
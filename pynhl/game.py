@@ -1,15 +1,43 @@
 from pynhl.event import Event
+from pynhl.location import get_game_location_features, get_rink_sides
+from pynhl.onice import OnIceIndex
 from pynhl.player import Player
+from pynhl.roster import RosterIndex
 from pynhl.shift import Shift
+from pynhl.store import EventStore, ShiftStore
+from pynhl.strength import StrengthIndex
 import pynhl.helpers as helpers
-import bisect, datetime
+import numpy
 
 
 class Game:
     # Game will have Players who will have shifts and each shift can have event(s)
 
+    # Named analysis stages and every stage whose results each one reads. Each one is a method on Game
+    # Stage methods read the _fields, not the properties, so one stage never starts another from inside it
+    STAGES = {
+        'load_shifts': (),
+        'load_players': ('load_shifts',),
+        'load_roster': (),
+        'load_events': ('load_roster',),
+        'add_strength_players_to_event': ('load_roster', 'load_players', 'load_events'),
+        'add_time_since_features': ('load_events',),
+        'build_stores': ('load_shifts', 'load_players', 'load_roster', 'add_strength_players_to_event',
+                         'add_time_since_features'),
+        'build_strength_index': ('load_shifts', 'load_players'),
+        'calculate_shared_toi': ('load_shifts', 'load_players', 'build_strength_index'),
+        'build_on_ice_index': ('build_stores',),
+        'add_location_features': ('build_stores',),
+    }
+    # Stages that read game/shift json, which is released once all of them have run
+    LOADING_STAGES = {'load_shifts', 'load_players', 'load_roster', 'load_events'}
+
     # Edit for reading a JSON input or a CSV one
-    def __init__(self, game_json, shift_json):
+    def __init__(self, game_json, shift_json, hooks=None, overrides=None):
+        """
+        Nothing is analysed up front, each stage runs the first time one of its results is asked for
+        Call run_stages() to run everything, ie before caching or pickling the Game
+        """
         # Basic game information provided by the API
         self.game_json = game_json
         self.shift_json = shift_json
@@ -19,39 +47,28 @@ class Game:
         self.home_team = self.game_json['gameData']['teams']['home']['triCode']
         self.away_goalie = set()
         self.home_goalie = set()
-        # Home - Away normalized
-        self.final_score = f"{self.game_json['liveData']['plays']['allPlays'][-1]['about']['goals']['home']}-" \
-                           f"{self.game_json['liveData']['plays']['allPlays'][-1]['about']['goals']['away']}"
-
-        self.players = self.assign_shifts_to_players()
-        self.events_in_game = self.retrieve_events_in_game()
-
-        # remove unnecessary data in memory before prolonged processing
-        self.cleanup()
-
-        # Extra functionality that doesn't require game/shift json
-        self.add_strength_players_to_event()
-
-        # Determine how much time each player played with every other player
-        for p_i, player in enumerate(self.players):
-            for other_player in {k: v for k, v in self.players.items() if k != player}:
-                if self.players[other_player].team == self.players[player].team:
-                    # Check to see if the player has been added from this or a previous game
-                    if player in self.players[other_player].ice_time_with_players:
-                        # Check to see if this game has been done already
-                        if self.game_id in self.players[other_player].ice_time_with_players[player]:
-                            # Skip this player, they have already been calculated
-                            continue
-                    # Calculate the time between the two players in this function
-                    self.get_time_together_between_two_players(self.players[player], self.players[other_player])
-
-        # Testing function
-        for player in self.players:
-            for o in self.players[player].ice_time_with_players:
-                x = self.players[player].ice_time_with_players[o][self.game_id]
-                s_x = [helpers.seconds_to_minutes(y) for y in x.values()]
-                s_xx = helpers.seconds_to_minutes(sum([int(x) for x in x.values()]))
-                a = 5
+        # Home - Away normalized, set from the last play when the events are read
+        self.final_score = None
+        # {period: True if the home team attacks towards +x}, from the feed's linescore when it has one
+        self.rink_sides = {}
+        self._shifts = []
+        self._players = {}
+        self._roster = None
+        self._events_in_game = []
+        self._event_store = None
+        self._shift_store = None
+        self._strength_index = None
+        self._on_ice_index = None
+        self._location_features = None
+        # pynhl.metrics.StageHook objects called around each stage, and one record per stage run
+        self.hooks = list(hooks or [])
+        self.stage_records = []
+        self.stage_counters = {}
+        # Stage : function(game) used in place of the Game method, ie to compare engines
+        self.overrides = dict(overrides or {})
+        # Stages that have started, and stages that have finished
+        self.stages_run = set()
+        self.stages_done = set()
 
     def __str__(self):
         return f"{self.home_team} vs.{self.away_team} Final Score:{self.final_score}"
@@ -59,10 +76,213 @@ class Game:
     def __repr__(self):
         return self.__str__()
 
+    @property
+    def shifts(self):
+        """
+        Every shift in the game, in (period, start, end, player) order, as the ShiftViews of shift_store
+        """
+        self.run_stage('build_stores')
+        return self._shifts
+
+    @property
+    def players(self):
+        """
+        {Name: Player} of everyone with a shift, ice_time_with_players is filled by the shared_toi stage
+        """
+        self.run_stage('load_players')
+        return self._players
+
+    @property
+    def roster(self):
+        """
+        RosterIndex giving every player in the game a bit, the on-ice / involved players of events are masks of it
+        """
+        self.run_stage('load_roster')
+        return self._roster
+
+    @property
+    def events_in_game(self):
+        """
+        Tracked events, with their on-ice players, strength and time since features, as the EventViews of event_store
+        """
+        self.run_stage('build_stores')
+        return self._events_in_game
+
+    @property
+    def event_store(self):
+        self.run_stage('build_stores')
+        return self._event_store
+
+    @property
+    def shift_store(self):
+        self.run_stage('build_stores')
+        return self._shift_store
+
+    @property
+    def strength_index(self):
+        self.run_stage('build_strength_index')
+        return self._strength_index
+
+    @property
+    def on_ice_index(self):
+        """
+        OnIceIndex of every shift, goalies included, for point in time on-ice queries
+        """
+        self.run_stage('build_on_ice_index')
+        return self._on_ice_index
+
+    @property
+    def location_features(self):
+        """
+        {'valid', 'x', 'y', 'distance', 'angle'} numpy columns of rink normalized locations, rows follow event_store
+        """
+        self.run_stage('add_location_features')
+        return self._location_features
+
+    @property
+    def shared_toi(self):
+        """
+        {Player}{Other Player} = {strength: seconds} for this game
+        """
+        self.run_stage('calculate_shared_toi')
+        return {name: {other: by_game[self.game_id] for other, by_game in player.ice_time_with_players.items()}
+                for name, player in self._players.items()}
+
     def cleanup(self):
         self.game_json = None
         self.shift_json = None
 
+    def run_stages(self, *stages):
+        """
+        Runs stages (every stage in Game.STAGES when none are given), stages already run are skipped
+        """
+        for stage in stages or self.STAGES:
+            self.run_stage(stage)
+        return self
+
+    def run_stage(self, stage):
+        """
+        Runs one of Game.STAGES once, after the stages it depends on
+        Adds a record of the stage's counters and hook measurements to self.stage_records
+        """
+        if stage in self.stages_run:
+            return self
+        # Marked before running, so a dependency cycle can't recurse forever
+        self.stages_run.add(stage)
+        for dependency in self.STAGES[stage]:
+            self.run_stage(dependency)
+        if stage in self.overrides:
+            self.measure(stage, self.overrides[stage], self)
+        else:
+            self.measure(stage, getattr(self, stage))
+        self.stages_done.add(stage)
+        # Only once every loading stage has finished, a started one may still be waiting on its dependencies
+        if stage in self.LOADING_STAGES and self.LOADING_STAGES <= self.stages_done:
+            # remove unnecessary data in memory before prolonged processing
+            self.cleanup()
+        return self
+
+    def measure(self, stage, function, *args):
+        """
+        Calls function(*args) between the hooks, adding a record of its counters and measurements to stage_records
+        Wraps every stage, and work done outside of the stages under its own name (ie LiveGame updates)
+        Returns what function returns
+        """
+        # Stages can still nest (ie an override reading a property), the outer stage gets its counters back after
+        outer_counters, self.stage_counters = self.stage_counters, {}
+        for hook in self.hooks:
+            hook.start(self, stage)
+        result = function(*args)
+        record = {'game_id': self.game_id, 'stage': stage, **self.stage_counters}
+        self.stage_counters = outer_counters
+        for hook in reversed(self.hooks):
+            hook.stop(self, stage, record)
+        self.stage_records.append(record)
+        return result
+
+    def count(self, counter, amount=1):
+        """
+        Adds to a counter of the running stage, ie records_in / records_out / bisects
+        """
+        self.stage_counters[counter] = self.stage_counters.get(counter, 0) + amount
+        return self
+
+    def load_shifts(self):
+        self._shifts = self.retrieve_shifts_from_game()
+        self.count('records_out', len(self._shifts))
+        return self
+
+    def load_players(self):
+        self._players = self.assign_shifts_to_players()
+        self.count('records_out', len(self._players))
+        return self
+
+    def load_roster(self):
+        all_players = self.game_json["gameData"]["players"]
+        self._roster = RosterIndex(self.home_team, self.away_team,
+                                   (player_json['fullName'] for player_json in all_players.values()))
+        self.count('records_in', len(all_players))
+        self.count('records_out', len(self._roster))
+        return self
+
+    def load_events(self):
+        self.rink_sides = get_rink_sides(self.game_json)
+        self._events_in_game = self.retrieve_events_in_game()
+        self.count('records_out', len(self._events_in_game))
+        return self
+
+    def build_stores(self):
+        """
+        Columnar stores of the events and shifts, which take over from the Event / Shift objects
+        """
+        self._event_store = EventStore(self._events_in_game, self.home_team, self.away_team, self._roster)
+        self._shift_store = ShiftStore(self._shifts, self.home_team, self.away_team)
+        self.count('records_in', len(self._events_in_game) + len(self._shifts))
+        self.count('records_out', len(self._event_store) + len(self._shift_store))
+        return self.release_records()
+
+    def release_records(self):
+        """
+        Swaps the Event / Shift objects for the rows of the stores, so the stores hold the only copy
+        The events / shifts of the game and of each Player are EventViews / ShiftViews from here on
+        """
+        self._events_in_game = self._event_store
+        self._shifts = self._shift_store
+        # The store is in (period, start, end, player) order, so each player's shifts stay sorted
+        for name, shifts in self._shift_store.get_player_rows().items():
+            self._players[name].shifts[self.game_id] = shifts
+        return self
+
+    def add_location_features(self):
+        self._location_features = get_game_location_features(self)
+        self.count('records_in', len(self._event_store))
+        self.count('records_out', int(self._location_features['valid'].sum()))
+        return self
+
+    def build_strength_index(self):
+        """
+        Strength segments of each period, from the skaters on the ice
+        """
+        goalies = self.home_goalie.union(self.away_goalie)
+        skater_shifts = [shift for shift in self._shifts if shift.player not in goalies]
+        self._strength_index = StrengthIndex(skater_shifts, self.home_team, self.away_team)
+        self.count('records_in', len(skater_shifts))
+        self.count('records_out', sum(len(segments) for segments in self._strength_index.segments.values()))
+        return self
+
+    def build_on_ice_index(self):
+        self._on_ice_index = OnIceIndex(self._shifts)
+        self.count('records_in', len(self._shifts))
+        self.count('records_out', len(self._on_ice_index))
+        return self
+
+    def get_player_team(self, name):
+        """
+        Team a player played for in this game, from their shifts
+        Player.team is the feed's current team, which is neither team of the game once a player is traded
+        """
+        return self.players[name].shifts[self.game_id][0].team
+
     def add_goalie(self, player_object):
         """
         If a player is a goalie, adds it to home/away_goalie variable
@@ -80,6 +300,7 @@ class Game:
         """
         players_dict = {}
         all_players = self.game_json["gameData"]["players"]
+        self.count('records_in', len(all_players))
         for player_id in all_players:
             temp = Player(all_players[player_id])
             if temp.name in active_players:
@@ -92,13 +313,11 @@ class Game:
         """
         Fetch shift information and generate a Shift object for each shift in the game
         """
-        shifts = []
-        sorted_ins = bisect.insort
-        for shift in self.shift_json['data']:
-            temp_shift = Shift(self.game_id, self.home_team, shift)
-            if temp_shift.duration != 0:
-                # Maintains sorted order based off __eq__ inside shift object
-                sorted_ins(shifts, temp_shift)
+        shifts = [Shift(self.game_id, self.home_team, shift) for shift in self.shift_json['data']]
+        self.count('records_in', len(shifts))
+        shifts = [shift for shift in shifts if shift.duration != 0]
+        # Sorted once by (period, start, end, player)
+        shifts.sort(key=helpers.BY_SORT_KEY)
         return shifts
 
     def assign_shifts_to_players(self):
@@ -106,9 +325,8 @@ class Game:
         Assigns shifts from each period in the game to the player object
         Shifts are separated by [GameID][Period] = [Shifts in the period, in that game]
         """
-        shifts = self.retrieve_shifts_from_game()
-        players = self.retrieve_players_in_game(active_players=set([s.player for s in shifts]))
-        for shift in shifts:
+        players = self.retrieve_players_in_game(active_players=set([s.player for s in self._shifts]))
+        for shift in self._shifts:
             if self.game_id not in players[shift.player].shifts:
                 players[shift.player].shifts[self.game_id] = []
             players[shift.player].shifts[self.game_id].append(shift)
@@ -118,124 +336,171 @@ class Game:
         """
         Function to retrieve all events, and their necessary information to the class object
         """
-        # All events from the input JSON data
+        # All events from the input JSON data, may be a generator when the feed is streamed
         events = self.game_json['liveData']['plays']['allPlays']
         events_in_game = []
-        add_events = bisect.insort
+        curr_event = None
         for curr_event in events:
-            type_of_event = curr_event['result']['event']
-            if type_of_event in helpers.TRACKED_EVENTS:
-                temp_event = Event(curr_event, self.home_team, self.away_team)
-                add_events(events_in_game, temp_event)
+            self.count('records_in')
+            if curr_event['result']['event'] in helpers.TRACKED_EVENTS:
+                events_in_game.append(Event(curr_event, self.home_team, self.away_team, self._roster))
+        if curr_event:
+            self.final_score = f"{curr_event['about']['goals']['home']}-{curr_event['about']['goals']['away']}"
+        # Sorted once by (period, time), stable so events at the same second keep the order of the feed
+        events_in_game.sort(key=helpers.BY_SORT_KEY)
         return events_in_game
 
+    def get_sweep_points(self, skip_players, shifts=None, events=None):
+        """
+        Merges every shift start, shift end and event in the game (or only shifts / events) into one list,
+        ordered by game time
+        Points at the same second are ordered by the helpers.SWEEP_* constants, which follow time_check_event
+        """
+        points = []
+        if shifts is None:
+            shifts = (shift for player in self._players.values() for shift in player.shifts[self.game_id])
+        for shift in shifts:
+            if shift.player in skip_players:
+                continue
+            if shift.game_start < shift.game_end:
+                points.append((shift.game_start, helpers.SWEEP_SHIFT_START, shift))
+                points.append((shift.game_end, helpers.SWEEP_SHIFT_END, shift))
+        for event in self._events_in_game if events is None else events:
+            if event.type_of_event in helpers.EVENTS_THAT_CAN_CAUSE_A_STOPPAGE:
+                points.append((event.game_time, helpers.SWEEP_STOPPAGE_EVENT, event))
+            else:
+                points.append((event.game_time, helpers.SWEEP_EVENT, event))
+        # Stable sort keeps shifts/events in their loaded order when time and kind are equal
+        points.sort(key=lambda point: (point[0], point[1]))
+        return points
+
     def add_strength_players_to_event(self):
         """
         Function to find the players who are on ice for each event in the game
+        Sweeps once over the shifts and events, keeping the skaters on the ice for each team
         """
         # TODO: When a penalty occurs, the play receiving the penalty should be included
         goalies = self.home_goalie.union(self.away_goalie)
-        for i, event_to_parse in enumerate(self.events_in_game):
-            for player in self.players:
-                if player not in goalies:
-                    event_to_parse.get_players_for_event(self.players[player].shifts[self.game_id])
-            # Based off players on the ice, determine the strength (5v5, 6v5 etc)
-            event_to_parse.determine_event_state(self.home_team, self.away_team)
-            event_to_parse.calculate_time_since_shot(self.events_in_game[:i])
+        points = self.get_sweep_points(goalies)
+        self.count('records_in', len(points))
+        self.count('records_out', len(self._events_in_game))
+        return self.sweep_on_ice(points)
+
+    def sweep_on_ice(self, points):
+        """
+        Sets players_on and strength of every event in points, from the shift starts / ends before it
+        Events before the first shift point in the list would miss players, so points must hold every shift
+        that is still on the ice at the first event
+        """
+        open_shifts = {}  # Player : open shifts
+        on_ice = {self.home_team: 0, self.away_team: 0}  # Team : mask of the players on the ice
+        for _, kind, item in points:
+            if kind == helpers.SWEEP_SHIFT_START:
+                open_shifts[item.player] = open_shifts.get(item.player, 0) + 1
+                on_ice[item.team] |= self._roster.flag(item.player)
+            elif kind == helpers.SWEEP_SHIFT_END:
+                open_shifts[item.player] -= 1
+                if open_shifts[item.player] == 0:
+                    on_ice[item.team] &= ~self._roster.flag(item.player)
+            else:
+                item.home_on_ice = on_ice[self.home_team]
+                item.away_on_ice = on_ice[self.away_team]
+                # Based off players on the ice, determine the strength (5v5, 6v5 etc)
+                item.determine_event_state(self.home_team, self.away_team)
+        return self
+
+    def add_time_since_features(self, first=0):
+        """
+        Walks the events once in order, setting each feature in helpers.TIME_SINCE_FEATURES on every event
+        Features are the seconds since the last matching event in the same period, -1 if there is none
+        first skips the events before that index, only reading back through them for the last matching events
+        """
+        last_seen = {}  # Feature : (period, time) of the last matching event
+        events = self._events_in_game
+        if first:
+            period = events[first].period if first < len(events) else None
+            for i in range(first - 1, -1, -1):
+                if events[i].period != period or len(last_seen) == len(helpers.TIME_SINCE_FEATURES):
+                    break
+                for feature, types_of_event in helpers.TIME_SINCE_FEATURES.items():
+                    if feature not in last_seen and (types_of_event is None or
+                                                     events[i].type_of_event in types_of_event):
+                        last_seen[feature] = (events[i].period, events[i].time)
+        self.count('records_in', len(events) - first)
+        self.count('records_out', len(events) - first)
+        for event in events[first:]:
+            for feature, types_of_event in helpers.TIME_SINCE_FEATURES.items():
+                previous = last_seen.get(feature)
+                if previous and previous[0] == event.period:
+                    setattr(event, feature, helpers.subtract_two_time_objects(previous[1], event.time))
+                else:
+                    setattr(event, feature, -1)
+                if types_of_event is None or event.type_of_event in types_of_event:
+                    last_seen[feature] = (event.period, event.time)
         return self
 
-    def get_period_range_in_events_list(self, period_to_find):
-        temp = {}
-        if period_to_find not in temp:
-            per_index = bisect.bisect_left(self.events_in_game, period_to_find)
-            per_end = bisect.bisect_left(self.events_in_game, period_to_find + 1)
-            return (per_index, per_end)
-
-    def get_time_together_between_two_players(self, player, other):
-        """
-        For each player in the game, find their teammates & opposition for
-        every second they are on the ice in that game
-        """
-        for p_shift in player.shifts[self.game_id]:
-            i = bisect.bisect_left(other.shifts[self.game_id], p_shift)
-            if i == len(other.shifts[self.game_id]):
-                i -= 1
-            closest_shift = other.shifts[self.game_id][i]
-            period_ranges = {}
-            if helpers.do_shifts_overlap(p_shift, closest_shift):
-                time_shared, time_lb, time_ub = helpers.get_time_shared(p_shift, closest_shift)
-                if time_shared > 0:
-                    if p_shift.period not in period_ranges:
-                        period_ranges[p_shift.period] = self.get_period_range_in_events_list(p_shift.period)
-                    values, swapped = self.separate_time_shared_by_strengths(time_lb, time_ub, time_shared,
-                                                                             period_ranges[p_shift.period][0],
-                                                                             period_ranges[p_shift.period][1])
-                    # TODO: Think of better location for this function, ugly
-                    if player.team == self.away_team:
-                        player.add_shared_toi(self.game_id, other.name, swapped)
-                    else:
-                        player.add_shared_toi(self.game_id, other.name, values)
-                    if other.team == self.away_team:
-                        other.add_shared_toi(self.game_id, player.name, swapped)
-                    else:
-                        other.add_shared_toi(self.game_id, player.name, values)
-
-    def separate_time_shared_by_strengths(self, lb, ub, time_shared, low_i, high_i):
-        """
-        Splits the time shared between two players on a shift (time_shared) by the intervals found in
-        self.strength_intervals
-
-        lb / ub refer to the interval shared by the two players, a time between 00:00 and 19:59
-        low_i/high_i refer to the start and end index for a given period in the game
-        """
-
-        start = bisect.bisect_left(self.events_in_game, lb, low_i, high_i)
-        if start > 0:
-            start -= 1
-        end = bisect.bisect_left(self.events_in_game, ub, low_i, high_i)
-        if end < len(self.events_in_game):
-            end += 1
-        #
-        prev_strength = self.events_in_game[start].strength
-        pen_start = None
-        strengths_during_shift = {prev_strength: 0}  # strength:seconds
-        '''
-        Need to accurately account for penalty time
-        Penalties last TWO to FOUR minutes
-        '''
-        for event in self.events_in_game[start:end]:
-            # Break immediately, don't care about any events anymore
-            if event.time > ub:
-                break
-            # Add strength to dict
-            if "Penalty" in event.type_of_event:
-                pen_start = event.time
-                pen_end = helpers.add_minutes_to_time(pen_start, (event.penalty_duration // 60))
-            if event.strength not in strengths_during_shift:
-                strengths_during_shift[event.strength] = 0
-            if event.time < lb:
-                # Gets the strength just before the beginning of the shift
-                prev_strength = event.strength
-            # All the work done in here
-            elif event.time < ub:
-                diff = helpers.subtract_two_time_objects(lb, event.time)
-                # Set the new lower bound
-                lb = event.time
-                # Add the difference and on to the next
-                '''
-                Handle the case when their shifts and a penalty was on during the ice
-                10:34 -> 12:34 , shift ends a little bit after that
-                If there are no events after 12:34, what to do?
-                Get remaining total time (already done that)
-                Take that number, subtract it from pen_end and lb
-                That becomes the PP numbers
-                Remaining time is the remaining time
-                '''
-                strengths_during_shift[event.strength] += diff
-                a = 5
-
-        # Generate the remaining time here
-        strengths_during_shift[prev_strength] += time_shared - sum(strengths_during_shift.values())
-        # Returns the home v away and away v home versions for the case of teammate / teammate and teammate / opposition
-        return {k: v for k, v in strengths_during_shift.items() if v != 0}, {f"{k[2]}{k[1]}{k[0]}": v for k, v in
-                                                                             strengths_during_shift.items()}
+    def get_on_ice_matrix(self, names, first_second=0, last_second=None):
+        """
+        Builds a (seconds x players) boolean matrix, True for every second a player is on the ice
+        Rows are the seconds [first_second, last_second) of the game, last_second defaults to the last shift end
+        A shift covers the seconds [game_start, game_end)
+        """
+        shifts = [self.players[name].shifts[self.game_id] for name in names]
+        if last_second is None:
+            last_second = max((shift.game_end for player_shifts in shifts for shift in player_shifts), default=0)
+        on_ice = numpy.zeros((max(last_second - first_second, 0), len(names)), dtype=bool)
+        for col, player_shifts in enumerate(shifts):
+            for shift in player_shifts:
+                if shift.game_end > first_second and shift.game_start < last_second:
+                    on_ice[max(shift.game_start - first_second, 0):shift.game_end - first_second, col] = True
+        return on_ice
+
+    def get_per_second_states(self, first_second, seconds):
+        """
+        Strength of every second in [first_second, first_second + seconds), from the strength index segments
+        Returns ([strength], array of the index of each second's strength, -1 outside of the segments)
+        """
+        strengths = []
+        per_second_state = numpy.full(seconds, -1)
+        for period, segments in self.strength_index.segments.items():
+            for start, end, strength in segments:
+                lb = max(helpers.game_second(period, start) - first_second, 0)
+                ub = min(helpers.game_second(period, end) - first_second, seconds)
+                if lb < ub:
+                    if strength not in strengths:
+                        strengths.append(strength)
+                    per_second_state[lb:ub] = strengths.index(strength)
+        return strengths, per_second_state
+
+    def get_shared_toi_between(self, names, first_second=0, last_second=None):
+        """
+        Seconds shared by every pair of teammates in names during [first_second, last_second), split by strength
+        Shared seconds for every pair is one matrix product (A.T * A) of the on-ice matrix, masked to the
+        seconds played at each strength
+        Returns {(name, other): {strength: seconds}}, strengths from the team of name's perspective
+        """
+        teams = numpy.array([self.get_player_team(name) for name in names])
+        on_ice = self.get_on_ice_matrix(names, first_second, last_second)
+        strengths, per_second_state = self.get_per_second_states(first_second, len(on_ice))
+        teammates = teams[:, None] == teams[None, :]
+        numpy.fill_diagonal(teammates, False)
+        shared_toi = {}
+        for state_i, strength in enumerate(strengths):
+            in_state = on_ice[per_second_state == state_i].astype(numpy.int32)
+            shared = in_state.T @ in_state
+            swapped = helpers.swap_state(strength)
+            for p_i, o_i in zip(*numpy.nonzero(teammates & (shared > 0))):
+                # Strengths are stored from the player's team perspective
+                player_strength = swapped if teams[p_i] == self.away_team else strength
+                shared_toi.setdefault((names[p_i], names[o_i]), {})[player_strength] = int(shared[p_i, o_i])
+        return shared_toi
+
+    def calculate_shared_toi(self):
+        """
+        Determine how much time each player played with every teammate, split by strength
+        """
+        self.count('records_in', len(self._shifts))
+        for (name, other), strengths in self.get_shared_toi_between(list(self._players)).items():
+            self._players[name].add_shared_toi(self.game_id, other, strengths)
+            self.count('records_out', len(strengths))
+        return self
@@ -0,0 +1,150 @@
+'''
+Event location heatmaps, binned into fixed rink grids and keyed by team / player / event type / strength / score
+Tiles of different games add up, so season maps are sums of game maps
+'''
+from pynhl.cache import CACHE_SCHEMA_VERSION, GameCache
+from pynhl.store import EVENT_TYPES, HOME
+import pynhl.helpers as helpers
+import numpy
+
+# 5ft cells over the whole rink, in rink normalized coordinates (the event's team attacks towards +x)
+GRID_X_EDGES = numpy.linspace(-100.0, 100.0, 41)
+GRID_Y_EDGES = numpy.linspace(-42.5, 42.5, 18)
+GRID_SHAPE = (len(GRID_X_EDGES) - 1, len(GRID_Y_EDGES) - 1)
+# Goal difference from the event team's perspective is clipped to +/- this
+MAX_SCORE_STATE = 3
+# Bump whenever the grid or the keys change, cached tiles from older versions are dropped
+HEATMAP_SCHEMA_VERSION = 1
+
+
+def get_cells(x, y):
+    """
+    Flat grid cell of every (x, y), -1 outside of the grid or without coordinates
+    Cells include their lower edges, the last row / column also its upper edge, the same as numpy.histogram2d
+    """
+    x_bin = numpy.searchsorted(GRID_X_EDGES, x, side='right') - 1
+    y_bin = numpy.searchsorted(GRID_Y_EDGES, y, side='right') - 1
+    x_bin[x == GRID_X_EDGES[-1]] = GRID_SHAPE[0] - 1
+    y_bin[y == GRID_Y_EDGES[-1]] = GRID_SHAPE[1] - 1
+    inside = (x_bin >= 0) & (x_bin < GRID_SHAPE[0]) & (y_bin >= 0) & (y_bin < GRID_SHAPE[1])
+    return numpy.where(inside, x_bin * GRID_SHAPE[1] + y_bin, -1)
+
+
+class HeatmapTiles:
+    """
+    {(team, player, type of event, strength, score state): (GRID_SHAPE) int32 counts}
+    Team tiles have player None, player tiles count the events a player was involved in for the event's team
+    Strength and score state are from the event team's perspective
+    """
+
+    def __init__(self):
+        self.tiles = {}
+        self.game_ids = set()
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __str__(self):
+        return f"HeatmapTiles: {len(self)} tiles, {len(self.game_ids)} games"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def from_game(cls, game):
+        """
+        Bins every located event of a Game, all tiles in one bincount over (tile, cell)
+        Works from game.event_store and game.location_features
+        """
+        heatmaps = cls()
+        heatmaps.game_ids.add(game.game_id)
+        store, locations = game.event_store, game.location_features
+        cells = get_cells(locations['x'], locations['y'])
+        team_code = numpy.asarray(store.team_code, dtype=numpy.int64)
+        is_home = team_code == HOME
+        type_code = numpy.asarray(store.type_code, dtype=numpy.int64)
+        # Team perspective strength codes, into one list of strengths for home and swapped away strengths
+        strengths = sorted(set(store.strengths) | {helpers.swap_state(strength) for strength in store.strengths})
+        home_strength = numpy.array([strengths.index(strength) for strength in store.strengths], dtype=numpy.int64)
+        away_strength = numpy.array([strengths.index(helpers.swap_state(strength)) for strength in store.strengths],
+                                    dtype=numpy.int64)
+        strength_code = numpy.asarray(store.strength_code, dtype=numpy.int64)
+        strength_code = numpy.where(is_home, home_strength[strength_code], away_strength[strength_code])
+        score = numpy.asarray(store.home_score, dtype=numpy.int64) - numpy.asarray(store.away_score, dtype=numpy.int64)
+        score = numpy.clip(numpy.where(is_home, score, -score), -MAX_SCORE_STATE, MAX_SCORE_STATE)
+        # Player rows, one per (event, involved player of the event's team), player -1 are the team rows
+        involved = numpy.where(is_home, numpy.asarray(store.home_involved, dtype=numpy.uint64),
+                               numpy.asarray(store.away_involved, dtype=numpy.uint64))
+        event_rows, player_bits = numpy.nonzero(game.roster.matrix(involved))
+        rows = numpy.concatenate([numpy.arange(len(cells)), event_rows])
+        players = numpy.concatenate([numpy.full(len(cells), -1), player_bits])
+        located = cells[rows] >= 0
+        rows, players = rows[located], players[located]
+        keys = numpy.stack([team_code[rows], players, type_code[rows], strength_code[rows], score[rows]], axis=1)
+        unique_keys, tile_index = numpy.unique(keys, axis=0, return_inverse=True)
+        n_cells = GRID_SHAPE[0] * GRID_SHAPE[1]
+        counts = numpy.bincount(tile_index.reshape(-1) * n_cells + cells[rows],
+                                minlength=len(unique_keys) * n_cells)
+        counts = counts.reshape(len(unique_keys), *GRID_SHAPE).astype(numpy.int32)
+        teams = store.teams
+        for (team, player, type_code_i, strength_i, score_state), grid in zip(unique_keys.tolist(), counts):
+            key = (teams[team], None if player < 0 else game.roster.names[player], EVENT_TYPES[type_code_i],
+                   strengths[strength_i], score_state)
+            heatmaps.tiles[key] = grid
+        return heatmaps
+
+    def merge(self, other):
+        """
+        Adds the tiles of another HeatmapTiles, ie a game's into a season's
+        """
+        if other.game_ids & self.game_ids:
+            raise ValueError(f"Games in both heatmaps: {sorted(other.game_ids & self.game_ids)}")
+        for key, grid in other.tiles.items():
+            if key in self.tiles:
+                self.tiles[key] = self.tiles[key] + grid
+            else:
+                self.tiles[key] = grid.copy()
+        self.game_ids.update(other.game_ids)
+        return self
+
+    @classmethod
+    def merge_all(cls, heatmaps):
+        season = cls()
+        for game_heatmaps in heatmaps:
+            season.merge(game_heatmaps)
+        return season
+
+    def get(self, team=None, player=None, type_of_event=None, strength=None, score_state=None):
+        """
+        Sum of the tiles matching every given part of the key, player None sums the team tiles
+        Returns a (GRID_SHAPE) array, x along the first axis
+        """
+        grid = numpy.zeros(GRID_SHAPE, dtype=numpy.int64)
+        wanted = (team, player, type_of_event, strength, score_state)
+        for key, tile in self.tiles.items():
+            if player is None and key[1] is not None:
+                continue
+            if all(want is None or want == part for want, part in zip(wanted, key)):
+                grid += tile
+        return grid
+
+
+class HeatmapCache(GameCache):
+    """
+    On-disk cache of each game's HeatmapTiles, next to / apart from the GameCache entries
+    Entries are keyed like GameCache, by game id and a content hash of the game's inputs
+    Tiles are rasterized from parsed Games, so the version changes with CACHE_SCHEMA_VERSION as well as
+    HEATMAP_SCHEMA_VERSION, and tiles from an older parser are dropped
+    """
+    SCHEMA_VERSION = CACHE_SCHEMA_VERSION * 100 + HEATMAP_SCHEMA_VERSION
+    SUFFIX = ".heatmap"
+
+    def get_tiles(self, game_id, content_hash, build_game):
+        """
+        Returns the cached tiles of a game, calling build_game() and rasterizing it only on a miss
+        """
+        heatmaps = self.load(game_id, content_hash)
+        if heatmaps is None:
+            heatmaps = HeatmapTiles.from_game(build_game())
+            self.store(heatmaps, content_hash, game_id)
+        return heatmaps
@@ -1,7 +1,11 @@
-import datetime
+import operator
 
 EVENTS_THAT_CAN_CAUSE_A_STOPPAGE = {"Shot", "Goal", "Penalty"}
 
+# Order of shift/event sweep points that share the same second, matching time_check_event
+# Stoppages credit the players whose shift ends on the whistle, other events credit the players starting a shift
+SWEEP_STOPPAGE_EVENT, SWEEP_SHIFT_END, SWEEP_SHIFT_START, SWEEP_EVENT = range(4)
+
 TRACKED_EVENTS = {
     "Shot",
     "Faceoff",
@@ -13,6 +17,23 @@ TRACKED_EVENTS = {
     "Goal",
     "Hit"
 }
+# Rolling features set on every Event, feature : event types that reset it (None resets on every event)
+TIME_SINCE_FEATURES = {
+    "time_since_last_event": None,
+    "time_since_last_shot": {"Shot", "Missed Shot", "Blocked Shot", "Goal"},
+}
+
+# Keys for sorting and bisecting Shift / Event sequences
+BY_SORT_KEY = operator.attrgetter('sort_key')
+BY_PERIOD_START = operator.attrgetter('period', 'start')
+BY_TIME = operator.attrgetter('time')
+BY_GAME_TIME = operator.attrgetter('game_time')
+# Order of the comparisons of Event / EventView, events of different types at the same second are never equal
+BY_EVENT_ORDER = operator.attrgetter('sort_key', 'type_of_event')
+
+# Seconds in a regulation period, used to place a period clock on the game clock
+PERIOD_LENGTH = 1200
+
 NOT_TRACKED_EVENTS = {
     "Period Start",
     "Game Official",
@@ -24,21 +45,35 @@ NOT_TRACKED_EVENTS = {
 }
 
 
+def convert_to_seconds(str_to_time):
+    """
+    Converts a MM:SS string from the API to an integer of seconds
+    "12:34" -> 754
+    """
+    minutes, _, seconds = str_to_time.partition(':')
+    return int(minutes) * 60 + int(seconds)
+
+
+def game_second(period, seconds):
+    """
+    Places seconds into a period on the game clock, so times from different periods are comparable
+    (2, 0) -> 1200
+    """
+    return (period - 1) * PERIOD_LENGTH + seconds
+
+
 def add_minutes_to_time(_time, minutes_to_add):
     """
-    Add an integer value of minutes to an existing time object
+    Add an integer value of minutes to an existing time in seconds
     """
-    return (datetime.datetime.combine(datetime.date.today(), _time) + datetime.timedelta(minutes=minutes_to_add)).time()
+    return _time + minutes_to_add * 60
 
 
 def subtract_two_time_objects(smaller, bigger):
     """
-    Helper function to return the difference of two time objects in seconds
+    Helper function to return the difference of two times in seconds
     """
-    smaller = datetime.datetime.combine(datetime.date.today(), smaller)
-    bigger = datetime.datetime.combine(datetime.date.today(), bigger)
-    difference = bigger - smaller
-    return difference.seconds
+    return bigger - smaller
 
 
 def seconds_to_minutes(seconds):
@@ -53,6 +88,20 @@ def seconds_to_minutes(seconds):
     return f"{minutes}:{seconds}"
 
 
+def none_to_nan(value):
+    """
+    Missing values are stored as NaN in float columns
+    """
+    return float('nan') if value is None else value
+
+
+def nan_to_none(value):
+    """
+    Inverse of none_to_nan, for reading float columns back into attributes
+    """
+    return None if value != value else value
+
+
 def do_shifts_overlap(baseline, other):
     """
     Determine if two Shift objets were present at the same time
@@ -87,15 +136,20 @@ def time_check_event(event_time, shift_start_time, shift_end_time, event_=None):
 
 def get_time_shared(curr_shift, other_shift):
     """
-    Finds the shared min and shared max, and subtracts the two time objects
-    Returns the value in seconds (timedelta doesn't track minutes/hours)
+    Finds the shared min and shared max, and subtracts the two times
+    Returns the value in seconds
     """
-
     lower_bound = max(curr_shift.start, other_shift.start)
     upper_bound = min(curr_shift.end, other_shift.end)
-    temp = datetime.datetime.combine(datetime.date.today(), upper_bound) - datetime.datetime.combine(
-        datetime.date.today(), lower_bound)
-    return temp.seconds, lower_bound, upper_bound
+    return upper_bound - lower_bound, lower_bound, upper_bound
+
+
+def swap_state(state):
+    """
+    Swaps a strength string to the other team's perspective
+    5v4 -> 4v5
+    """
+    return f"{state[2]}{state[1]}{state[0]}"
 
 
 def swap_states(states_dict):
@@ -103,4 +157,4 @@ def swap_states(states_dict):
     Swaps the string held in the keys of states_dict
     Before: {5v4:INT} After: {4v5:INT}
     """
-    return {f"{k[2]}{k[1]}{k[0]}": v for k, v in states_dict.items()}
+    return {swap_state(k): v for k, v in states_dict.items()}
@@ -0,0 +1,138 @@
+'''
+Forward lines and defense pairs, detected from the on-ice segments of each game and summed across games
+'''
+import pynhl.helpers as helpers
+
+FORWARDS, DEFENSE = 'F', 'D'
+# Players on the ice at once for a unit to count as a line / pair
+UNIT_SIZES = {FORWARDS: 3, DEFENSE: 2}
+
+
+def get_game_units(game):
+    """
+    Seconds each forward trio / defense pair was on the ice together in a game, by strength
+    Walks the segments of the game's OnIceIndex with one roster mask per team, a unit is counted whenever a team
+    has exactly 3 forwards / 2 defensemen on the ice
+    Returns ({(kind, team, player ids): {strength: seconds}}, {player id: name})
+    Strengths are from the unit's team perspective
+    """
+    roster, index = game.roster, game.on_ice_index
+    goalies = game.home_goalie.union(game.away_goalie)
+    skaters = {game.home_team: 0, game.away_team: 0}
+    by_position = {(team, position): 0 for team in skaters for position in UNIT_SIZES}
+    for name, player in game.players.items():
+        if name not in goalies:
+            team = game.get_player_team(name)
+            skaters[team] |= roster.flag(name)
+            by_position[(team, player.position)] |= roster.flag(name)
+    counts = {}  # (kind, team, mask) : {strength: seconds}
+    for i, players in enumerate(index.on_ice[:-1]):
+        seconds = index.boundaries[i + 1] - index.boundaries[i]
+        if not players:
+            continue
+        on_ice = roster.mask(players)
+        home, away = on_ice & skaters[game.home_team], on_ice & skaters[game.away_team]
+        strength = f"{home.bit_count()}v{away.bit_count()}"
+        for team, team_strength in ((game.home_team, strength), (game.away_team, helpers.swap_state(strength))):
+            for kind, size in UNIT_SIZES.items():
+                unit = on_ice & by_position[(team, kind)]
+                if unit.bit_count() == size:
+                    unit_toi = counts.setdefault((kind, team, unit), {})
+                    unit_toi[team_strength] = unit_toi.get(team_strength, 0) + seconds
+    units, names = {}, {}
+    for (kind, team, mask), strengths in counts.items():
+        players = [game.players[name] for name in roster.players(mask)]
+        names.update((player.player_id, player.name) for player in players)
+        units[(kind, team, tuple(sorted(player.player_id for player in players)))] = strengths
+    return units, names
+
+
+class LineCombinations:
+    """
+    Forward trios and defense pairs over many games
+
+    units : {(kind, team, player ids): {strength: seconds}}, summed over every game
+    by_game : {game id: {unit: {strength: seconds}}}
+    names : {player id: name}
+    Kinds are FORWARDS / DEFENSE, player ids are sorted so a unit has the same key in every game
+    """
+
+    def __init__(self):
+        self.units = {}
+        self.by_game = {}
+        self.names = {}
+
+    def __len__(self):
+        return len(self.units)
+
+    def __str__(self):
+        return f"LineCombinations: {len(self)} units, {len(self.by_game)} games"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def from_game(cls, game):
+        return cls().add_game(game)
+
+    def add_game(self, game):
+        if game.game_id not in self.by_game:
+            units, names = get_game_units(game)
+            self.add_game_units(game.game_id, units, names)
+        return self
+
+    def add_game_units(self, game_id, units, names):
+        self.by_game[game_id] = units
+        self.names.update(names)
+        for unit, strengths in units.items():
+            totals = self.units.setdefault(unit, {})
+            for strength, seconds in strengths.items():
+                totals[strength] = totals.get(strength, 0) + seconds
+        return self
+
+    def merge(self, other):
+        """
+        Adds the games of another LineCombinations, ie one built in a different worker
+        """
+        for game_id, units in other.by_game.items():
+            if game_id not in self.by_game:
+                self.add_game_units(game_id, units, other.names)
+        return self
+
+    @classmethod
+    def merge_all(cls, combinations):
+        season = cls()
+        for lines in combinations:
+            season.merge(lines)
+        return season
+
+    def get_top(self, kind=FORWARDS, team=None, strength=None, n=10, game_id=None):
+        """
+        [(unit, seconds)] of the n units of a kind with the most time together, for one team / strength / game
+        """
+        units = self.units if game_id is None else self.by_game.get(game_id, {})
+        top = []
+        for unit, strengths in units.items():
+            if unit[0] == kind and (team is None or unit[1] == team):
+                seconds = sum(strengths.values()) if strength is None else strengths.get(strength, 0)
+                if seconds:
+                    top.append((unit, seconds))
+        top.sort(key=lambda unit_seconds: unit_seconds[1], reverse=True)
+        return top[:n]
+
+    def get_player_units(self, player_id, kind=None, strength=None, game_id=None):
+        """
+        [(unit, seconds)] of every unit player_id played in, most time first
+        """
+        units = self.units if game_id is None else self.by_game.get(game_id, {})
+        player_units = []
+        for unit, strengths in units.items():
+            if player_id in unit[2] and (kind is None or unit[0] == kind):
+                seconds = sum(strengths.values()) if strength is None else strengths.get(strength, 0)
+                if seconds:
+                    player_units.append((unit, seconds))
+        player_units.sort(key=lambda unit_seconds: unit_seconds[1], reverse=True)
+        return player_units
+
+    def get_unit_names(self, unit):
+        return tuple(self.names.get(player_id, str(player_id)) for player_id in unit[2])
@@ -0,0 +1,238 @@
+'''
+Live game mode, a Game that is updated in place from the new plays and shift rows of each live feed pull
+Only the tail of the game from the earliest new / changed record onward is re-analysed
+'''
+from pynhl.event import Event
+from pynhl.game import Game
+from pynhl.player import Player
+from pynhl.shift import Shift
+import pynhl.helpers as helpers
+import bisect
+
+
+class LiveGame(Game):
+    """
+    Game built from a partial feed, then updated with update() / update_from_feed()
+
+    Shared TOI is kept per period, so an update only recomputes the periods it touches
+    Subscribers are called with a dict of the records each update changed:
+        'since' : first game second that was re-analysed
+        'events' : new events and events whose on-ice players, strength or features changed
+        'shifts' : new shifts, and the old versions of changed shifts under 'removed_shifts'
+        'periods' : periods whose strength segments and shared TOI were recomputed
+        'shared_toi' : {(name, other): {strength: seconds}} of every pair whose game total changed
+    """
+
+    # Stages whose results update() keeps current in place
+    UPDATED_STAGES = ('add_strength_players_to_event', 'add_time_since_features', 'build_strength_index',
+                      'calculate_shared_toi')
+    # Stages over the whole game that update() drops, they run again the next time their results are asked for
+    REBUILT_STAGES = ('build_stores', 'build_on_ice_index', 'add_location_features')
+
+    def __init__(self, game_json, shift_json, hooks=None, overrides=None):
+        super().__init__(game_json, shift_json, hooks=hooks, overrides=overrides)
+        # Kept past cleanup(), new players can show up in later shift rows
+        self.roster_json = game_json['gameData']['players']
+        self.shift_rows = {}  # Shift row id : row, to tell new rows from changed ones
+        self.plays_seen = 0
+        self.period_shared_toi = {}  # Period : {(name, other): {strength: seconds}}
+        self.subscribers = []
+        self.run_stages(*self.UPDATED_STAGES)
+
+    def subscribe(self, callback):
+        """
+        callback(game, changes) is called after every update, see LiveGame for the contents of changes
+        """
+        self.subscribers.append(callback)
+        return self
+
+    def release_records(self):
+        """
+        update() edits the Event / Shift objects in place, so a LiveGame keeps them next to the stores
+        """
+        return self
+
+    def retrieve_shifts_from_game(self):
+        rows = [row for row in self.shift_json['data'] if row.get('duration')]
+        self.shift_rows = {row['id']: row for row in rows}
+        self.shift_json = {'data': rows}
+        return super().retrieve_shifts_from_game()
+
+    def retrieve_events_in_game(self):
+        self.plays_seen = len(self.game_json['liveData']['plays']['allPlays'])
+        return super().retrieve_events_in_game()
+
+    def calculate_shared_toi(self):
+        """
+        Shared TOI of each period, summed into the Players as in Game.calculate_shared_toi
+        """
+        self.count('records_in', len(self._shifts))
+        names = list(self._players)
+        for period in self._strength_index.segments:
+            self.period_shared_toi[period] = self.get_shared_toi_between(
+                names, helpers.game_second(period, 0), helpers.game_second(period + 1, 0))
+        for (name, other), strengths in self.get_game_shared_toi(self.get_shared_pairs()).items():
+            self._players[name].add_shared_toi(self.game_id, other, strengths)
+            self.count('records_out', len(strengths))
+        return self
+
+    def get_shared_pairs(self, periods=None):
+        pairs = set()
+        for period in self.period_shared_toi if periods is None else periods:
+            pairs.update(self.period_shared_toi.get(period, {}))
+        return pairs
+
+    def get_game_shared_toi(self, pairs):
+        """
+        {(name, other): {strength: seconds}} summed over the periods, for pairs only
+        """
+        game_toi = {}
+        for period_toi in self.period_shared_toi.values():
+            for pair in pairs:
+                for strength, seconds in period_toi.get(pair, {}).items():
+                    pair_toi = game_toi.setdefault(pair, {})
+                    pair_toi[strength] = pair_toi.get(strength, 0) + seconds
+        return game_toi
+
+    def update_from_feed(self, game_json, shift_json):
+        """
+        Updates from full re-pulls of the live feed and shift chart, picking out the plays and rows not seen yet
+        Plays are appended to the feed in order, so the new ones are the ones past plays_seen
+        """
+        plays = game_json['liveData']['plays']['allPlays']
+        self.roster_json.update(game_json['gameData']['players'])
+        rows = [row for row in shift_json['data'] if self.shift_rows.get(row['id']) != row]
+        return self.update(plays[self.plays_seen:], rows)
+
+    def update(self, new_plays=(), shift_rows=()):
+        """
+        Adds new plays and new / changed shift rows, then re-analyses the game from the earliest one onward
+        Returns the changes passed to subscribers
+        """
+        # Only the stages updated in place, the REBUILT_STAGES stay dropped until they are asked for
+        self.run_stages(*self.UPDATED_STAGES)
+        changes = self.measure('update', self.apply_update, new_plays, shift_rows)
+        for callback in self.subscribers:
+            callback(self, changes)
+        return changes
+
+    def apply_update(self, new_plays, shift_rows):
+        """
+        Body of update(), recorded in stage_records as an 'update' stage
+        Its records_in / records_out are the events re-analysed, bisects are the insorts / lookups of the records
+        """
+        since = None
+        new_events, new_shifts, removed_shifts = [], [], []
+        for play in new_plays:
+            self.plays_seen += 1
+            self.final_score = f"{play['about']['goals']['home']}-{play['about']['goals']['away']}"
+            if play['result']['event'] in helpers.TRACKED_EVENTS:
+                event = Event(play, self.home_team, self.away_team, self._roster)
+                bisect.insort_right(self._events_in_game, event, key=helpers.BY_SORT_KEY)
+                self.count('bisects')
+                new_events.append(event)
+                since = event.game_time if since is None else min(since, event.game_time)
+        for row in shift_rows:
+            if not row.get('duration'):
+                # Shift still in progress, it comes back with its end time in a later pull
+                continue
+            if row['id'] in self.shift_rows:
+                removed = self.remove_shift(Shift(self.game_id, self.home_team, self.shift_rows[row['id']]))
+                if removed:
+                    removed_shifts.append(removed)
+                    since = removed.game_start if since is None else min(since, removed.game_start)
+            self.shift_rows[row['id']] = row
+            shift = Shift(self.game_id, self.home_team, row)
+            if shift.duration == 0:
+                continue
+            self.add_shift(shift, self.roster_json[f"ID{row['playerId']}"])
+            new_shifts.append(shift)
+            since = shift.game_start if since is None else min(since, shift.game_start)
+        changes = {'since': since, 'events': new_events, 'shifts': new_shifts, 'removed_shifts': removed_shifts,
+                   'periods': [], 'shared_toi': {}}
+        if since is not None:
+            self.update_since(since, changes)
+        return changes
+
+    def add_shift(self, shift, player_json):
+        """
+        Adds a shift to the game and its player, creating the Player from player_json on their first shift
+        """
+        if shift.player not in self._players:
+            player = Player(player_json)
+            self._players[player.name] = player
+            if 'G' in player.position:
+                self.add_goalie(player)
+        bisect.insort_right(self._shifts, shift, key=helpers.BY_SORT_KEY)
+        player_shifts = self._players[shift.player].shifts.setdefault(self.game_id, [])
+        bisect.insort_right(player_shifts, shift, key=helpers.BY_SORT_KEY)
+        self.count('bisects', 2)
+        return self
+
+    def remove_shift(self, shift):
+        """
+        Removes the shift equal to shift (same sort_key), returns the removed Shift or None
+        """
+        i = bisect.bisect_left(self._shifts, shift.sort_key, key=helpers.BY_SORT_KEY)
+        self.count('bisects')
+        if i == len(self._shifts) or self._shifts[i] != shift:
+            return None
+        removed = self._shifts.pop(i)
+        player_shifts = self._players[removed.player].shifts[self.game_id]
+        player_shifts.pop(bisect.bisect_left(player_shifts, removed.sort_key, key=helpers.BY_SORT_KEY))
+        self.count('bisects')
+        return removed
+
+    def update_since(self, since, changes):
+        """
+        Re-analyses everything from the game second since onward, filling changes with what moved
+        """
+        events = self._events_in_game
+        first = bisect.bisect_left(events, since, key=helpers.BY_GAME_TIME)
+        new_events = set(map(id, changes['events']))
+        before = {id(event): self.get_event_results(event) for event in events[first:]
+                  if id(event) not in new_events}
+        # On-ice players, from every shift still on the ice at since, shifts never span periods
+        since_period = since // helpers.PERIOD_LENGTH + 1
+        first_shift = bisect.bisect_left(self._shifts, (since_period, -1), key=helpers.BY_PERIOD_START)
+        self.count('bisects', 2)
+        shifts = [shift for shift in self._shifts[first_shift:] if shift.game_end >= since]
+        goalies = self.home_goalie.union(self.away_goalie)
+        self.sweep_on_ice(self.get_sweep_points(goalies, shifts, events[first:]))
+        self.add_time_since_features(first)
+        for event in events[first:]:
+            if id(event) in before and before[id(event)] != self.get_event_results(event):
+                changes['events'].append(event)
+        # Strength segments and shared TOI of the periods from since onward
+        last_period = max([since_period] + [shift.period for shift in self._shifts[-1:]])
+        periods = list(range(since_period, last_period + 1))
+        for period in periods:
+            self._strength_index.build_period(period, [shift for shift in self._shifts[first_shift:]
+                                                       if shift.period == period and shift.player not in goalies])
+        names = list(self._players)
+        old_pairs = self.get_shared_pairs(periods)
+        old_toi = self.get_game_shared_toi(old_pairs)
+        for period in periods:
+            self.period_shared_toi[period] = self.get_shared_toi_between(
+                names, helpers.game_second(period, 0), helpers.game_second(period + 1, 0))
+        new_toi = self.get_game_shared_toi(old_pairs | self.get_shared_pairs(periods))
+        for pair in old_toi.keys() | new_toi.keys():
+            if old_toi.get(pair) != new_toi.get(pair):
+                name, other = pair
+                by_game = self._players[name].ice_time_with_players.setdefault(other, {})
+                if pair in new_toi:
+                    by_game[self.game_id] = dict(new_toi[pair])
+                else:
+                    by_game.pop(self.game_id, None)
+                changes['shared_toi'][pair] = new_toi.get(pair, {})
+        changes['periods'] = periods
+        # Columnar stores and the on-ice index are rebuilt the next time they are asked for
+        self.stages_run.difference_update(self.REBUILT_STAGES)
+        self.stages_done.difference_update(self.REBUILT_STAGES)
+        self._event_store = self._shift_store = self._on_ice_index = self._location_features = None
+        return self
+
+    @staticmethod
+    def get_event_results(event):
+        return event.players_on, event.strength, tuple(getattr(event, feature)
+                                                        for feature in helpers.TIME_SINCE_FEATURES)
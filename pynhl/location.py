@@ -0,0 +1,129 @@
+'''
+Shot location features for whole columns of events, one game or a season at a time
+Coordinates are flipped so the team of each event attacks towards +x, then measured against the net at (89, 0)
+Events without coordinates are NaN throughout and False in the 'valid' mask
+'''
+from pynhl.store import AWAY, EVENT_TYPE_CODES, HOME
+import numpy
+
+NET_X, NET_Y = 89.0, 0.0
+SHOT_EVENTS = {"Shot", "Missed Shot", "Blocked Shot", "Goal"}
+SHOT_CODES = numpy.array(sorted(EVENT_TYPE_CODES[type_of_event] for type_of_event in SHOT_EVENTS))
+
+
+def get_rink_sides(game_json):
+    """
+    {period: True if the home team attacks towards +x}, from liveData.linescore of the live feed
+    The home rinkSide is the end it defends, periods without one are left out
+    """
+    rink_sides = {}
+    for period in game_json.get('liveData', {}).get('linescore', {}).get('periods', []):
+        side = period.get('home', {}).get('rinkSide')
+        if side in ('left', 'right'):
+            rink_sides[period['num']] = side == 'left'
+    return rink_sides
+
+
+def infer_rink_sides(period, team_code, x_loc, type_code):
+    """
+    {period: True if the home team attacks towards +x}, from the side of the rink each team shot from
+    For feeds without rinkSide, ie streamed feeds or older seasons
+    """
+    shots = numpy.isin(type_code, SHOT_CODES) & ~numpy.isnan(x_loc)
+    # Home shots vote for the sign of their x, away shots for the opposite
+    votes = numpy.sign(x_loc[shots]) * numpy.where(team_code[shots] == HOME, 1, -1)
+    totals = numpy.bincount(period[shots], weights=votes, minlength=int(period.max(initial=0)) + 1)
+    return {int(p): bool(totals[p] >= 0) for p in numpy.unique(period)}
+
+
+def get_attacks_right(period, team_code, home_attacks_right):
+    """
+    Boolean column, True where the team of the event attacks towards +x
+    home_attacks_right is a {period: bool} dict, or an array indexed by period
+    """
+    if isinstance(home_attacks_right, dict):
+        lookup = numpy.ones(max(home_attacks_right, default=0) + 1, dtype=bool)
+        for p, attacks_right in home_attacks_right.items():
+            lookup[p] = attacks_right
+        home_attacks_right = lookup
+    return home_attacks_right[period] ^ (team_code == AWAY)
+
+
+def get_location_features(x_loc, y_loc, attacks_right):
+    """
+    Rink normalized coordinates, distance (feet) and angle (degrees off the centre line) to the net
+    Returns {'valid', 'x', 'y', 'distance', 'angle'} columns
+    """
+    direction = numpy.where(attacks_right, 1.0, -1.0)
+    x_norm = numpy.asarray(x_loc, dtype=numpy.float64) * direction
+    y_norm = numpy.asarray(y_loc, dtype=numpy.float64) * direction
+    to_net_x, to_net_y = NET_X - x_norm, NET_Y - y_norm
+    return {
+        'valid': ~(numpy.isnan(x_norm) | numpy.isnan(y_norm)),
+        'x': x_norm,
+        'y': y_norm,
+        'distance': numpy.hypot(to_net_x, to_net_y),
+        # 0 straight in front of the net, over 90 from behind the goal line
+        'angle': numpy.degrees(numpy.arctan2(numpy.abs(to_net_y), to_net_x)),
+    }
+
+
+def get_event_columns(store):
+    """
+    numpy columns of an EventStore used for location features
+    """
+    return {
+        'period': numpy.asarray(store.period, dtype=numpy.intp),
+        'team_code': numpy.asarray(store.team_code, dtype=numpy.int8),
+        'type_code': numpy.asarray(store.type_code, dtype=numpy.int8),
+        'x_loc': numpy.asarray(store.x_loc, dtype=numpy.float64),
+        'y_loc': numpy.asarray(store.y_loc, dtype=numpy.float64),
+    }
+
+
+def get_home_attacks_right(game, columns):
+    """
+    Attacking direction of the home team each period, from the feed with inferred gaps
+    """
+    home_attacks_right = infer_rink_sides(columns['period'], columns['team_code'], columns['x_loc'],
+                                          columns['type_code'])
+    home_attacks_right.update(game.rink_sides)
+    return home_attacks_right
+
+
+def get_game_location_features(game):
+    """
+    Location features of every event of a Game, rows follow game.event_store
+    """
+    columns = get_event_columns(game.event_store)
+    attacks_right = get_attacks_right(columns['period'], columns['team_code'],
+                                      get_home_attacks_right(game, columns))
+    return get_location_features(columns['x_loc'], columns['y_loc'], attacks_right)
+
+
+def get_season_location_features(games):
+    """
+    Location features of every event of many Games in one pass over the concatenated columns
+    Adds a 'game_id' column, rows follow each game's event_store in the order of games
+    """
+    game_ids, columns, directions = [], [], []
+    for game in games:
+        game_columns = get_event_columns(game.event_store)
+        game_ids.append(numpy.full(len(game_columns['period']), game.game_id, dtype=numpy.int64))
+        columns.append(game_columns)
+        directions.append(get_home_attacks_right(game, game_columns))
+    if not columns:
+        return {'game_id': numpy.zeros(0, dtype=numpy.int64),
+                **get_location_features(numpy.zeros(0), numpy.zeros(0), numpy.zeros(0, dtype=bool))}
+    # (games x periods) table of the home team's direction, gathered for every row at once
+    lookup = numpy.ones((len(directions), max(max(d, default=0) for d in directions) + 1), dtype=bool)
+    for game_i, home_attacks_right in enumerate(directions):
+        for period, attacks_right in home_attacks_right.items():
+            lookup[game_i, period] = attacks_right
+    game_index = numpy.concatenate([numpy.full(len(c['period']), i, dtype=numpy.intp) for i, c in enumerate(columns)])
+    period = numpy.concatenate([c['period'] for c in columns])
+    team_code = numpy.concatenate([c['team_code'] for c in columns])
+    attacks_right = lookup[game_index, period] ^ (team_code == AWAY)
+    features = get_location_features(numpy.concatenate([c['x_loc'] for c in columns]),
+                                     numpy.concatenate([c['y_loc'] for c in columns]), attacks_right)
+    return {'game_id': numpy.concatenate(game_ids), **features}
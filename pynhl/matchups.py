@@ -0,0 +1,191 @@
+'''
+Head to head matchup cubes, seconds every pair of players shared the ice by strength, as teammates and opponents
+'''
+import pynhl.helpers as helpers
+import numpy
+
+# Factor the blocks grow by when merge() runs out of room
+GROWTH = 1.5
+
+
+class MatchupCube:
+    """
+    Dense (players x players x strengths) blocks of shared seconds
+
+    player_ids : NHL player ids in the order of both player axes, sorted unless players were added by merge()
+    strengths : strength of each index of the last axis, from the first (row) player's team perspective
+    with_toi : seconds as teammates, against_toi : seconds as opponents
+    A season cube is the sum of its games' cubes, merge_all() allocates it once for every player and strength
+    """
+
+    def __init__(self, player_ids=(), strengths=()):
+        self.player_ids = sorted(player_ids)
+        self.index = {player_id: i for i, player_id in enumerate(self.player_ids)}
+        self.strengths = list(strengths)
+        self.names = {}  # player id : name
+        # Blocks are allocated with room to spare once merge() grows them, with_toi / against_toi are the used part
+        self.with_blocks = self.against_blocks = None
+        self.allocate(len(self.player_ids), len(self.strengths))
+        self.game_ids = set()
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    @property
+    def with_toi(self):
+        return self.with_blocks[:len(self.player_ids), :len(self.player_ids), :len(self.strengths)]
+
+    @property
+    def against_toi(self):
+        return self.against_blocks[:len(self.player_ids), :len(self.player_ids), :len(self.strengths)]
+
+    def allocate(self, players, strengths):
+        """
+        Allocates blocks with room for players and strengths, copying over the used part of the current blocks
+        """
+        shape = (players, players, strengths)
+        with_blocks, against_blocks = numpy.zeros(shape, dtype=numpy.int32), numpy.zeros(shape, dtype=numpy.int32)
+        if self.with_blocks is not None:
+            used = (slice(len(self.player_ids)), slice(len(self.player_ids)), slice(len(self.strengths)))
+            with_blocks[used], against_blocks[used] = self.with_toi, self.against_toi
+        self.with_blocks, self.against_blocks = with_blocks, against_blocks
+        return self
+
+    def reserve(self, players, strengths):
+        """
+        Makes room for players and strengths, growing the blocks by GROWTH at least so repeated merges stay linear
+        """
+        players_room, _, strengths_room = self.with_blocks.shape
+        if players > players_room or strengths > strengths_room:
+            self.allocate(max(players, int(players_room * GROWTH)) if players > players_room else players_room,
+                          max(strengths, int(strengths_room * GROWTH)) if strengths > strengths_room else strengths_room)
+        return self
+
+    def __str__(self):
+        return f"MatchupCube: {len(self)} players, {len(self.strengths)} strengths, {len(self.game_ids)} games"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def from_game(cls, game):
+        """
+        Cube of one game, one matrix product (A.T * A) of the on-ice matrix per strength
+        The product counts every pair, the team of each player splits it into teammates and opponents
+        """
+        names = list(game.players)
+        on_ice = game.get_on_ice_matrix(names)
+        states, per_second_state = game.get_per_second_states(0, len(on_ice))
+        strengths = sorted(set(states) | {helpers.swap_state(strength) for strength in states})
+        players = [game.players[name] for name in names]
+        cube = cls((player.player_id for player in players), strengths)
+        cube.names = {player.player_id: player.name for player in players}
+        cube.game_ids.add(game.game_id)
+        # Game order of names -> cube order of player ids
+        order = numpy.array([cube.index[player.player_id] for player in players], dtype=numpy.intp)
+        away = numpy.array([game.get_player_team(name) == game.away_team for name in names])
+        teammates = away[:, None] == away[None, :]
+        numpy.fill_diagonal(teammates, False)
+        for state_i, strength in enumerate(states):
+            in_state = on_ice[per_second_state == state_i].astype(numpy.int32)
+            shared = in_state.T @ in_state
+            # Rows of away players are stored at the swapped strength
+            home_strength, away_strength = strengths.index(strength), strengths.index(helpers.swap_state(strength))
+            for rows, strength_i in ((~away, home_strength), (away, away_strength)):
+                block = numpy.ix_(order[rows], order, [strength_i])
+                cube.with_toi[block] += numpy.where(teammates, shared, 0)[rows][:, :, None]
+                cube.against_toi[block] += numpy.where(~teammates & ~numpy.eye(len(names), dtype=bool),
+                                                       shared, 0)[rows][:, :, None]
+        return cube
+
+    def merge(self, other):
+        """
+        Adds another cube into this one, players / strengths this cube doesn't have are added to the end of its axes
+        """
+        self.check_games(other)
+        new_ids = sorted(set(other.player_ids).difference(self.index))
+        new_strengths = [strength for strength in other.strengths if strength not in self.strengths]
+        self.reserve(len(self.player_ids) + len(new_ids), len(self.strengths) + len(new_strengths))
+        for player_id in new_ids:
+            self.index[player_id] = len(self.player_ids)
+            self.player_ids.append(player_id)
+        self.strengths.extend(new_strengths)
+        return self.add_cube(other)
+
+    def check_games(self, other):
+        if other.game_ids & self.game_ids:
+            raise ValueError(f"Games in both cubes: {sorted(other.game_ids & self.game_ids)}")
+        return self
+
+    def add_cube(self, other):
+        """
+        add_blocks(other), then takes on other's names and games
+        """
+        self.add_blocks(other)
+        self.names.update(other.names)
+        self.game_ids.update(other.game_ids)
+        return self
+
+    def add_blocks(self, other):
+        """
+        Sums the blocks of other into this cube, whose axes must already hold other's players and strengths
+        """
+        players = numpy.array([self.index[player_id] for player_id in other.player_ids], dtype=numpy.intp)
+        strengths = numpy.array([self.strengths.index(strength) for strength in other.strengths], dtype=numpy.intp)
+        block = numpy.ix_(players, players, strengths)
+        self.with_toi[block] += other.with_toi
+        self.against_toi[block] += other.against_toi
+        return self
+
+    @classmethod
+    def merge_all(cls, cubes):
+        """
+        Sums cubes (ie the games of a season) into one cube, allocated once for the union of their players / strengths
+        """
+        cubes = list(cubes)
+        strengths = []
+        for cube in cubes:
+            strengths.extend(strength for strength in cube.strengths if strength not in strengths)
+        season = cls({player_id for cube in cubes for player_id in cube.player_ids}, strengths)
+        for cube in cubes:
+            season.check_games(cube).add_cube(cube)
+        return season
+
+    def get(self, player_id, other_id, against=False):
+        """
+        {strength: seconds} player_id shared with other_id, as teammates or as opponents
+        """
+        toi = self.against_toi if against else self.with_toi
+        seconds = toi[self.index[player_id], self.index[other_id]]
+        return {strength: int(seconds[i]) for i, strength in enumerate(self.strengths) if seconds[i]}
+
+    def get_matchups(self, player_id, against=True, strength=None):
+        """
+        [(other id, seconds)] of everyone player_id shared the ice with, most seconds first
+        Opponents by default, teammates with against=False, every strength unless one is given
+        """
+        if strength is not None and strength not in self.strengths:
+            return []
+        toi = (self.against_toi if against else self.with_toi)[self.index[player_id]]
+        seconds = toi.sum(axis=1) if strength is None else toi[:, self.strengths.index(strength)]
+        order = numpy.argsort(-seconds, kind='stable')
+        return [(self.player_ids[i], int(seconds[i])) for i in order if seconds[i]]
+
+    def save(self, path):
+        numpy.savez_compressed(path, player_ids=numpy.array(self.player_ids, dtype=numpy.int64),
+                               strengths=numpy.array(self.strengths), with_toi=self.with_toi,
+                               against_toi=self.against_toi,
+                               game_ids=numpy.array(sorted(self.game_ids), dtype=numpy.int64),
+                               name_ids=numpy.array(list(self.names), dtype=numpy.int64),
+                               names=numpy.array(list(self.names.values())))
+        return self
+
+    @classmethod
+    def load(cls, path):
+        with numpy.load(path) as saved:
+            cube = cls(saved['player_ids'].tolist(), saved['strengths'].tolist())
+            cube.with_toi[...] = saved['with_toi']
+            cube.against_toi[...] = saved['against_toi']
+            cube.game_ids = set(saved['game_ids'].tolist())
+            cube.names = dict(zip(saved['name_ids'].tolist(), saved['names'].tolist()))
+        return cube
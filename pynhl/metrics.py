@@ -0,0 +1,87 @@
+import json, time, tracemalloc
+
+
+class StageHook:
+    """
+    Called around every Game stage, subclasses add their measurements to the stage's record
+    """
+
+    def start(self, game, stage):
+        pass
+
+    def stop(self, game, stage, record):
+        pass
+
+
+class TimingHook(StageHook):
+    """
+    Wall time of the stage, in seconds, leaving out any stage that ran nested inside it
+    Nested stages are kept on a stack, so the times of a game's stages add up to the game's time
+    """
+
+    def __init__(self):
+        self.running = []  # [start, seconds of nested stages] of each running stage
+
+    def start(self, game, stage):
+        self.running.append([time.perf_counter(), 0.0])
+
+    def stop(self, game, stage, record):
+        started, nested = self.running.pop()
+        elapsed = time.perf_counter() - started
+        record['wall_seconds'] = elapsed - nested
+        if self.running:
+            self.running[-1][1] += elapsed
+
+
+class MemoryHook(StageHook):
+    """
+    Peak Python memory allocated during the stage, in bytes, as traced by tracemalloc
+    A nested stage resets the traced peak, so the peak so far of each running stage is kept on a stack
+    Tracing slows every allocation down, so only add this hook when memory is being looked at
+    """
+
+    def __init__(self):
+        self.running = []  # [baseline, peak so far] of each running stage
+
+    def start(self, game, stage):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.running:
+            self.running[-1][1] = max(self.running[-1][1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self.running.append([tracemalloc.get_traced_memory()[0], 0])
+
+    def stop(self, game, stage, record):
+        baseline, peak = self.running.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        record['peak_bytes'] = peak - baseline
+        if self.running:
+            self.running[-1][1] = max(self.running[-1][1], peak)
+
+
+def write_json_lines(records, json_file):
+    """
+    Writes one stage record per line
+    """
+    for record in records:
+        json_file.write(json.dumps(record) + "\n")
+
+
+def aggregate_stage_records(records, by='stage'):
+    """
+    Totals stage records by a field (stage or game_id)
+    Counters and times are summed, peak_bytes keeps the largest peak
+    Returns {value of by: {field: total}}
+    """
+    totals = {}
+    for record in records:
+        total = totals.setdefault(record[by], {'stages': 0})
+        total['stages'] += 1
+        for field, value in record.items():
+            if field in ('game_id', 'stage') or not isinstance(value, (int, float)):
+                continue
+            if field == 'peak_bytes':
+                total[field] = max(total.get(field, 0), value)
+            else:
+                total[field] = total.get(field, 0) + value
+    return totals
@@ -0,0 +1,122 @@
+from pynhl.store import ShiftRows, ShiftStore
+from array import array
+import pynhl.helpers as helpers
+import bisect
+import numpy
+
+
+class OnIceIndex:
+    """
+    Who is on the ice at any second of a game, built once from the shifts
+
+    The game is cut into segments at every shift start / end, each segment holds the players on the ice for all of
+    it, so a point query is one bisect of the segment boundaries
+    Shifts cover the seconds [game_start, game_end), the same as the on-ice matrix of Game.calculate_shared_toi
+    Times are (period, seconds into the period), or game seconds (helpers.game_second) for the batch queries
+    """
+
+    def __init__(self, shifts):
+        self.shifts = sorted((shift for shift in shifts if shift.game_start < shift.game_end),
+                             key=lambda shift: (shift.game_start, shift.game_end, shift.player))
+        if isinstance(shifts, ShiftStore):
+            # Only the row numbers of a ShiftStore are kept, views are made as the shifts are read
+            self.shifts = ShiftRows(shifts, [shift.index for shift in self.shifts])
+        self.shift_starts = array('i', (shift.game_start for shift in self.shifts))
+        # Longest shift, a shift overlapping [lb, ub) has to start in [lb - longest, ub)
+        self.longest = max((shift.game_end - shift.game_start for shift in self.shifts), default=0)
+        self.players = sorted({shift.player for shift in self.shifts})
+        self.player_index = {player: i for i, player in enumerate(self.players)}
+        self.teams = {shift.player: shift.team for shift in self.shifts}
+        self.boundaries, self.on_ice = self.build_segments()
+        self.boundary_array = numpy.array(self.boundaries, dtype=numpy.int64)
+        # (segments x players) membership, for the batch queries
+        self.matrix = numpy.zeros((len(self.on_ice), len(self.players)), dtype=bool)
+        for segment, players in enumerate(self.on_ice):
+            self.matrix[segment, [self.player_index[player] for player in players]] = True
+
+    def __len__(self):
+        return len(self.on_ice)
+
+    def __str__(self):
+        return f"OnIceIndex: {len(self.shifts)} shifts, {len(self.players)} players, {len(self)} segments"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def build_segments(self):
+        """
+        Sweeps the shift starts / ends into boundaries[i] : the first second of segment i
+        and on_ice[i] : frozenset of the players on the ice during segment i
+        """
+        changes = {}  # Game second : {player: +1 start / -1 end}
+        for shift in self.shifts:
+            start = changes.setdefault(shift.game_start, {})
+            start[shift.player] = start.get(shift.player, 0) + 1
+            end = changes.setdefault(shift.game_end, {})
+            end[shift.player] = end.get(shift.player, 0) - 1
+        boundaries, on_ice = [], []
+        open_shifts = {}  # Player : open shifts
+        for second in sorted(changes):
+            for player, change in changes[second].items():
+                open_shifts[player] = open_shifts.get(player, 0) + change
+                if open_shifts[player] == 0:
+                    del open_shifts[player]
+            boundaries.append(second)
+            on_ice.append(frozenset(open_shifts))
+        return boundaries, on_ice
+
+    def split_by_team(self, players):
+        by_team = {}
+        for player in players:
+            by_team.setdefault(self.teams[player], set()).add(player)
+        return by_team
+
+    def players_at(self, game_second):
+        """
+        frozenset of the players on the ice at a game second
+        """
+        i = bisect.bisect_right(self.boundaries, game_second) - 1
+        return self.on_ice[i] if i >= 0 else frozenset()
+
+    def on_ice_at(self, period, time):
+        """
+        {team: set(players)} on the ice at a second of a period
+        """
+        return self.split_by_team(self.players_at(helpers.game_second(period, time)))
+
+    def shifts_overlapping(self, period, lb, ub):
+        """
+        Shifts overlapping the interval [lb, ub) of a period, in order of their start
+        """
+        lb, ub = helpers.game_second(period, lb), helpers.game_second(period, ub)
+        first = bisect.bisect_left(self.shift_starts, lb - self.longest)
+        last = bisect.bisect_left(self.shift_starts, ub)
+        return [shift for shift in self.shifts[first:last] if shift.game_end > lb]
+
+    def on_ice_during(self, period, lb, ub):
+        """
+        {team: set(players)} on the ice for any part of the interval [lb, ub) of a period
+        """
+        return self.split_by_team(shift.player for shift in self.shifts_overlapping(period, lb, ub))
+
+    def segments_at(self, game_seconds):
+        """
+        Segment of every game second in an array, -1 before the first shift
+        """
+        return numpy.searchsorted(self.boundary_array, numpy.asarray(game_seconds), side='right') - 1
+
+    def matrix_at(self, game_seconds):
+        """
+        (times x players) boolean matrix of who is on the ice at every game second in an array
+        Columns follow self.players
+        """
+        segments = self.segments_at(game_seconds)
+        on_ice = self.matrix[numpy.maximum(segments, 0)]
+        on_ice[segments < 0] = False
+        return on_ice
+
+    def on_ice_at_many(self, game_seconds):
+        """
+        [frozenset(players)] on the ice at every game second in an array
+        """
+        return [self.on_ice[i] if i >= 0 else frozenset() for i in self.segments_at(game_seconds).tolist()]
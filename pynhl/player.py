@@ -1,6 +1,11 @@
+import pynhl.helpers as helpers
+import bisect, statistics
+
+
 class Player:
     # Player will have shifts where each shift can have event(s)
     def __init__(self, player_json):
+        self.player_id = player_json["id"]
         self.name = player_json["fullName"]
         self.position = player_json["primaryPosition"]["type"]
         self.parse_position_type()
@@ -22,7 +27,7 @@ class Player:
         # self.average_time_per_shift = None
         # self.average_time_since_previous_shift = None
         # self.average_events_per_shift = None
-        # self.most_common_teammates_per_game = {}  # Game:Players
+        self.most_common_teammates_per_game = {}  # Game:(Players, seconds together)
         # self.ice_time_per_game = {}  # GameID:Total
 
     def __eq__(self, other):
@@ -76,26 +81,66 @@ class Player:
 
     def retrieve_shifts_from_game(self, shifts_from_game):
         """Function to grab all the shifts from a game object"""
-        pass
+        for shift in shifts_from_game:
+            if shift.player == self.name:
+                self.shifts.setdefault(shift.game_id, []).append(shift)
+        for game_shifts in self.shifts.values():
+            game_shifts.sort(key=helpers.BY_SORT_KEY)
+        return self
 
     def get_average_time_per_shift(self):
-        """Determine the mean/median from all shifts in a game, across all games as well"""
-        pass
+        """
+        Determine the mean/median from all shifts in a game, across all games as well
+        Returns (mean, median) in seconds, (0, 0) without shifts
+        """
+        durations = [shift.duration for game_shifts in self.shifts.values() for shift in game_shifts]
+        if not durations:
+            return 0, 0
+        return statistics.mean(durations), statistics.median(durations)
 
-    def get_previous_shift_in_game(self):
-        """Helper function to fetch the previous shift in a game"""
-        pass
+    def get_previous_shift_in_game(self, game_id, shift):
+        """Helper function to fetch the previous shift in a game, None for the first shift"""
+        game_shifts = self.shifts.get(game_id, [])
+        i = bisect.bisect_left(game_shifts, shift.sort_key, key=helpers.BY_SORT_KEY)
+        return game_shifts[i - 1] if i > 0 else None
 
     def get_average_time_between_shifts(self):
-        """Function to determine how long the player is off the ice"""
-        pass
+        """
+        Function to determine how long the player is off the ice
+        Mean seconds between the end of a shift and the start of the next one in the same period, 0 without any
+        """
+        gaps = [shift.start - previous.end for game_shifts in self.shifts.values()
+                for previous, shift in zip(game_shifts, game_shifts[1:])
+                if previous.period == shift.period and shift.start >= previous.end]
+        return statistics.mean(gaps) if gaps else 0
 
-    def get_average_events_per_shift(self):
-        """Function to fetch how many events occur per shift the player is on the ice"""
+    def get_average_events_per_shift(self, events_in_games):
+        """
+        Function to fetch how many events occur per shift the player is on the ice
+        events_in_games is {GameID: Game.events_in_game}, only events with the player in players_on are counted
+        """
+        shift_events = []
+        for game_id, game_shifts in self.shifts.items():
+            events = events_in_games.get(game_id, [])
+            for shift in game_shifts:
+                lb = bisect.bisect_left(events, (shift.period, shift.start), key=helpers.BY_SORT_KEY)
+                ub = bisect.bisect_right(events, (shift.period, shift.end), key=helpers.BY_SORT_KEY)
+                shift_events.append(sum(1 for event in events[lb:ub] if self.name in event.roster and
+                                        event.on_ice_mask(self.team) >> event.roster.bits[self.name] & 1))
+        return statistics.mean(shift_events) if shift_events else 0
 
-    def determine_players_most_common_partners(self):
+    def determine_players_most_common_partners(self, lines):
         """
         For each game, determine the player's most common two forwards & defenseman
-        :return:
+        lines is a pynhl.lines.LineCombinations holding the player's games
+        Sets / returns most_common_teammates_per_game, {GameID: (partner names, seconds as a unit)}
         """
-        pass
+        if self.position not in ('F', 'D'):
+            return self.most_common_teammates_per_game
+        for game_id in self.shifts:
+            units = lines.get_player_units(self.player_id, self.position, game_id=game_id)
+            if units:
+                unit, seconds = units[0]
+                partners = tuple(name for name in lines.get_unit_names(unit) if name != self.name)
+                self.most_common_teammates_per_game[game_id] = (partners, seconds)
+        return self.most_common_teammates_per_game
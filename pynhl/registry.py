@@ -0,0 +1,126 @@
+'''
+Season level registry of players, keyed by NHL player id instead of full name
+Games are folded in one at a time, and registries built in separate workers merge by addition
+'''
+import sys
+
+
+class PlayerRegistry:
+    """
+    Players and their shared time on ice across many games
+
+    names / teams / positions : {player id: value}, names are interned so every game shares one string
+    games : {player id: set(game ids)}
+    shared_toi : {(player id, other id): {strength: seconds}}, running totals over every game
+    shared_toi_by_game : {game id: {(player id, other id): {strength: seconds}}}
+    Strengths are from the first player's team perspective, the same as Player.ice_time_with_players
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.teams = {}
+        self.positions = {}
+        self.games = {}
+        self.shared_toi = {}
+        self.shared_toi_by_game = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, player_id):
+        return player_id in self.names
+
+    def __str__(self):
+        return f"PlayerRegistry: {len(self)} players, {len(self.shared_toi_by_game)} games"
+
+    def __repr__(self):
+        return self.__str__()
+
+    @classmethod
+    def from_game(cls, game):
+        return cls().add_game(game)
+
+    def add_player(self, player_id, name, team, position):
+        """
+        Adds / updates a player, the latest team seen is kept
+        """
+        self.names[player_id] = sys.intern(name)
+        self.teams[player_id] = sys.intern(team)
+        self.positions[player_id] = position
+        self.games.setdefault(player_id, set())
+        return self
+
+    def add_game(self, game):
+        """
+        Folds one Game's players and shared TOI into the registry, a game already folded in is skipped
+        """
+        if game.game_id in self.shared_toi_by_game:
+            return self
+        ids = {name: player.player_id for name, player in game.players.items()}
+        for player in game.players.values():
+            self.add_player(player.player_id, player.name, player.team, player.position)
+            self.games[player.player_id].add(game.game_id)
+        game_toi = {}
+        for name, others in game.shared_toi.items():
+            for other, strengths in others.items():
+                game_toi[(ids[name], ids[other])] = dict(strengths)
+        self.add_game_toi(game.game_id, game_toi)
+        return self
+
+    def add_game_toi(self, game_id, game_toi):
+        """
+        Adds the per pair shared TOI of one game to the breakdown and the running totals
+        """
+        self.shared_toi_by_game[game_id] = game_toi
+        for pair, strengths in game_toi.items():
+            totals = self.shared_toi.setdefault(pair, {})
+            for strength, seconds in strengths.items():
+                totals[strength] = totals.get(strength, 0) + seconds
+        return self
+
+    def merge(self, other):
+        """
+        Adds another registry into this one, ie one built in a different worker
+        Games found in both registries are only counted once
+        """
+        for player_id, name in other.names.items():
+            self.add_player(player_id, name, other.teams[player_id], other.positions[player_id])
+            self.games[player_id].update(other.games[player_id])
+        for game_id, game_toi in other.shared_toi_by_game.items():
+            if game_id not in self.shared_toi_by_game:
+                self.add_game_toi(game_id, game_toi)
+        return self
+
+    @classmethod
+    def merge_all(cls, registries):
+        season = cls()
+        for registry in registries:
+            season.merge(registry)
+        return season
+
+    def find(self, name):
+        """
+        Ids of every player with this full name, names are not unique across the league
+        """
+        return [player_id for player_id, player_name in self.names.items() if player_name == name]
+
+    def get_shared_toi(self, player_id, other_id, game_id=None):
+        """
+        {strength: seconds} shared by the two players, over every game or only game_id
+        """
+        pairs = self.shared_toi if game_id is None else self.shared_toi_by_game.get(game_id, {})
+        return dict(pairs.get((player_id, other_id), {}))
+
+    def get_linemates(self, player_id, strength=None):
+        """
+        [(other id, seconds)] of every player who shared the ice with player_id, most seconds first
+        Counts every strength unless one is given
+        """
+        linemates = []
+        for (p_id, other_id), strengths in self.shared_toi.items():
+            if p_id == player_id:
+                seconds = sum(strengths.values()) if strength is None else strengths.get(strength, 0)
+                if seconds:
+                    linemates.append((other_id, seconds))
+        linemates.sort(key=lambda linemate: linemate[1], reverse=True)
+        return linemates
@@ -0,0 +1,93 @@
+import numpy
+
+
+class RosterIndex:
+    """
+    Maps every player of one game to a bit, so a set of players is one int mask
+    Masks of a game fit in 64 bits (a game dresses 40 players), so columns of masks can be numpy uint64 arrays
+    """
+    MAX_PLAYERS = 64
+
+    def __init__(self, home_team, away_team, names=()):
+        self.home_team = home_team
+        self.away_team = away_team
+        self.names = []  # bit : name
+        self.bits = {}  # name : bit
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.bits
+
+    def __str__(self):
+        return f"RosterIndex: {self.home_team} vs.{self.away_team} {len(self)} players"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def add(self, name):
+        """
+        Bit of name, giving it the next free bit the first time it is seen
+        """
+        if name not in self.bits:
+            if len(self.names) == self.MAX_PLAYERS:
+                raise OverflowError(f"More than {self.MAX_PLAYERS} players in one game")
+            self.bits[name] = len(self.names)
+            self.names.append(name)
+        return self.bits[name]
+
+    def flag(self, name):
+        return 1 << self.add(name)
+
+    def mask(self, names):
+        """
+        int mask of a collection of names
+        """
+        mask = 0
+        for name in names:
+            mask |= 1 << self.add(name)
+        return mask
+
+    def players(self, mask):
+        """
+        set of the names in a mask
+        """
+        names = set()
+        while mask:
+            low_bit = mask & -mask
+            names.add(self.names[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return names
+
+    @staticmethod
+    def as_array(masks):
+        return numpy.asarray(masks, dtype=numpy.uint64)
+
+    def with_player(self, masks, name):
+        """
+        Boolean array, True for every mask in masks (ie a column of an EventStore) that has name in it
+        """
+        return (self.as_array(masks) & numpy.uint64(1 << self.bits[name])) != 0
+
+    def counts(self, masks):
+        """
+        Players in every mask of masks, ie the skaters each team had on the ice for every event
+        """
+        return numpy.bitwise_count(self.as_array(masks))
+
+    def matrix(self, masks):
+        """
+        (masks x players) boolean matrix, columns follow self.names
+        """
+        bits = numpy.arange(len(self.names), dtype=numpy.uint64)
+        return ((self.as_array(masks)[:, None] >> bits) & numpy.uint64(1)).astype(bool)
+
+    def co_occurrence(self, masks):
+        """
+        (players x players) count of masks holding both players, the diagonal is each player's own count
+        """
+        on = self.matrix(masks).astype(numpy.int32)
+        return on.T @ on
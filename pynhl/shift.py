@@ -1,61 +1,52 @@
-from pynhl.event import Event
-import datetime
-
-
-def convert_to_time(str_to_time):
-    """
-    Takes a string and converts it to datetime.time() object
-    """
-    return datetime.datetime.strptime(str_to_time, "%M:%S").time()
+import pynhl.helpers as helpers
 
 
 class Shift:
+    __slots__ = ('game_id', 'team', 'player', 'shift_number_in_game', 'period', 'start', 'end', 'game_start',
+                 'game_end', 'duration', 'score', 'sort_key')
+
     def __init__(self, game_id, home_team, shift_json):
         self.game_id = game_id
         self.team = shift_json['teamAbbrev']
         self.player = f"{shift_json['firstName']} {shift_json['lastName']}"
         self.shift_number_in_game = shift_json['shiftNumber']
         self.period = int(shift_json['period'])
-        self.start = convert_to_time(shift_json['startTime'])
-        self.end = convert_to_time(shift_json['endTime'])
+        # Seconds into the period, and seconds into the game
+        self.start = helpers.convert_to_seconds(shift_json['startTime'])
+        self.end = helpers.convert_to_seconds(shift_json['endTime'])
+        self.game_start = helpers.game_second(self.period, self.start)
+        self.game_end = helpers.game_second(self.period, self.end)
         self.duration = shift_json['duration']
         self.duration_to_seconds()
         self.score = (shift_json['homeScore'], shift_json['visitingScore'])
         self.normalize_score(home_team)
-        self.events_during_shift = []  # Events that happened during the shift
+        # Total order used to sort and bisect shifts
+        self.sort_key = (self.period, self.start, self.end, self.player)
 
     def __eq__(self, other):
-        if self.period == other.period:
-            return self.start < other.start
-        else:
-            return self.period < other.period
+        if isinstance(other, Shift):
+            return self.sort_key == other.sort_key
+        return NotImplemented
 
     def __hash__(self):
-        return hash(self.period) + hash(self.duration)
+        return hash(self.sort_key)
 
     def __str__(self):
-        return f"{self.player}:{self.period}:{self.start}:{self.end}"
+        return f"{self.player}:{self.period}:{helpers.seconds_to_minutes(self.start)}:" \
+               f"{helpers.seconds_to_minutes(self.end)}"
 
     def __repr__(self):
         return self.__str__()
 
     def __lt__(self, other):
         if isinstance(other, Shift):
-            if self.period == other.period:
-                return self.end <= other.start
-            else:
-                return self.period < other.period
-        elif isinstance(other, Event):
-            if self.period == other.period:
-                return self.start <= other.time
-            else:
-                return self.period < other.period
-        else:
-            # Comparing datetime's, not a shift
-            return self.start <= other
+            return self.sort_key < other.sort_key
+        return NotImplemented
 
     def __gt__(self, other):
-        return not (self < other)
+        if isinstance(other, Shift):
+            return self.sort_key > other.sort_key
+        return NotImplemented
 
     def normalize_score(self, home_team):
         if self.team == home_team:
@@ -71,9 +62,6 @@ class Shift:
         if not self.duration:
             self.duration = 0
             return self
-        if not isinstance(self.duration, datetime.time):
-            self.duration = convert_to_time(self.duration)
-        minutes = self.duration.minute
-        seconds = self.duration.second
-        self.duration = minutes * 60 + seconds
+        if not isinstance(self.duration, int):
+            self.duration = helpers.convert_to_seconds(self.duration)
         return self
@@ -0,0 +1,401 @@
+from array import array
+from pynhl.event import Event
+from pynhl.shift import Shift
+import pynhl.helpers as helpers
+
+# Fixed codes for the type column, shared by every game so columns from different games line up
+EVENT_TYPE_CODES = {type_of_event: code for code, type_of_event in enumerate(sorted(helpers.TRACKED_EVENTS))}
+EVENT_TYPES = sorted(helpers.TRACKED_EVENTS)
+
+# Team codes are relative to the game
+HOME, AWAY = 0, 1
+
+
+class EventView:
+    """
+    Read-only view of one row of an EventStore, with the same attribute names as Event
+    """
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __str__(self):
+        return (f"Team: {self.team_of_player}, Event: {self.type_of_event}, "
+                f"Time: {self.period}:{helpers.seconds_to_minutes(self.time)}, X : {self.x_loc}, Y: {self.y_loc}")
+
+    def __repr__(self):
+        return self.__str__()
+
+    # Same comparisons as Event, so views compare with each other and with Event objects (ie of a LiveGame)
+    def __lt__(self, other):
+        if isinstance(other, (EventView, Event)):
+            return helpers.BY_EVENT_ORDER(self) < helpers.BY_EVENT_ORDER(other)
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, (EventView, Event)):
+            return helpers.BY_EVENT_ORDER(self) > helpers.BY_EVENT_ORDER(other)
+        return NotImplemented
+
+    def __eq__(self, other):
+        if isinstance(other, (EventView, Event)):
+            return helpers.BY_EVENT_ORDER(self) == helpers.BY_EVENT_ORDER(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(helpers.BY_EVENT_ORDER(self))
+
+    def __getattr__(self, feature):
+        # TIME_SINCE_FEATURES columns
+        if feature in helpers.TIME_SINCE_FEATURES:
+            return self.store.features[feature][self.index]
+        raise AttributeError(feature)
+
+    @property
+    def type_of_event(self):
+        return EVENT_TYPES[self.store.type_code[self.index]]
+
+    @property
+    def team_of_player(self):
+        return self.store.teams[self.store.team_code[self.index]]
+
+    @property
+    def other_team(self):
+        return self.store.teams[AWAY - self.store.team_code[self.index]]
+
+    @property
+    def period(self):
+        return self.store.period[self.index]
+
+    @property
+    def time(self):
+        return self.store.time[self.index]
+
+    @property
+    def game_time(self):
+        return helpers.game_second(self.period, self.time)
+
+    @property
+    def sort_key(self):
+        return self.period, self.time
+
+    @property
+    def x_loc(self):
+        return helpers.nan_to_none(self.store.x_loc[self.index])
+
+    @property
+    def y_loc(self):
+        return helpers.nan_to_none(self.store.y_loc[self.index])
+
+    @property
+    def score(self):
+        return self.store.home_score[self.index], self.store.away_score[self.index]
+
+    @property
+    def strength(self):
+        return self.store.strengths[self.store.strength_code[self.index]]
+
+    @property
+    def penalty_duration(self):
+        duration = self.store.penalty_duration[self.index]
+        return None if duration < 0 else duration
+
+    @property
+    def roster(self):
+        return self.store.roster
+
+    @property
+    def home_on_ice(self):
+        return self.store.home_on_ice[self.index]
+
+    @property
+    def away_on_ice(self):
+        return self.store.away_on_ice[self.index]
+
+    @property
+    def home_involved(self):
+        return self.store.home_involved[self.index]
+
+    @property
+    def away_involved(self):
+        return self.store.away_involved[self.index]
+
+    def on_ice_mask(self, team):
+        return self.home_on_ice if team == self.store.teams[HOME] else self.away_on_ice
+
+    def involved_mask(self, team):
+        return self.home_involved if team == self.store.teams[HOME] else self.away_involved
+
+    @property
+    def players_on(self):
+        return {self.store.teams[HOME]: self.store.roster.players(self.store.home_on_ice[self.index]),
+                self.store.teams[AWAY]: self.store.roster.players(self.store.away_on_ice[self.index])}
+
+    @property
+    def players_involved(self):
+        return {self.store.teams[HOME]: self.store.roster.players(self.store.home_involved[self.index]),
+                self.store.teams[AWAY]: self.store.roster.players(self.store.away_involved[self.index])}
+
+
+class EventStore:
+    """
+    Columnar store of the events in a game, one typed array per attribute
+    Once built, Game keeps only the store and serves its rows as the events (see Game.release_records)
+    Indexing returns an EventView, whole columns can be used directly (ie store.x_loc)
+    On-ice / involved players are the RosterIndex masks of each team, ie roster.with_player(store.home_on_ice, name)
+    """
+
+    def __init__(self, events, home_team, away_team, roster):
+        self.teams = (home_team, away_team)
+        self.roster = roster
+        self.strengths = []  # strength_code : "5v4"
+        self.period = array('b')
+        self.time = array('h')  # Seconds into the period
+        self.type_code = array('b')
+        self.team_code = array('b')
+        self.x_loc = array('f')  # NaN when the event has no coordinates
+        self.y_loc = array('f')
+        self.home_score = array('b')
+        self.away_score = array('b')
+        self.strength_code = array('b')
+        self.penalty_duration = array('h')  # Seconds, -1 when the event is not a penalty
+        self.home_on_ice = array('Q')
+        self.away_on_ice = array('Q')
+        self.home_involved = array('Q')
+        self.away_involved = array('Q')
+        self.features = {feature: array('h') for feature in helpers.TIME_SINCE_FEATURES}
+        for event in events:
+            self.append(event)
+
+    def __len__(self):
+        return len(self.period)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [EventView(self, row) for row in range(len(self))[index]]
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return EventView(self, index % len(self))
+
+    def __iter__(self):
+        return (EventView(self, index) for index in range(len(self)))
+
+    def __str__(self):
+        return f"EventStore: {self.teams[HOME]} vs.{self.teams[AWAY]} {len(self)} events"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def get_strength_code(self, strength):
+        if strength not in self.strengths:
+            self.strengths.append(strength)
+        return self.strengths.index(strength)
+
+    def append(self, event):
+        """
+        Adds an Event as a new row
+        """
+        self.period.append(event.period)
+        self.time.append(event.time)
+        self.type_code.append(EVENT_TYPE_CODES[event.type_of_event])
+        self.team_code.append(HOME if event.team_of_player == self.teams[HOME] else AWAY)
+        self.x_loc.append(helpers.none_to_nan(event.x_loc))
+        self.y_loc.append(helpers.none_to_nan(event.y_loc))
+        self.home_score.append(event.score[0])
+        self.away_score.append(event.score[1])
+        self.strength_code.append(self.get_strength_code(event.strength))
+        self.penalty_duration.append(-1 if event.penalty_duration is None else event.penalty_duration)
+        self.home_on_ice.append(event.home_on_ice)
+        self.away_on_ice.append(event.away_on_ice)
+        self.home_involved.append(event.home_involved)
+        self.away_involved.append(event.away_involved)
+        for feature, column in self.features.items():
+            value = getattr(event, feature)
+            column.append(-1 if value is None else value)
+        return self
+
+
+class ShiftView:
+    """
+    Read-only view of one row of a ShiftStore, with the same attribute names as Shift
+    """
+    __slots__ = ('store', 'index')
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __str__(self):
+        return f"{self.player}:{self.period}:{helpers.seconds_to_minutes(self.start)}:" \
+               f"{helpers.seconds_to_minutes(self.end)}"
+
+    def __repr__(self):
+        return self.__str__()
+
+    # Same comparisons as Shift
+    def __eq__(self, other):
+        if isinstance(other, (ShiftView, Shift)):
+            return self.sort_key == other.sort_key
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.sort_key)
+
+    def __lt__(self, other):
+        if isinstance(other, (ShiftView, Shift)):
+            return self.sort_key < other.sort_key
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, (ShiftView, Shift)):
+            return self.sort_key > other.sort_key
+        return NotImplemented
+
+    @property
+    def game_id(self):
+        return self.store.game_id
+
+    @property
+    def player(self):
+        return self.store.players[self.store.player_code[self.index]]
+
+    @property
+    def shift_number_in_game(self):
+        return self.store.number[self.index]
+
+    @property
+    def team(self):
+        return self.store.teams[self.store.team_code[self.index]]
+
+    @property
+    def period(self):
+        return self.store.period[self.index]
+
+    @property
+    def start(self):
+        return self.store.start[self.index]
+
+    @property
+    def end(self):
+        return self.store.end[self.index]
+
+    @property
+    def game_start(self):
+        return helpers.game_second(self.period, self.start)
+
+    @property
+    def game_end(self):
+        return helpers.game_second(self.period, self.end)
+
+    @property
+    def duration(self):
+        return self.store.duration[self.index]
+
+    @property
+    def score(self):
+        return self.store.score[self.index]
+
+    @property
+    def sort_key(self):
+        return self.period, self.start, self.end, self.player
+
+
+class ShiftRows:
+    """
+    Some rows of a ShiftStore as a sequence of ShiftViews, ie the shifts of one player
+    Only the row numbers are kept, views are made as the rows are read
+    """
+    __slots__ = ('store', 'rows')
+
+    def __init__(self, store, rows):
+        self.store = store
+        self.rows = array('i', rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ShiftView(self.store, row) for row in self.rows[index]]
+        return ShiftView(self.store, self.rows[index])
+
+    def __iter__(self):
+        return (ShiftView(self.store, row) for row in self.rows)
+
+    def __str__(self):
+        return f"ShiftRows: {len(self)} of {len(self.store)} shifts"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class ShiftStore:
+    """
+    Columnar store of the shifts in a game, one typed array per attribute
+    Once built, Game keeps only the store and serves its rows as the shifts (see Game.release_records)
+    Indexing returns a ShiftView, whole columns can be used directly (ie store.start)
+    """
+
+    def __init__(self, shifts, home_team, away_team):
+        self.game_id = None
+        self.teams = (home_team, away_team)
+        self.players = []  # player_code : name
+        self.player_codes = {}  # name : player_code
+        self.player_code = array('h')
+        self.team_code = array('b')
+        self.period = array('b')
+        self.start = array('h')  # Seconds into the period
+        self.end = array('h')
+        self.duration = array('h')
+        self.score = array('b')  # Normalized to the player's team
+        self.number = array('h')  # Shift number of the player in the game
+        for shift in shifts:
+            self.append(shift)
+
+    def __len__(self):
+        return len(self.period)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ShiftView(self, row) for row in range(len(self))[index]]
+        if not -len(self) <= index < len(self):
+            raise IndexError(index)
+        return ShiftView(self, index % len(self))
+
+    def __iter__(self):
+        return (ShiftView(self, index) for index in range(len(self)))
+
+    def __str__(self):
+        return f"ShiftStore: {self.teams[HOME]} vs.{self.teams[AWAY]} {len(self)} shifts"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def get_player_rows(self):
+        """
+        {name: ShiftRows of the player's shifts}, in the order of the store
+        """
+        rows = {name: [] for name in self.players}
+        for row, player_code in enumerate(self.player_code):
+            rows[self.players[player_code]].append(row)
+        return {name: ShiftRows(self, player_rows) for name, player_rows in rows.items()}
+
+    def append(self, shift):
+        """
+        Adds a Shift as a new row
+        """
+        self.game_id = shift.game_id
+        if shift.player not in self.player_codes:
+            self.player_codes[shift.player] = len(self.players)
+            self.players.append(shift.player)
+        self.player_code.append(self.player_codes[shift.player])
+        self.team_code.append(HOME if shift.team == self.teams[HOME] else AWAY)
+        self.period.append(shift.period)
+        self.start.append(shift.start)
+        self.end.append(shift.end)
+        self.duration.append(shift.duration)
+        self.score.append(shift.score)
+        self.number.append(shift.shift_number_in_game)
+        return self
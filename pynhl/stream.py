@@ -0,0 +1,64 @@
+import ijson
+
+# Parts of the live feed Game reads, everything else in the document is skipped without being built
+GAME_DATA_PATHS = ('gameData.game', 'gameData.teams', 'gameData.players')
+PLAYS_PATH = 'liveData.plays.allPlays'
+SHIFTS_PATH = 'data'
+
+
+def build_value(parser, event, value):
+    """
+    Builds the JSON value that starts with (event, value) from the remaining ijson events of parser
+    """
+    builder = ijson.ObjectBuilder()
+    builder.event(event, value)
+    depth = 1 if event in ('start_map', 'start_array') else 0
+    while depth:
+        _, event, value = next(parser)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+        builder.event(event, value)
+    return builder.value
+
+
+def stream_items(json_file, parser, array_path):
+    """
+    Yields each item of the array at array_path as it is read, closing json_file once the array ends
+    """
+    item_path = f"{array_path}.item"
+    try:
+        for prefix, event, value in parser:
+            if prefix == item_path and event != 'end_array':
+                yield build_value(parser, event, value)
+            elif prefix == array_path and event == 'end_array':
+                break
+    finally:
+        json_file.close()
+
+
+def stream_game_feed(file_name):
+    """
+    Streams a live-feed document, building only gameData.game, gameData.teams and gameData.players
+    Returns a dict shaped like the feed, where liveData.plays.allPlays is a generator of plays read on demand
+    """
+    json_file = open(file_name, 'rb')
+    parser = ijson.parse(json_file, use_float=True)
+    game_data = {}
+    for prefix, event, value in parser:
+        if prefix in GAME_DATA_PATHS:
+            game_data[prefix.split('.')[-1]] = build_value(parser, event, value)
+        elif prefix == PLAYS_PATH and event == 'start_array':
+            break
+    return {'gameData': game_data,
+            'liveData': {'plays': {'allPlays': stream_items(json_file, parser, PLAYS_PATH)}}}
+
+
+def stream_shift_chart(file_name):
+    """
+    Streams a shift chart document
+    Returns a dict shaped like the document, where data is a generator of shift rows read on demand
+    """
+    json_file = open(file_name, 'rb')
+    return {'data': stream_items(json_file, ijson.parse(json_file, use_float=True), SHIFTS_PATH)}
@@ -0,0 +1,89 @@
+import bisect
+
+
+class StrengthIndex:
+    """
+    Constant-strength segments for each period of a game, built once from the skaters on the ice
+    Segments are (start, end, "5v4") in seconds into the period, from the home team's perspective
+    """
+
+    def __init__(self, shifts, home_team, away_team):
+        self.home_team = home_team
+        self.away_team = away_team
+        self.segments = {}  # Period : [(start, end, strength)]
+        self.starts = {}  # Period : [start of each segment], for bisecting
+        shifts_by_period = {}
+        for shift in shifts:
+            shifts_by_period.setdefault(shift.period, []).append(shift)
+        for period, period_shifts in shifts_by_period.items():
+            self.build_period(period, period_shifts)
+
+    def __str__(self):
+        return f"StrengthIndex: {self.home_team} vs.{self.away_team} " \
+               f"{sum(len(segments) for segments in self.segments.values())} segments"
+
+    def __repr__(self):
+        return self.__str__()
+
+    def build_period(self, period, shifts):
+        """
+        (Re)builds the segments of one period from every skater shift in it, ie after shifts are added live
+        """
+        changes = []  # (time, home change, away change)
+        for shift in shifts:
+            if shift.start < shift.end:
+                home = 1 if shift.team == self.home_team else 0
+                changes.append((shift.start, home, 1 - home))
+                changes.append((shift.end, -home, home - 1))
+        if changes:
+            self.segments[period] = self.build_segments(sorted(changes))
+            self.starts[period] = [segment[0] for segment in self.segments[period]]
+        else:
+            self.segments.pop(period, None)
+            self.starts.pop(period, None)
+        return self
+
+    @staticmethod
+    def build_segments(changes):
+        """
+        Sweeps the sorted skater count changes of a period into segments, merging neighbours of equal strength
+        """
+        segments = []
+        home = away = 0
+        prev_time = 0
+        for time, home_change, away_change in changes:
+            if time > prev_time:
+                strength = f"{home}v{away}"
+                if segments and segments[-1][2] == strength:
+                    segments[-1] = (segments[-1][0], time, strength)
+                else:
+                    segments.append((prev_time, time, strength))
+                prev_time = time
+            home += home_change
+            away += away_change
+        return segments
+
+    def strength_at(self, period, time):
+        """
+        Strength at a second of a period, None outside of the period's shifts
+        """
+        i = bisect.bisect_right(self.starts.get(period, []), time) - 1
+        if i < 0 or time >= self.segments[period][i][1]:
+            return None
+        return self.segments[period][i][2]
+
+    def split(self, period, lb, ub):
+        """
+        Splits the interval [lb, ub) of a period into seconds played at each strength
+        Returns {strength: seconds}
+        """
+        strengths = {}
+        segments = self.segments.get(period, [])
+        i = max(bisect.bisect_right(self.starts.get(period, []), lb) - 1, 0)
+        while i < len(segments) and segments[i][0] < ub:
+            start, end, strength = segments[i]
+            seconds = min(end, ub) - max(start, lb)
+            if seconds > 0:
+                strengths[strength] = strengths.get(strength, 0) + seconds
+            i += 1
+        return strengths
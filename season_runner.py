@@ -0,0 +1,209 @@
+from concurrent.futures import ProcessPoolExecutor
+from driver import get_json_path, read_json_data, stream_json_data
+from pynhl.archive import open_archive
+from pynhl.cache import GameCache, open_cache
+from pynhl.export import FILE_FORMATS, export_game
+from pynhl.game import Game
+from pynhl.heatmap import HeatmapCache, HeatmapTiles
+from pynhl.lines import LineCombinations
+from pynhl.matchups import MatchupCube
+from pynhl.metrics import MemoryHook, TimingHook, aggregate_stage_records, write_json_lines
+from pynhl.registry import PlayerRegistry
+import argparse, functools, os, re, time
+
+GAME_FILE = re.compile(r"^game_(\d+)\.json$")
+
+
+def find_game_ids(game_dir='games/', shift_dir='shifts/'):
+    """
+    Returns the sorted game ids that have both a game_<id>.json and a shift_<id>.json file
+    """
+    game_ids = []
+    for file_name in os.listdir(game_dir):
+        match = GAME_FILE.match(file_name)
+        if match and os.path.isfile(os.path.join(shift_dir, f"shift_{match.group(1)}.json")):
+            game_ids.append(int(match.group(1)))
+    return sorted(game_ids)
+
+
+def summarize_game(game, matchups=False):
+    """
+    Reduces a parsed Game to a small picklable dict, so workers don't send whole object graphs back
+    matchups adds the game's MatchupCube, the largest part of a summary
+    """
+    summary = {
+        'game_id': game.game_id,
+        'season': game.game_season,
+        'home_team': game.home_team,
+        'away_team': game.away_team,
+        'final_score': game.final_score,
+        'events': len(game.events_in_game),
+        'shifts': sum(len(player.shifts[game.game_id]) for player in game.players.values()),
+        'stage_records': game.stage_records,
+        # Players and shared TOI by player id, merged into the season registry by the parent process
+        'registry': PlayerRegistry.from_game(game),
+        'lines': LineCombinations.from_game(game),
+    }
+    if matchups:
+        summary['matchups'] = MatchupCube.from_game(game)
+    return summary
+
+
+def parse_game(game_num, game_dir='games/', shift_dir='shifts/', stream=False, hooks=None, archive=None):
+    """
+    Reads both JSON documents for game_num and builds the Game
+    Documents come from the season archive when given, otherwise the dirs, streaming only the needed parts when
+    stream is set
+    """
+    if archive:
+        shift_json = read_json_data(game_num, is_game=False, archive=archive)
+        game_json = read_json_data(game_num, archive=archive)
+    else:
+        reader = stream_json_data if stream else read_json_data
+        shift_json = reader(game_num, is_game=False, game_dir=game_dir, shift_dir=shift_dir)
+        game_json = reader(game_num, game_dir=game_dir, shift_dir=shift_dir)
+    # Every stage runs here, so the cache and the summary see a fully analysed Game
+    return Game(game_json, shift_json, hooks=hooks).run_stages()
+
+
+def get_content_hash(game_num, game_dir='games/', shift_dir='shifts/', archive=None):
+    """
+    GameCache key of the inputs of game_num, from either layout
+    """
+    if archive:
+        season_archive = open_archive(archive)
+        return GameCache.hash_bytes(season_archive.get_blob(game_num), season_archive.get_blob(game_num, False))
+    return GameCache.hash_files(get_json_path(game_num, True, game_dir, shift_dir),
+                                get_json_path(game_num, False, game_dir, shift_dir))
+
+
+def process_game(game_num, game_dir='games/', shift_dir='shifts/', cache_dir=None, stream=False, metrics=False,
+                 archive=None, matchups=False, heatmap_dir=None, export_dir=None, export_format='parquet'):
+    """
+    Parses a single game inside a worker, through the GameCache in cache_dir when given
+    metrics adds timing and memory hooks to every stage, games from the cache keep the records of their first run
+    heatmap_dir adds the game's HeatmapTiles to the summary, cached in that directory
+    export_dir writes the game's columnar partitions there (pynhl/export.py), from the worker
+    Returns (game_num, summary, error, seconds), where only one of summary/error is set
+    """
+    start = time.perf_counter()
+    hooks = [MemoryHook(), TimingHook()] if metrics else None
+    try:
+        content_hash = get_content_hash(game_num, game_dir, shift_dir, archive) if cache_dir or heatmap_dir else None
+        if cache_dir:
+            game = open_cache(cache_dir).get_game(game_num, content_hash,
+                                                  lambda: parse_game(game_num, game_dir, shift_dir, stream, hooks,
+                                                                     archive))
+        else:
+            game = parse_game(game_num, game_dir, shift_dir, stream, hooks, archive)
+        summary, error = summarize_game(game, matchups), None
+        if heatmap_dir:
+            summary['heatmaps'] = open_cache(heatmap_dir, HeatmapCache).get_tiles(game_num, content_hash,
+                                                                                  lambda: game)
+        if export_dir:
+            summary['exported'] = export_game(game, export_dir, export_format)
+    except Exception as err:
+        # ie KeyError on a malformed feed, report it and keep the season going
+        summary, error = None, f"{type(err).__name__}: {err}"
+    return game_num, summary, error, time.perf_counter() - start
+
+
+def load_season_heatmaps(game_ids, heatmap_dir, game_dir='games/', shift_dir='shifts/', archive=None):
+    """
+    Season HeatmapTiles of game_ids, from the tiles cached in heatmap_dir
+    Only games missing from the cache (or whose inputs changed) are parsed, ie for re-rendering dashboards
+    """
+    heatmap_cache = HeatmapCache(heatmap_dir).purge_stale()
+    return HeatmapTiles.merge_all(
+        heatmap_cache.get_tiles(game_num, get_content_hash(game_num, game_dir, shift_dir, archive),
+                                lambda: parse_game(game_num, game_dir, shift_dir, archive=archive))
+        for game_num in game_ids)
+
+
+def run_season(game_ids, workers=None, chunk_size=4, game_dir='games/', shift_dir='shifts/', cache_dir=None,
+               stream=False, metrics=False, archive=None, matchups=False, heatmap_dir=None, export_dir=None,
+               export_format='parquet', report=print):
+    """
+    Fans game_ids out over a process pool, reporting progress, failures and per-game timing as they finish
+    Returns ({game_id: summary}, {game_id: error})
+    """
+    summaries, failures = {}, {}
+    total = len(game_ids)
+    # Once per run here, workers only scan a cache dir when evicting
+    if cache_dir:
+        GameCache(cache_dir).purge_stale()
+    if heatmap_dir:
+        HeatmapCache(heatmap_dir).purge_stale()
+    worker = functools.partial(process_game, game_dir=game_dir, shift_dir=shift_dir, cache_dir=cache_dir,
+                               stream=stream, metrics=metrics, archive=archive, matchups=matchups,
+                               heatmap_dir=heatmap_dir, export_dir=export_dir, export_format=export_format)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(worker, game_ids, chunksize=chunk_size)
+        for done, (game_num, summary, error, seconds) in enumerate(results, start=1):
+            if error:
+                failures[game_num] = error
+                report(f"[{done}/{total}] {game_num} FAILED in {seconds:.2f}s -> {error}")
+            else:
+                summaries[game_num] = summary
+                report(f"[{done}/{total}] {game_num} {summary['home_team']} vs. {summary['away_team']} "
+                       f"in {seconds:.2f}s")
+    return summaries, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse every saved game in games/ and shifts/ across processes")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes, defaults to the CPU count")
+    parser.add_argument('--chunk-size', type=int, default=4, help="Games handed to a worker at a time")
+    parser.add_argument('--game-dir', default='games/')
+    parser.add_argument('--shift-dir', default='shifts/')
+    parser.add_argument('--cache-dir', default=None, help="Reuse parsed games from this GameCache directory")
+    parser.add_argument('--stream', action='store_true', help="Stream only the needed parts of each JSON file")
+    parser.add_argument('--archive', default=None, help="Read games from this season archive instead of the dirs")
+    parser.add_argument('--matchups', default=None, help="Sum every game's matchup cube, saving the season cube "
+                                                         "to this .npz file")
+    parser.add_argument('--heatmaps', default=None, help="Rasterize every game's event heatmaps, caching the "
+                                                         "tiles in this directory")
+    parser.add_argument('--export', default=None, help="Write events, players, shifts and shared TOI of every game "
+                                                       "to this directory, partitioned by season and game id")
+    parser.add_argument('--export-format', default='parquet', choices=list(FILE_FORMATS))
+    parser.add_argument('--metrics', default=None, help="Time and trace memory of every stage, writing the "
+                                                        "stage records to this JSON lines file")
+    args = parser.parse_args()
+
+    season_start = time.perf_counter()
+    if args.archive:
+        season_games = open_archive(args.archive).game_ids()
+    else:
+        season_games = find_game_ids(args.game_dir, args.shift_dir)
+    parsed, failed = run_season(season_games, args.workers, args.chunk_size, args.game_dir, args.shift_dir,
+                                args.cache_dir, args.stream, bool(args.metrics), args.archive, bool(args.matchups),
+                                args.heatmaps, args.export, args.export_format)
+    print(f"Parsed {len(parsed)} of {len(season_games)} games in {time.perf_counter() - season_start:.2f}s, "
+          f"{len(failed)} failed")
+    for failed_game, failed_error in failed.items():
+        print(f"{failed_game}: {failed_error}")
+    season_registry = PlayerRegistry.merge_all(summary['registry'] for summary in parsed.values())
+    print(season_registry)
+    season_lines = LineCombinations.merge_all(summary['lines'] for summary in parsed.values())
+    print(season_lines)
+    if args.matchups:
+        season_cube = MatchupCube.merge_all(summary['matchups'] for summary in parsed.values())
+        season_cube.save(args.matchups)
+        print(season_cube)
+    if args.heatmaps:
+        print(HeatmapTiles.merge_all(summary['heatmaps'] for summary in parsed.values()))
+    if args.export:
+        exported = {}
+        for summary in parsed.values():
+            for table, rows in summary['exported'].items():
+                exported[table] = exported.get(table, 0) + rows
+        print(f"Exported to {args.export}: " + ", ".join(f"{rows} {table}" for table, rows in exported.items()))
+
+    if args.metrics:
+        season_records = [record for summary in parsed.values() for record in summary['stage_records']]
+        with open(args.metrics, 'w') as metrics_file:
+            write_json_lines(season_records, metrics_file)
+        for stage_name, stage_total in aggregate_stage_records(season_records).items():
+            print(f"{stage_name}: {stage_total.get('wall_seconds', 0):.3f}s over {stage_total['stages']} games, "
+                  f"{stage_total.get('records_in', 0)} records in, {stage_total.get('records_out', 0)} out, "
+                  f"peak {stage_total.get('peak_bytes', 0) / 2 ** 20:.1f} MiB")
@@ -0,0 +1,76 @@
+'''
+Fixtures shared by the tests, run with python -m pytest testing
+'''
+from benchmarks.synthetic import build_synthetic_game, write_synthetic_game
+from driver import read_json_data
+from pynhl.game import Game
+import pynhl.helpers as helpers
+import copy, os, pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME_ID = 2019020645
+
+
+def read_game_json(game_id=GAME_ID):
+    """
+    (game_json, shift_json) of a checked-in game, read fresh each time since Game releases them
+    """
+    dirs = {'game_dir': os.path.join(REPO_DIR, 'games', ''), 'shift_dir': os.path.join(REPO_DIR, 'shifts', '')}
+    return read_json_data(game_id, **dirs), read_json_data(game_id, is_game=False, **dirs)
+
+
+@pytest.fixture
+def make_game():
+    """
+    Builds a fresh, unanalysed Game of the checked-in game, or of a synthetic one with make_game(synthetic=1)
+    game_class is Game or a subclass, ie LiveGame
+    """
+    def make(synthetic=None, game_class=Game, **sizes):
+        if synthetic is not None:
+            return game_class(*build_synthetic_game(synthetic, **sizes))
+        return game_class(*read_game_json())
+    return make
+
+
+@pytest.fixture
+def game(make_game):
+    return make_game().run_stages()
+
+
+@pytest.fixture
+def feeds():
+    """
+    (game_json, shift_json) of the checked-in game
+    """
+    return read_game_json()
+
+
+def cut_feed_at(game_json, shift_json, game_second):
+    """
+    Copies of the feeds as a live pull at game_second would return them, plays / shifts that ended before it
+    """
+    game_json = copy.deepcopy(game_json)
+    plays = game_json['liveData']['plays']['allPlays']
+    game_json['liveData']['plays']['allPlays'] = [
+        play for play in plays
+        if helpers.game_second(play['about']['period'], helpers.convert_to_seconds(play['about']['periodTime']))
+        < game_second]
+    rows = [row for row in shift_json['data'] if row['endTime'] and
+            helpers.game_second(int(row['period']), helpers.convert_to_seconds(row['endTime'])) < game_second]
+    return game_json, {'data': copy.deepcopy(rows)}
+
+
+@pytest.fixture
+def cut_feed():
+    return cut_feed_at
+
+
+@pytest.fixture
+def season_dirs(tmp_path):
+    """
+    (game dir, shift dir) holding synthetic games 1 to 3, with a trailing / as the season runner expects
+    """
+    game_dir, shift_dir = os.path.join(tmp_path, 'games', ''), os.path.join(tmp_path, 'shifts', '')
+    for game_id in (1, 2, 3):
+        write_synthetic_game(game_id, game_dir, shift_dir, events=150, shifts=400)
+    return game_dir, shift_dir
@@ -0,0 +1,216 @@
+'''
+Golden-output harness for the on-ice, strength and shared TOI engines
+capture: runs the reference engine over a corpus of real and synthetic games and saves its outputs
+check: runs other engines over the same corpus, diffs them against the saved outputs and times them side by side
+ie python -m testing.golden capture && python -m testing.golden check
+'''
+from benchmarks.synthetic import build_synthetic_game
+from driver import read_json_data
+from pynhl.game import Game
+import pynhl.helpers as helpers
+import argparse, json, os, time
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'golden')
+
+# Checked-in games plus synthetic games, synthetic ids are (id, sizes for build_synthetic_game)
+REAL_GAMES = (2019020645,)
+SYNTHETIC_GAMES = (
+    (1, {'events': 300, 'shifts': 700}),
+    (2, {'events': 600, 'shifts': 1400, 'overtime_periods': 1}),
+    (3, {'events': 150, 'shifts': 500, 'roster_size': 18}),
+)
+# Differences check lets through, game name : {field as printed by check (ie "events[12].strength"): reason}
+# Every entry needs a reason, anything not listed here fails the check
+ACCEPTED_DIFFERENCES = {}
+
+
+def load_corpus():
+    """
+    Yields (name, game_json, shift_json) for every game in the corpus
+    """
+    for game_num in REAL_GAMES:
+        yield str(game_num), read_json_data(game_num), read_json_data(game_num, is_game=False)
+    for game_num, sizes in SYNTHETIC_GAMES:
+        yield (f"synthetic_{game_num}", *build_synthetic_game(game_num, **sizes))
+
+
+def reference_on_ice(game):
+    """
+    Checks every event against every skater shift with helpers.time_check_event, the rule the sweep follows
+    Runs as a stage, so reads the Event / Shift objects before build_stores takes them over
+    """
+    goalies = game.home_goalie.union(game.away_goalie)
+    skater_shifts = [shift for shift in game._shifts if shift.player not in goalies]
+    for event in game._events_in_game:
+        players_on = {game.home_team: set(), game.away_team: set()}
+        for shift in skater_shifts:
+            if shift.period == event.period and \
+                    helpers.time_check_event(event.time, shift.start, shift.end, event.type_of_event):
+                players_on[shift.team].add(shift.player)
+        event.players_on = players_on
+        event.determine_event_state(game.home_team, game.away_team)
+
+
+def reference_shared_toi(game):
+    """
+    Every overlapping pair of teammate shifts, one second at a time, each second at the strength of the skaters
+    counted on the ice then
+    Counts the seconds directly from the shifts, so it shares no code with the on-ice matrix or the StrengthIndex
+    """
+    goalies = game.home_goalie.union(game.away_goalie)
+    skaters = {}  # (period, second) : [home skaters, away skaters], a shift covers [start, end)
+    for shift in game._shifts:
+        if shift.player not in goalies:
+            for second in range(shift.start, shift.end):
+                skaters.setdefault((shift.period, second), [0, 0])[shift.team != game.home_team] += 1
+    for name, player in game._players.items():
+        for other, other_player in game._players.items():
+            if other == name or other_player.team != player.team:
+                continue
+            strengths = {}
+            for shift in player.shifts[game.game_id]:
+                for other_shift in other_player.shifts[game.game_id]:
+                    if shift.period != other_shift.period:
+                        continue
+                    for second in range(max(shift.start, other_shift.start), min(shift.end, other_shift.end)):
+                        home, away = skaters.get((shift.period, second), (0, 0))
+                        # From the player's team perspective
+                        strength = f"{away}v{home}" if player.team == game.away_team else f"{home}v{away}"
+                        strengths[strength] = strengths.get(strength, 0) + 1
+            if strengths:
+                player.add_shared_toi(game.game_id, other, strengths)
+
+
+def reference_engine(game_json, shift_json):
+    """
+    Brute force over every shift, slow but simple enough to check by reading
+    """
+    return Game(game_json, shift_json, overrides={'add_strength_players_to_event': reference_on_ice,
+                                                  'calculate_shared_toi': reference_shared_toi}).run_stages()
+
+
+def production_engine(game_json, shift_json):
+    """
+    Every stage as Game runs them, sweep-line on-ice players and the on-ice matrix for shared TOI
+    """
+    return Game(game_json, shift_json).run_stages()
+
+
+ENGINES = {
+    'reference': reference_engine,
+    'production': production_engine,
+}
+
+
+def capture_outputs(game):
+    """
+    The outputs compared between engines, as plain JSON-able data
+    """
+    return {
+        'events': [{'period': event.period, 'time': event.time, 'type': event.type_of_event,
+                    'players_on': {team: sorted(players) for team, players in sorted(event.players_on.items())},
+                    'strength': event.strength} for event in game.events_in_game],
+        'shared_toi': {name: {other: dict(sorted(by_game[game.game_id].items()))
+                              for other, by_game in sorted(player.ice_time_with_players.items())}
+                       for name, player in sorted(game.players.items())},
+    }
+
+
+def diff_outputs(expected, actual):
+    """
+    Returns [(field, expected value, actual value)] for every difference
+    """
+    differences = []
+    if len(expected['events']) != len(actual['events']):
+        differences.append(('events', len(expected['events']), len(actual['events'])))
+    for i, (expected_event, actual_event) in enumerate(zip(expected['events'], actual['events'])):
+        for field in ('period', 'time', 'type', 'players_on', 'strength'):
+            if expected_event[field] != actual_event[field]:
+                differences.append((f"events[{i}].{field}", expected_event[field], actual_event[field]))
+    for name in sorted(set(expected['shared_toi']) | set(actual['shared_toi'])):
+        expected_player = expected['shared_toi'].get(name, {})
+        actual_player = actual['shared_toi'].get(name, {})
+        for other in sorted(set(expected_player) | set(actual_player)):
+            if expected_player.get(other) != actual_player.get(other):
+                differences.append((f"shared_toi[{name}][{other}]", expected_player.get(other),
+                                    actual_player.get(other)))
+    return differences
+
+
+def summarize_differences(differences):
+    """
+    Counts differences by field, ie {'events.players_on': 3, 'shared_toi': 12}
+    """
+    counts = {}
+    for field, _, _ in differences:
+        if field.startswith('events['):
+            field = f"events.{field.split('.', 1)[1]}"
+        elif field.startswith('shared_toi'):
+            field = 'shared_toi'
+        counts[field] = counts.get(field, 0) + 1
+    return counts
+
+
+def time_engine(engine, game_json, shift_json, repeat=3):
+    """
+    Returns (Game from the last run, best seconds over repeat runs)
+    """
+    best = None
+    game = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        game = engine(game_json, shift_json)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return game, best
+
+
+def capture(golden_dir=GOLDEN_DIR, engine='reference', repeat=3):
+    """
+    Saves the outputs and timing of engine for every game in the corpus
+    """
+    os.makedirs(golden_dir, exist_ok=True)
+    for name, game_json, shift_json in load_corpus():
+        game, seconds = time_engine(ENGINES[engine], game_json, shift_json, repeat)
+        with open(os.path.join(golden_dir, f"{name}.json"), 'w') as of:
+            json.dump({'engine': engine, 'seconds': seconds, 'outputs': capture_outputs(game)}, of)
+        print(f"{name}: captured {engine} in {seconds:.4f}s")
+
+
+def check(engines, golden_dir=GOLDEN_DIR, repeat=3, verbose=0):
+    """
+    Runs engines over the corpus and reports their differences and speedup against the golden outputs
+    Returns the number of games with at least one difference
+    """
+    failed = 0
+    for name, game_json, shift_json in load_corpus():
+        with open(os.path.join(golden_dir, f"{name}.json")) as golden_file:
+            golden = json.load(golden_file)
+        # JSON keys are strings, round trip so the captured and fresh outputs compare equal
+        for engine in engines:
+            game, seconds = time_engine(ENGINES[engine], game_json, shift_json, repeat)
+            differences = diff_outputs(golden['outputs'], json.loads(json.dumps(capture_outputs(game))))
+            accepted = ACCEPTED_DIFFERENCES.get(name, {})
+            differences = [difference for difference in differences if difference[0] not in accepted]
+            failed += bool(differences)
+            print(f"{name}: {engine} {seconds:.4f}s vs {golden['engine']} {golden['seconds']:.4f}s "
+                  f"({golden['seconds'] / seconds:.1f}x) differences: {summarize_differences(differences) or 'none'}"
+                  f"{f', {len(accepted)} accepted' if accepted else ''}")
+            for field, expected, actual in differences[:verbose]:
+                print(f"    {field}: expected {expected} got {actual}")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Capture / check golden outputs of the Game engines")
+    parser.add_argument('command', choices=('capture', 'check'))
+    parser.add_argument('--engines', nargs='*', default=['production'], choices=list(ENGINES),
+                        help="Engines to check against the golden outputs")
+    parser.add_argument('--golden-dir', default=GOLDEN_DIR)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--verbose', type=int, default=0, help="Differences to print per game and engine")
+    args = parser.parse_args()
+    if args.command == 'capture':
+        capture(args.golden_dir, repeat=args.repeat)
+    else:
+        raise SystemExit(check(args.engines, args.golden_dir, args.repeat, args.verbose))
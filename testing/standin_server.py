@@ -0,0 +1,101 @@
+'''
+Local stand-in for the NHL live-feed and shift-chart APIs, serving the documents already saved in games/ and shifts/
+Supports ETag / Last-Modified conditional requests and can inject failures to exercise retries
+ie python -m testing.standin_server --port 8765
+'''
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs, urlparse
+import argparse, hashlib, os, random, re, threading
+
+LIVE_FEED_PATH = re.compile(r"^/api/v1/game/(\d+)/feed/live/?$")
+SHIFT_CHART_PATH = "/stats/rest/en/shiftcharts"
+SHIFT_GAME_ID = re.compile(r"gameId=(\d+)")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    # Set on the subclass built by make_handler
+    game_dir = 'games/'
+    shift_dir = 'shifts/'
+    fail_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def get_file_name(self):
+        """
+        Maps an API URL onto the saved file, None for unknown URLs
+        """
+        url = urlparse(self.path)
+        live_feed = LIVE_FEED_PATH.match(url.path)
+        if live_feed:
+            return os.path.join(self.game_dir, f"game_{live_feed.group(1)}.json")
+        if url.path == SHIFT_CHART_PATH:
+            expression = parse_qs(url.query).get('cayenneExp', [''])[0]
+            shift_game = SHIFT_GAME_ID.search(expression)
+            if shift_game:
+                return os.path.join(self.shift_dir, f"shift_{shift_game.group(1)}.json")
+        return None
+
+    def do_GET(self):
+        if self.fail_rate and random.random() < self.fail_rate:
+            self.send_error(503, "Injected failure")
+            return
+        file_name = self.get_file_name()
+        if not file_name or not os.path.isfile(file_name):
+            self.send_error(404)
+            return
+        with open(file_name, 'rb') as json_file:
+            body = json_file.read()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        modified = int(os.path.getmtime(file_name))
+        if self.is_not_modified(etag, modified):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(modified, usegmt=True))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def is_not_modified(self, etag, modified):
+        if 'If-None-Match' in self.headers:
+            return etag in self.headers['If-None-Match']
+        if 'If-Modified-Since' in self.headers:
+            try:
+                return modified <= parsedate_to_datetime(self.headers['If-Modified-Since']).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+def make_handler(game_dir='games/', shift_dir='shifts/', fail_rate=0.0):
+    return type('ConfiguredStandInHandler', (StandInHandler,),
+                {'game_dir': game_dir, 'shift_dir': shift_dir, 'fail_rate': fail_rate})
+
+
+def start_server(game_dir='games/', shift_dir='shifts/', port=0, fail_rate=0.0):
+    """
+    Serves in a background thread, port=0 picks a free port
+    Returns (server, base_url), call server.shutdown() when done
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(game_dir, shift_dir, fail_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve saved games/shifts as the NHL APIs")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--game-dir', default='games/')
+    parser.add_argument('--shift-dir', default='shifts/')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="Fraction of requests answered with a 503")
+    args = parser.parse_args()
+    standin = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.game_dir, args.shift_dir,
+                                                                          args.fail_rate))
+    print(f"Serving {args.game_dir} / {args.shift_dir} on http://127.0.0.1:{args.port}")
+    standin.serve_forever()
@@ -0,0 +1,43 @@
+'''
+Tests of the packed season archive
+'''
+from pynhl.archive import SeasonArchive, open_archive, pack_directories, pack_documents
+import os, pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME_ID = 2019020645
+
+
+def test_pack_and_read(feeds, tmp_path):
+    game_json, shift_json = feeds
+    path = str(tmp_path / 'season.pack')
+    index = pack_documents(path, [(GAME_ID, True, game_json), (GAME_ID, False, shift_json), (1, True, {'a': 1})])
+    assert sorted(index) == ['1', str(GAME_ID)]
+    with SeasonArchive(path) as archive:
+        assert archive.game_ids() == [1, GAME_ID] and GAME_ID in archive and 2 not in archive
+        assert archive.read(GAME_ID) == game_json
+        assert archive.read(GAME_ID, is_game=False) == shift_json
+        with pytest.raises(KeyError):
+            archive.read(1, is_game=False)
+
+
+def test_pack_directories_matches_the_files(feeds, tmp_path):
+    path = str(tmp_path / 'season.pack')
+    pack_directories(path, os.path.join(REPO_DIR, 'games'), os.path.join(REPO_DIR, 'shifts'))
+    assert open_archive(path).read(GAME_ID) == feeds[0]
+
+
+def test_repacking_closes_the_open_archive(tmp_path):
+    path = str(tmp_path / 'season.pack')
+    pack_documents(path, [(1, True, {'version': 1})])
+    old = open_archive(path)
+    pack_documents(path, [(1, True, {'version': 2})])
+    assert old.mapped.closed and old.archive_file.closed
+    assert open_archive(path) is not old and open_archive(path).read(1) == {'version': 2}
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / 'other.pack'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        SeasonArchive(str(path))
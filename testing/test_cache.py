@@ -0,0 +1,62 @@
+'''
+Tests of the on-disk game cache
+'''
+from pynhl.cache import CACHE_SCHEMA_VERSION, GameCache, open_cache
+import os, time
+
+
+def test_round_trip(game, tmp_path):
+    cache = GameCache(str(tmp_path))
+    assert cache.load(game.game_id, 'abc') is None
+    path = cache.store(game, 'abc')
+    assert os.path.basename(path) == f"{game.game_id}-v{CACHE_SCHEMA_VERSION}-abc.game"
+    cached = cache.load(game.game_id, 'abc')
+    assert cached.shared_toi == game.shared_toi and list(cached.events_in_game) == list(game.events_in_game)
+    assert cached.stages_done == game.stages_done
+    # Another hash of the inputs is a miss
+    assert cache.load(game.game_id, 'abd') is None
+
+
+def test_get_game_builds_once(game, tmp_path):
+    cache, builds = GameCache(str(tmp_path)), []
+
+    def build():
+        builds.append(1)
+        return game
+
+    cache.get_game(game.game_id, 'abc', build)
+    assert cache.get_game(game.game_id, 'abc', build).game_id == game.game_id and len(builds) == 1
+
+
+def test_corrupt_and_stale_entries_are_dropped(game, tmp_path):
+    cache = GameCache(str(tmp_path))
+    path = cache.store(game, 'abc')
+    with open(path, 'r+b') as cache_file:
+        cache_file.seek(20)
+        cache_file.write(b'garbage')
+    assert cache.load(game.game_id, 'abc') is None and not os.path.exists(path)
+    stale = os.path.join(str(tmp_path), f"{game.game_id}-v{CACHE_SCHEMA_VERSION - 1}-abc.game")
+    open(stale, 'wb').close()
+    cache.store(game, 'abc')
+    cache.purge_stale()
+    assert os.listdir(str(tmp_path)) == [os.path.basename(path)]
+
+
+def test_evicts_least_recently_used(game, tmp_path):
+    size = len(open(GameCache(str(tmp_path / 'sizing')).store(game, 'abc'), 'rb').read())
+    cache = GameCache(str(tmp_path / 'cache'), max_bytes=int(size * 2.5))
+    first = cache.store(game, 'first')
+    second = cache.store(game, 'second')
+    old = time.time() - 60
+    os.utime(first, (old, old))
+    os.utime(second, (old - 60, old - 60))
+    cache.load(game.game_id, 'second')
+    cache.store(game, 'third')
+    assert sorted(os.listdir(cache.cache_dir)) == sorted(os.path.basename(cache.get_path(game.game_id, content_hash))
+                                                         for content_hash in ('second', 'third'))
+    assert cache.total_bytes <= cache.max_bytes
+
+
+def test_open_cache_is_one_per_process(tmp_path):
+    assert open_cache(str(tmp_path)) is open_cache(str(tmp_path))
+    assert open_cache(str(tmp_path)) is not GameCache(str(tmp_path))
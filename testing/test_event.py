@@ -0,0 +1,35 @@
+'''
+Tests of the Event ordering, as callers see it through Game.events_in_game
+'''
+from pynhl.event import Event
+from pynhl.live import LiveGame
+import itertools
+
+
+def test_events_in_game_are_totally_ordered(game):
+    events = game.events_in_game
+    for event, other in itertools.combinations(events[:60], 2):
+        assert [event < other, event == other, event > other].count(True) == 1
+        assert event != other or hash(event) == hash(other)
+        assert (event == other) == ((event.sort_key, event.type_of_event) == (other.sort_key, other.type_of_event))
+
+
+def test_events_of_a_second_differ_by_type(game):
+    same_second = {}
+    for event in game.events_in_game:
+        same_second.setdefault(event.sort_key, []).append(event)
+    shared = [events for events in same_second.values() if len({event.type_of_event for event in events}) > 1]
+    assert shared
+    for events in shared:
+        for event, other in itertools.combinations(events, 2):
+            assert (event == other) == (event.type_of_event == other.type_of_event)
+
+
+def test_event_objects_compare_with_views(make_game, game):
+    live = make_game(game_class=LiveGame)
+    objects = live.events_in_game
+    assert isinstance(objects[0], Event)
+    assert objects == list(game.events_in_game)
+    assert set(objects) == set(game.events_in_game)
+    assert objects[0] in game.events_in_game and game.events_in_game[-1] in objects
+    assert sorted(objects + list(game.events_in_game)[:5])[:2] == [objects[0], game.events_in_game[0]]
@@ -0,0 +1,31 @@
+'''
+Tests of the columnar export of parsed games
+'''
+from pynhl.export import FILE_FORMATS, TABLES, export_game, export_games, get_partition_path, open_table
+import pytest
+
+
+@pytest.mark.parametrize('file_format', sorted(FILE_FORMATS))
+def test_export_round_trips_through_the_dataset(game, tmp_path, file_format):
+    out_dir = str(tmp_path)
+    written = export_game(game, out_dir, file_format)
+    assert written['events'] == len(game.events_in_game)
+    assert written['shifts'] == len(game.shift_store)
+    assert written['players'] == len(game.roster.names)
+    events = open_table(out_dir, 'events', file_format).to_table().sort_by('event_index').to_pydict()
+    assert events['type_of_event'] == [event.type_of_event for event in game.events_in_game]
+    assert events['strength'] == [event.strength for event in game.events_in_game]
+    assert set(events['season']) == {str(game.game_season)}
+    shared = open_table(out_dir, 'shared_toi', file_format).to_table().to_pylist()
+    assert sum(row['seconds'] for row in shared) == \
+        sum(sum(strengths.values()) for others in game.shared_toi.values() for strengths in others.values())
+
+
+def test_export_replaces_a_game_and_leaves_no_temp_files(make_game, game, tmp_path):
+    out_dir = str(tmp_path)
+    totals = export_games([game, make_game(synthetic=1).run_stages()], out_dir)
+    export_game(game, out_dir)
+    assert open_table(out_dir, 'events').count_rows() == totals['events']
+    assert sorted(totals) == sorted(TABLES)
+    partition = tmp_path.joinpath(get_partition_path('', 'events', game.game_season, game.game_id)).parent
+    assert [path.name for path in partition.iterdir()] == ['part-0.parquet']
@@ -0,0 +1,51 @@
+'''
+Tests of the async fetcher against the local stand-in server
+'''
+from driver import read_json_data
+from fetcher import RateLimiter, RetryableStatus, fetch_document, fetch_games
+from testing.standin_server import start_server
+import aiohttp, asyncio, os, pytest
+
+
+@pytest.fixture
+def server(season_dirs):
+    server, base_url = start_server(*season_dirs)
+    yield base_url
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(base_url, game_ids, game_dir, shift_dir):
+    return asyncio.run(fetch_games(game_ids, game_dir, shift_dir, rate=0,
+                                   live_url=base_url + '/api/v1/game/{}/feed/live',
+                                   shift_url=base_url + '/stats/rest/en/shiftcharts?cayenneExp=gameId={}'))
+
+
+def test_fetch_saves_then_asks_for_changes_only(server, season_dirs, tmp_path):
+    game_dir, shift_dir = os.path.join(tmp_path, 'fetched_games', ''), os.path.join(tmp_path, 'fetched_shifts', '')
+    report = fetch(server, [1, 2, 99], game_dir, shift_dir)
+    assert report[1] == report[2] == {'game': 'saved', 'shift': 'saved'}
+    assert '404' in report[99]['game'] and '404' in report[99]['shift']
+    assert read_json_data(2, game_dir=game_dir) == read_json_data(2, game_dir=season_dirs[0])
+    assert read_json_data(2, False, game_dir, shift_dir) == read_json_data(2, False, *season_dirs)
+    assert fetch(server, [1, 2], game_dir, shift_dir) == {1: {'game': 'unchanged', 'shift': 'unchanged'},
+                                                          2: {'game': 'unchanged', 'shift': 'unchanged'}}
+    # A document missing from disk is fetched whole again
+    os.remove(os.path.join(shift_dir, 'shift_1.json'))
+    assert fetch(server, [1], game_dir, shift_dir) == {1: {'game': 'unchanged', 'shift': 'saved'}}
+
+
+def test_retries_give_up_on_failing_server(season_dirs):
+    server, base_url = start_server(*season_dirs, fail_rate=1.0)
+
+    async def fetch_failing():
+        async with aiohttp.ClientSession() as session:
+            return await fetch_document(session, base_url + '/api/v1/game/1/feed/live', {}, RateLimiter(0),
+                                        retries=2, backoff=0)
+
+    try:
+        with pytest.raises(RetryableStatus):
+            asyncio.run(fetch_failing())
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,57 @@
+'''
+Tests of the lazy Game stages, run with python -m pytest testing
+'''
+from pynhl.game import Game
+import pytest
+
+LAZY_PROPERTIES = ('shifts', 'players', 'roster', 'events_in_game', 'event_store', 'shift_store', 'strength_index',
+                   'on_ice_index', 'location_features', 'shared_toi')
+
+
+@pytest.mark.parametrize('name', LAZY_PROPERTIES)
+def test_lazy_property_on_fresh_game(make_game, name):
+    """
+    Each property runs only the stages it needs, whatever order they end up running in
+    """
+    game = make_game()
+    value = getattr(game, name)
+    assert value is not None
+    assert game.stages_done == game.stages_run
+    if game.LOADING_STAGES <= game.stages_done:
+        assert game.game_json is None and game.shift_json is None
+
+
+def test_lazy_events_match_run_stages(make_game, game):
+    lazy, full = make_game(), game
+    assert [(event.sort_key, event.type_of_event, event.players_on, event.strength)
+            for event in lazy.events_in_game] == \
+        [(event.sort_key, event.type_of_event, event.players_on, event.strength) for event in full.events_in_game]
+    assert lazy.shared_toi == full.shared_toi
+
+
+def test_shared_toi_of_a_traded_player(feeds, game):
+    game_json, shift_json = feeds
+    name = next(iter(game.shared_toi))
+    next(player_json for player_json in game_json['gameData']['players'].values()
+         if player_json['fullName'] == name)['currentTeam']['triCode'] = 'XXX'
+    traded = Game(game_json, shift_json)
+    assert traded.players[name].team == 'XXX'
+    assert traded.shared_toi == game.shared_toi
+
+
+def test_events_never_pay_for_shared_toi(make_game):
+    game = make_game()
+    assert not game.stages_run
+    game.events_in_game
+    assert 'calculate_shared_toi' not in game.stages_run and 'build_strength_index' not in game.stages_run
+    strengths = {event.strength for event in game.events_in_game}
+    assert '5v5' in strengths and 'calculate_shared_toi' not in game.stages_run
+
+
+def test_stages_run_once_after_their_dependencies(make_game):
+    game = make_game().run_stages()
+    game.run_stages()
+    order = [record['stage'] for record in game.stage_records]
+    assert sorted(order) == sorted(Game.STAGES)
+    for stage, dependencies in Game.STAGES.items():
+        assert all(order.index(dependency) < order.index(stage) for dependency in dependencies)
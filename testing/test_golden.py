@@ -0,0 +1,21 @@
+'''
+Runs the golden-output check as a test, so engine changes that move the outputs fail the suite
+'''
+from testing import golden
+import json, os
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_production_matches_golden_outputs(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+    assert golden.check(['production'], repeat=1) == 0
+
+
+def test_reference_still_captures_the_golden_outputs(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+    name, game_json, shift_json = next(game for game in golden.load_corpus() if game[0] == 'synthetic_3')
+    with open(os.path.join(golden.GOLDEN_DIR, f"{name}.json")) as golden_file:
+        expected = json.load(golden_file)['outputs']
+    actual = json.loads(json.dumps(golden.capture_outputs(golden.reference_engine(game_json, shift_json))))
+    assert golden.diff_outputs(expected, actual) == []
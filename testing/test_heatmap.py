@@ -0,0 +1,53 @@
+'''
+Tests of the event heatmap tiles and their cache
+'''
+from pynhl.cache import CACHE_SCHEMA_VERSION
+from pynhl.heatmap import GRID_X_EDGES, GRID_Y_EDGES, HeatmapCache, HeatmapTiles, get_cells
+import numpy, pytest
+
+
+def test_cells_match_histogram2d():
+    rng = numpy.random.default_rng(1)
+    x, y = rng.uniform(-110, 110, 500), rng.uniform(-50, 50, 500)
+    # The upper corner, a point on the upper x edge, and a point without coordinates
+    x[0], y[0], x[1], x[2] = GRID_X_EDGES[-1], GRID_Y_EDGES[-1], GRID_X_EDGES[-1], numpy.nan
+    cells = get_cells(x, y)
+    assert cells[2] == -1
+    expected, _, _ = numpy.histogram2d(x[3:], y[3:], bins=(GRID_X_EDGES, GRID_Y_EDGES))
+    expected += numpy.histogram2d(x[:2], y[:2], bins=(GRID_X_EDGES, GRID_Y_EDGES))[0]
+    assert numpy.array_equal(numpy.bincount(cells[cells >= 0], minlength=expected.size).reshape(expected.shape),
+                             expected)
+
+
+def test_team_tiles_count_located_events(game):
+    heatmaps = HeatmapTiles.from_game(game)
+    valid = game.location_features['valid']
+    assert heatmaps.get().sum() == valid.sum()
+    for team in (game.home_team, game.away_team):
+        located = [event for event, is_valid in zip(game.events_in_game, valid) if is_valid]
+        shots = [event for event in located if event.team_of_player == team and event.type_of_event == 'Shot']
+        assert heatmaps.get(team=team, type_of_event='Shot').sum() == len(shots)
+    goal = next(event for event, is_valid in zip(game.events_in_game, valid) if is_valid and event.type_of_event == 'Goal')
+    for name in goal.players_involved[goal.team_of_player]:
+        assert heatmaps.get(team=goal.team_of_player, player=name, type_of_event='Goal').sum() >= 1
+
+
+def test_merge_adds_games(make_game, game):
+    first, second = HeatmapTiles.from_game(game), HeatmapTiles.from_game(make_game(synthetic=1).run_stages())
+    season = HeatmapTiles.merge_all([first, second])
+    assert season.game_ids == {game.game_id, 1}
+    assert numpy.array_equal(season.get(), first.get() + second.get())
+    with pytest.raises(ValueError):
+        season.merge(first)
+
+
+def test_cache_builds_once_and_tracks_the_parser_version(game, tmp_path):
+    cache, builds = HeatmapCache(str(tmp_path)), []
+
+    def build():
+        builds.append(1)
+        return game
+
+    tiles = cache.get_tiles(game.game_id, 'abc', build)
+    assert numpy.array_equal(cache.get_tiles(game.game_id, 'abc', build).get(), tiles.get()) and len(builds) == 1
+    assert HeatmapCache.SCHEMA_VERSION // 100 == CACHE_SCHEMA_VERSION
@@ -0,0 +1,29 @@
+'''
+Tests of the forward line / defense pair detection
+'''
+from pynhl.game import Game
+from pynhl.lines import DEFENSE, FORWARDS, LineCombinations
+
+
+def test_units_are_on_ice_together(game):
+    lines = LineCombinations.from_game(game)
+    assert lines.get_top(FORWARDS) and lines.get_top(DEFENSE)
+    for (kind, team, player_ids), seconds in lines.get_top(n=3) + lines.get_top(DEFENSE, n=3):
+        names = lines.get_unit_names((kind, team, player_ids))
+        assert len(names) == 3 if kind == FORWARDS else len(names) == 2
+        for name in names:
+            assert game.players[name].position == kind
+            assert game.get_player_team(name) == team
+        # A unit's time together is at most the shared TOI of any two of its players
+        assert seconds <= sum(game.shared_toi[names[0]][names[1]].values())
+
+
+def test_units_of_a_traded_player(feeds):
+    game_json, shift_json = feeds
+    player_json = next(player_json for player_json in game_json['gameData']['players'].values()
+                       if player_json['primaryPosition']['code'] == 'C')
+    player_json['currentTeam']['triCode'] = 'XXX'
+    game = Game(game_json, shift_json).run_stages()
+    lines = LineCombinations.from_game(game)
+    assert game.players[player_json['fullName']].team == 'XXX'
+    assert lines.get_player_units(player_json['id'])
@@ -0,0 +1,43 @@
+'''
+Tests of the live game mode, updated games have to match a Game built from the whole feed
+'''
+from benchmarks.synthetic import to_clock
+from pynhl.game import Game
+from pynhl.live import LiveGame
+import pynhl.helpers as helpers
+import copy
+
+
+def get_results(game):
+    return ([(event.sort_key, event.type_of_event, event.players_on, event.strength,
+              [getattr(event, feature) for feature in helpers.TIME_SINCE_FEATURES]) for event in game.events_in_game],
+            game.shared_toi, game.strength_index.segments, game.final_score)
+
+
+def test_updates_match_a_full_rebuild(feeds, cut_feed, game):
+    game_json, shift_json = feeds
+    live = LiveGame(*cut_feed(game_json, shift_json, 300))
+    updates = []
+    live.subscribe(lambda updated, changes: updates.append(changes))
+    for game_second in range(600, 4200, 300):
+        live.update_from_feed(*cut_feed(game_json, shift_json, game_second))
+        partial = Game(*cut_feed(game_json, shift_json, game_second))
+        assert get_results(live) == get_results(partial)
+    assert len(updates) == 12 and all(changes['since'] is not None for changes in updates)
+    assert get_results(live) == get_results(game)
+    # The stores are rebuilt from the updated events
+    assert list(live.event_store) == list(game.event_store)
+    assert live.on_ice_index.boundaries == game.on_ice_index.boundaries
+
+
+def test_changed_shift_rows_replace_the_old_shift(feeds, cut_feed):
+    game_json, shift_json = feeds
+    live = LiveGame(*cut_feed(game_json, shift_json, 1200))
+    changed = copy.deepcopy(shift_json)
+    row = next(row for row in changed['data'] if row['period'] == 1 and row['duration'])
+    start = helpers.convert_to_seconds(row['startTime'])
+    row['endTime'], row['duration'] = to_clock(start + 1), to_clock(1)
+    changes = live.update_from_feed(*cut_feed(game_json, changed, 1200))
+    assert len(changes['shifts']) == 1 and len(changes['removed_shifts']) == 1
+    assert changes['shifts'][0].end == start + 1
+    assert get_results(live) == get_results(Game(*cut_feed(game_json, changed, 1200)))
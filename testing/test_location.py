@@ -0,0 +1,36 @@
+'''
+Tests of the vectorised shot location features
+'''
+from pynhl.location import get_event_columns, get_season_location_features, infer_rink_sides
+import math, numpy
+
+
+def test_features_match_each_event(game):
+    features = game.location_features
+    for i, event in enumerate(game.events_in_game):
+        if event.x_loc is None:
+            assert not features['valid'][i] and math.isnan(features['distance'][i])
+            continue
+        home_attacks_right = game.rink_sides[event.period]
+        direction = 1 if home_attacks_right == (event.team_of_player == game.home_team) else -1
+        x, y = event.x_loc * direction, event.y_loc * direction
+        assert features['valid'][i]
+        assert math.isclose(features['x'][i], x) and math.isclose(features['y'][i], y)
+        assert math.isclose(features['distance'][i], math.hypot(89 - x, y))
+        assert math.isclose(features['angle'][i], math.degrees(math.atan2(abs(y), 89 - x)), abs_tol=1e-9)
+
+
+def test_inferred_sides_match_the_feed(game):
+    columns = get_event_columns(game.event_store)
+    assert infer_rink_sides(columns['period'], columns['team_code'], columns['x_loc'], columns['type_code']) == \
+        game.rink_sides
+
+
+def test_season_features_are_the_game_features(make_game, game):
+    games = [game, make_game(synthetic=1).run_stages()]
+    season = get_season_location_features(games)
+    assert season['game_id'].tolist() == [game.game_id] * len(game.events_in_game) + [1] * len(games[1].events_in_game)
+    for feature in ('valid', 'x', 'y', 'distance', 'angle'):
+        assert numpy.array_equal(season[feature], numpy.concatenate([g.location_features[feature] for g in games]),
+                                 equal_nan=feature != 'valid')
+    assert len(get_season_location_features([])['distance']) == 0
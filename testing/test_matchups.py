@@ -0,0 +1,70 @@
+'''
+Tests of the matchup cubes
+'''
+from pynhl.game import Game
+from pynhl.matchups import MatchupCube
+import numpy, pytest
+
+
+@pytest.fixture
+def cubes(make_game):
+    return [MatchupCube.from_game(make_game(synthetic=game_id, roster_size=18 + game_id)) for game_id in (1, 2, 3)]
+
+
+def test_game_cube_matches_shared_toi(game):
+    cube = MatchupCube.from_game(game)
+    for name, others in game.shared_toi.items():
+        for other, strengths in others.items():
+            assert cube.get(game.players[name].player_id, game.players[other].player_id) == strengths
+
+
+def test_merge_into_empty_cube_is_the_game(cubes):
+    merged = MatchupCube().merge(cubes[0])
+    assert merged.player_ids == cubes[0].player_ids and merged.strengths == cubes[0].strengths
+    assert numpy.array_equal(merged.with_toi, cubes[0].with_toi)
+    assert numpy.array_equal(merged.against_toi, cubes[0].against_toi)
+
+
+def test_merge_matches_merge_all(cubes):
+    merged = MatchupCube()
+    for cube in cubes:
+        merged.merge(cube)
+    season = MatchupCube.merge_all(cubes)
+    assert sorted(merged.player_ids) == season.player_ids and season.game_ids == {1, 2, 3}
+    for player_id in season.player_ids:
+        for other_id in season.player_ids:
+            for against in (False, True):
+                expected = {}
+                for cube in cubes:
+                    if player_id in cube.index and other_id in cube.index:
+                        for strength, seconds in cube.get(player_id, other_id, against).items():
+                            expected[strength] = expected.get(strength, 0) + seconds
+                assert merged.get(player_id, other_id, against) == expected
+                assert season.get(player_id, other_id, against) == expected
+
+
+def test_merge_grows_geometrically(cubes):
+    merged = MatchupCube().merge(cubes[0])
+    room = merged.with_blocks.shape[0]
+    merged.merge(cubes[1])
+    assert merged.with_blocks.shape[0] >= max(len(merged), int(room * 1.5))
+    with pytest.raises(ValueError):
+        merged.merge(cubes[1])
+
+
+def test_save_load(cubes, tmp_path):
+    season = MatchupCube.merge_all(cubes).save(tmp_path / 'cube.npz')
+    loaded = MatchupCube.load(tmp_path / 'cube.npz')
+    assert loaded.player_ids == season.player_ids and loaded.names == season.names
+    assert numpy.array_equal(loaded.with_toi, season.with_toi)
+
+
+def test_game_cube_of_a_traded_player(feeds, game):
+    game_json, shift_json = feeds
+    player_json = next(player_json for player_json in game_json['gameData']['players'].values()
+                       if player_json['fullName'] in game.shared_toi)
+    player_json['currentTeam']['triCode'] = 'XXX'
+    cube = MatchupCube.from_game(Game(game_json, shift_json))
+    expected = MatchupCube.from_game(game)
+    assert numpy.array_equal(cube.with_toi, expected.with_toi)
+    assert numpy.array_equal(cube.against_toi, expected.against_toi)
@@ -0,0 +1,27 @@
+'''
+Tests of the per-stage records
+'''
+from pynhl.game import Game
+from pynhl.live import LiveGame
+from pynhl.metrics import TimingHook, aggregate_stage_records
+
+
+def test_one_record_per_stage(make_game):
+    game = make_game()
+    game.hooks.append(TimingHook())
+    game.run_stages()
+    assert sorted(record['stage'] for record in game.stage_records) == sorted(Game.STAGES)
+    assert all(record['wall_seconds'] >= 0 for record in game.stage_records)
+    totals = aggregate_stage_records(game.stage_records)
+    assert totals['load_events']['records_out'] == len(game.events_in_game)
+
+
+def test_live_updates_count_their_bisects(feeds, cut_feed):
+    game_json, shift_json = feeds
+    live = LiveGame(*cut_feed(game_json, shift_json, 1200))
+    live.update_from_feed(game_json, shift_json)
+    updates = [record for record in live.stage_records if record['stage'] == 'update']
+    assert len(updates) == 1
+    # One insort per new event, two per new shift, plus the lookups of where to re-analyse from
+    new_events = len(live.events_in_game) - sum(1 for event in live.events_in_game if event.period == 1)
+    assert updates[0]['bisects'] > new_events
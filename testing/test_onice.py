@@ -0,0 +1,40 @@
+'''
+Tests of the point in time on-ice index
+'''
+from pynhl.onice import OnIceIndex
+from pynhl.store import ShiftRows
+import pynhl.helpers as helpers
+import numpy
+
+
+def on_ice_brute_force(shifts, game_second):
+    return frozenset(shift.player for shift in shifts if shift.game_start <= game_second < shift.game_end)
+
+
+def test_point_queries_match_the_shifts(game):
+    index, shifts = game.on_ice_index, list(game.shifts)
+    assert isinstance(index.shifts, ShiftRows)
+    seconds = list(range(-1, max(shift.game_end for shift in shifts) + 2, 7))
+    for game_second in seconds:
+        assert index.players_at(game_second) == on_ice_brute_force(shifts, game_second)
+    assert index.on_ice_at_many(seconds) == [index.players_at(game_second) for game_second in seconds]
+    matrix = index.matrix_at(seconds)
+    assert [frozenset(numpy.array(index.players)[row]) for row in matrix] == index.on_ice_at_many(seconds)
+    by_team = index.on_ice_at(2, 300)
+    assert set().union(*by_team.values()) == index.players_at(helpers.game_second(2, 300))
+    assert all(game.get_player_team(name) == team for team, names in by_team.items() for name in names)
+
+
+def test_interval_queries_match_the_shifts(game):
+    index, shifts = game.on_ice_index, list(game.shifts)
+    for period, lb, ub in ((1, 0, 60), (2, 595, 605), (3, 1100, 1200), (1, 30, 31)):
+        expected = [shift for shift in shifts if shift.period == period and shift.start < ub and shift.end > lb
+                    and shift.start < shift.end]
+        assert sorted(index.shifts_overlapping(period, lb, ub)) == sorted(expected)
+        assert set().union(*index.on_ice_during(period, lb, ub).values()) == {shift.player for shift in expected}
+
+
+def test_store_and_objects_build_the_same_index(make_game, game):
+    objects = OnIceIndex(make_game().run_stages('load_players')._shifts)
+    assert objects.boundaries == game.on_ice_index.boundaries and objects.on_ice == game.on_ice_index.on_ice
+    assert list(objects.shifts) == list(game.on_ice_index.shifts)
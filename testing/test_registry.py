@@ -0,0 +1,32 @@
+'''
+Tests of the season player registry
+'''
+from pynhl.registry import PlayerRegistry
+
+
+def test_game_registry_matches_shared_toi(game):
+    registry = PlayerRegistry.from_game(game)
+    assert len(registry) == len(game.players)
+    for name, others in game.shared_toi.items():
+        player = game.players[name]
+        assert registry.find(name) == [player.player_id] and registry.games[player.player_id] == {game.game_id}
+        for other, strengths in others.items():
+            assert registry.get_shared_toi(player.player_id, game.players[other].player_id) == strengths
+
+
+def test_merged_registries_sum_their_games(make_game):
+    games = [make_game(synthetic=game_id).run_stages() for game_id in (1, 2)]
+    season = PlayerRegistry.merge_all([PlayerRegistry.from_game(games[0]), PlayerRegistry.from_game(games[1]),
+                                       PlayerRegistry.from_game(games[1])])
+    assert season.shared_toi_by_game.keys() == {1, 2}
+    folded = PlayerRegistry().add_game(games[0]).add_game(games[1]).add_game(games[1])
+    assert season.shared_toi == folded.shared_toi and season.games == folded.games
+    player_id, other_id = next(iter(season.shared_toi))
+    expected = {}
+    for game_id in (1, 2):
+        for strength, seconds in season.get_shared_toi(player_id, other_id, game_id).items():
+            expected[strength] = expected.get(strength, 0) + seconds
+    assert season.get_shared_toi(player_id, other_id) == expected
+    linemates = season.get_linemates(player_id)
+    assert linemates == sorted(linemates, key=lambda linemate: linemate[1], reverse=True)
+    assert (other_id, sum(expected.values())) in linemates
@@ -0,0 +1,36 @@
+'''
+Tests of the roster bitmasks events store their players as
+'''
+from pynhl.roster import RosterIndex
+import numpy, pytest
+
+
+def test_masks_round_trip():
+    roster = RosterIndex('BUF', 'FLA', ['A', 'B', 'C'])
+    assert roster.mask(['C', 'A']) == 0b101 and roster.players(0b101) == {'A', 'C'}
+    assert roster.flag('D') == 0b1000 and 'D' in roster and len(roster) == 4
+    with pytest.raises(OverflowError):
+        RosterIndex('BUF', 'FLA', (str(i) for i in range(RosterIndex.MAX_PLAYERS + 1)))
+
+
+def test_columns_of_masks():
+    roster = RosterIndex('BUF', 'FLA', ['A', 'B', 'C'])
+    masks = [0b011, 0b110, 0, 0b111]
+    assert roster.with_player(masks, 'B').tolist() == [True, True, False, True]
+    assert roster.counts(masks).tolist() == [2, 2, 0, 3]
+    assert roster.matrix(masks).tolist()[1] == [False, True, True]
+    assert numpy.array_equal(roster.co_occurrence(masks), [[2, 2, 1], [2, 3, 2], [1, 2, 2]])
+
+
+def test_event_masks_match_the_players_on(game):
+    store, roster = game.event_store, game.roster
+    for team, column in ((game.home_team, store.home_on_ice), (game.away_team, store.away_on_ice)):
+        counts = roster.counts(column).tolist()
+        for event, count in zip(game.events_in_game, counts):
+            assert len(event.players_on[team]) == count
+            assert event.on_ice_mask(team) == roster.mask(event.players_on[team])
+        name = next(iter(game.events_in_game[0].players_on[team]))
+        assert roster.with_player(column, name).tolist() == \
+            [name in event.players_on[team] for event in game.events_in_game]
+    assert all(event.strength == f"{event.home_on_ice.bit_count()}v{event.away_on_ice.bit_count()}"
+               for event in game.events_in_game)
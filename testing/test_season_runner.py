@@ -0,0 +1,29 @@
+'''
+Tests of the process pool season runner
+'''
+from driver import read_json_data
+from pynhl.game import Game
+from season_runner import find_game_ids, run_season
+import os
+
+
+def test_find_game_ids_needs_both_files(season_dirs):
+    game_dir, shift_dir = season_dirs
+    os.remove(os.path.join(shift_dir, 'shift_2.json'))
+    assert find_game_ids(game_dir, shift_dir) == [1, 3]
+
+
+def test_run_season_matches_a_single_game(season_dirs):
+    game_dir, shift_dir = season_dirs
+    with open(os.path.join(game_dir, 'game_4.json'), 'w') as of:
+        of.write('{"gameData": {}}')
+    with open(os.path.join(shift_dir, 'shift_4.json'), 'w') as of:
+        of.write('{"data": []}')
+    reports = []
+    summaries, failures = run_season(find_game_ids(game_dir, shift_dir), workers=2, chunk_size=1,
+                                     game_dir=game_dir, shift_dir=shift_dir, report=reports.append)
+    assert sorted(summaries) == [1, 2, 3] and list(failures) == [4]
+    assert failures[4].startswith('KeyError') and len(reports) == 4
+    game = Game(read_json_data(2, game_dir=game_dir), read_json_data(2, False, game_dir, shift_dir)).run_stages()
+    assert summaries[2]['events'] == len(game.events_in_game) and summaries[2]['shifts'] == len(game.shifts)
+    assert summaries[2]['final_score'] == game.final_score
@@ -0,0 +1,28 @@
+'''
+Tests of the columnar event / shift stores and their views
+'''
+from pynhl.store import EventView, ShiftView
+
+
+def test_event_views_compare_like_events(game):
+    events = game.events_in_game
+    assert isinstance(events[0], EventView)
+    assert events[0] == events[0] and hash(events[0]) == hash(events[0])
+    assert events[0] in events and events[-1] in events[:]
+    assert events[len(events) // 2] in set(events)
+    first = events[:3]
+    assert sorted(reversed(first)) == sorted(first)
+    assert sorted(events, key=lambda event: (event.sort_key, event.type_of_event)) == sorted(events)
+    assert events[0] != 'Faceoff'
+
+
+def test_shift_views_compare_like_shifts(game):
+    shifts = game.shifts
+    assert isinstance(shifts[0], ShiftView)
+    assert shifts[0] == shifts[0] and hash(shifts[0]) == hash(shifts[0])
+    assert shifts[5] in shifts and len(set(shifts)) == len(shifts)
+    assert sorted(reversed(shifts[:])) == shifts[:]
+    # A player's ShiftRows hold views of the same rows
+    player = game.players[shifts[0].player]
+    assert shifts[0] in player.shifts[game.game_id]
+    assert all(shift in shifts for shift in player.shifts[game.game_id])
@@ -0,0 +1,29 @@
+'''
+Tests of streaming selective ingestion
+'''
+from driver import stream_json_data
+from pynhl.game import Game
+from pynhl.stream import stream_game_feed, stream_shift_chart
+import os
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GAME_ID = 2019020645
+DIRS = {'game_dir': os.path.join(REPO_DIR, 'games', ''), 'shift_dir': os.path.join(REPO_DIR, 'shifts', '')}
+
+
+def test_streamed_feeds_hold_what_game_reads(feeds):
+    game_json, shift_json = feeds
+    streamed = stream_game_feed(os.path.join(DIRS['game_dir'], f"game_{GAME_ID}.json"))
+    assert streamed['gameData'] == {part: game_json['gameData'][part] for part in ('game', 'teams', 'players')}
+    assert list(streamed['liveData']['plays']['allPlays']) == game_json['liveData']['plays']['allPlays']
+    rows = stream_shift_chart(os.path.join(DIRS['shift_dir'], f"shift_{GAME_ID}.json"))['data']
+    assert list(rows) == shift_json['data']
+
+
+def test_streamed_game_matches_loaded_game(game):
+    streamed = Game(stream_json_data(GAME_ID, **DIRS), stream_json_data(GAME_ID, is_game=False, **DIRS)).run_stages()
+    assert list(streamed.events_in_game) == list(game.events_in_game)
+    assert [event.players_on for event in streamed.events_in_game] == \
+        [event.players_on for event in game.events_in_game]
+    assert streamed.shared_toi == game.shared_toi and streamed.final_score == game.final_score
+
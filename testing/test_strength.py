@@ -0,0 +1,45 @@
+'''
+Tests of the per-period strength segment index
+'''
+from pynhl.strength import StrengthIndex
+from collections import namedtuple
+
+Shift = namedtuple('Shift', 'team period start end')
+
+
+def skaters_at(shifts, period, second, home_team):
+    home = sum(1 for shift in shifts if shift.team == home_team and shift.period == period
+               and shift.start <= second < shift.end)
+    away = sum(1 for shift in shifts if shift.team != home_team and shift.period == period
+               and shift.start <= second < shift.end)
+    return f"{home}v{away}"
+
+
+def test_segments_match_the_skaters_of_every_second(game):
+    index = game.strength_index
+    goalies = game.home_goalie | game.away_goalie
+    shifts = [shift for shift in game.shifts if shift.player not in goalies]
+    for period, segments in index.segments.items():
+        assert all(segment[1] == following[0] and segment[2] != following[2]
+                   for segment, following in zip(segments, segments[1:]))
+        for second in range(segments[0][0], segments[-1][1]):
+            assert index.strength_at(period, second) == skaters_at(shifts, period, second, game.home_team)
+        assert index.strength_at(period, segments[-1][1]) is None
+
+
+def test_split():
+    shifts = [Shift('BUF', 1, 0, 60), Shift('BUF', 1, 0, 30), Shift('FLA', 1, 10, 60)]
+    index = StrengthIndex(shifts, 'BUF', 'FLA')
+    assert index.segments == {1: [(0, 10, '2v0'), (10, 30, '2v1'), (30, 60, '1v1')]}
+    assert index.split(1, 5, 40) == {'2v0': 5, '2v1': 20, '1v1': 10}
+    assert index.split(1, 0, 60) == {'2v0': 10, '2v1': 20, '1v1': 30}
+    assert index.split(2, 0, 60) == {}
+    assert index.strength_at(1, 10) == '2v1' and index.strength_at(2, 10) is None
+
+
+def test_build_period_replaces_one_period():
+    index = StrengthIndex([Shift('BUF', 1, 0, 60), Shift('FLA', 2, 0, 60)], 'BUF', 'FLA')
+    index.build_period(2, [Shift('BUF', 2, 0, 20)])
+    assert index.segments == {1: [(0, 60, '1v0')], 2: [(0, 20, '1v0')]}
+    index.build_period(2, [])
+    assert list(index.segments) == [1] and list(index.starts) == [1]
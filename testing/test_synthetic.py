@@ -0,0 +1,31 @@
+'''
+Tests of the synthetic game generator the benchmarks and these tests run on
+'''
+from benchmarks.bench_game import bench_game
+from benchmarks.synthetic import build_synthetic_game
+from pynhl.game import Game
+import pynhl.helpers as helpers
+
+
+def test_sizes_and_seed():
+    game_json, shift_json = build_synthetic_game(7, events=600, shifts=1400, overtime_periods=1, roster_size=22)
+    plays = game_json['liveData']['plays']['allPlays']
+    assert sum(play['result']['event'] in helpers.TRACKED_EVENTS for play in plays) == 600
+    assert 1400 <= len(shift_json['data']) <= 1400 * 1.2
+    assert len(game_json['gameData']['players']) == 44
+    assert {play['about']['period'] for play in plays} == {1, 2, 3, 4}
+    assert build_synthetic_game(7, events=600, shifts=1400, overtime_periods=1, roster_size=22) == \
+        (game_json, shift_json)
+
+
+def test_synthetic_game_parses():
+    game = Game(*build_synthetic_game(3)).run_stages()
+    # Backup goalies dress but get no shifts
+    assert len(game.events_in_game) == 300 and len(game.players) == 38
+    assert all(event.strength for event in game.events_in_game)
+
+
+def test_bench_records_every_stage():
+    records = list(bench_game('synthetic', *build_synthetic_game(3), sizes={'scale': 1}, repeat=1))
+    assert [record['stage'] for record in records] == list(Game.STAGES) + ['total']
+    assert records[-1]['seconds'] >= max(record['seconds'] for record in records[:-1])